@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""measure API calls per second with and without connection pooling"""
+
+# usage: ./apiBenchmark.py -v mycluster -u myusername [ -d domain ] [ -n 200 ] [ -e cluster ]
+
+# import pyhesity wrapper module
+from pyhesity import *
+import requests
+import time
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--vip', type=str, required=True)         # cluster to connect to
+parser.add_argument('-u', '--username', type=str, required=True)    # username
+parser.add_argument('-d', '--domain', type=str, default='local')    # (optional) domain - defaults to local
+parser.add_argument('-i', '--useApiKey', action='store_true')       # use API key authentication
+parser.add_argument('-pwd', '--password', type=str, default=None)   # (optional) password
+parser.add_argument('-n', '--numcalls', type=int, default=200)      # (optional) number of calls per test
+parser.add_argument('-e', '--endpoint', type=str, default='cluster')  # (optional) v1 public endpoint to call
+parser.add_argument('-p', '--poolsize', type=int, default=10)       # (optional) connection pool size
+args = parser.parse_args()
+
+vip = args.vip
+username = args.username
+domain = args.domain
+password = args.password
+useApiKey = args.useApiKey
+numcalls = args.numcalls
+endpoint = args.endpoint
+poolsize = args.poolsize
+
+# authenticate
+apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, noretry=True, poolsize=poolsize)
+if apiconnected() is False:
+    print('\nFailed to connect to %s: %s\n' % (vip, LAST_API_ERROR()))
+    exit(1)
+
+context = getContext()
+url = '%s/public/%s' % (context['APIROOT'], endpoint)
+
+
+def oneShot():
+    """new connection (and TLS handshake) per call"""
+    requests.get(url, headers=context['HEADER'], verify=False, timeout=300)
+
+
+def pooled():
+    """keep-alive connection reused from the context session"""
+    api('get', endpoint, quiet=True)
+
+
+def benchmark(title, fn):
+    start = time.time()
+    for i in range(numcalls):
+        fn()
+    elapsed = time.time() - start
+    rate = numcalls / elapsed if elapsed > 0 else 0
+    print('%-10s %6s calls in %7.2f seconds (%7.1f calls/sec)' % (title, numcalls, elapsed, rate))
+    return rate
+
+
+print('\nCalling %s %s times per test...\n' % (endpoint, numcalls))
+before = benchmark('one-shot', oneShot)
+after = benchmark('pooled', pooled)
+if before > 0:
+    print('\nspeedup: %0.1fx\n' % (after / before))
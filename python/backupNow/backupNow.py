@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """BackupNow for python"""
 
-# version 2023.08.14
+# version 2026.10.18
 
 # version history
 # ===============
@@ -14,6 +14,11 @@
 # 2023.06.25 - added -pl --purgeoraclelogs (first added 2023-06-08)
 # 2023.07.05 - updated payload to solve p11 error "TARGET_NOT_IN_POLICY_NOT_ALLOWED%!(EXTRA int64=0)"
 # 2023-08-14 - updated script to exit with failure on "TARGET_NOT_IN_POLICY_NOT_ALLOWED"
+# 2026.10.18 - adaptive polling: checks start at 2 seconds, follow the progress monitor ETA, and
+#              sleeptimesecs is now the longest wait between checks
+# 2026.10.18 - accept multiple -j jobs or -jl job list file and wait for all of them with one poller
+# 2026.10.18 - added -bk, --broker to send the run request to a backupNowBroker.py service
+# 2026.10.18 - cache -o object lookups per job until the job is modified or its source is refreshed
 
 # extended error codes
 # ====================
@@ -27,15 +32,18 @@
 # 7: Timed out getting job
 # 8: Target not in policy not allowed
 
-### usage: ./backupNow.py -v mycluster -u admin -j 'Generic NAS' [-r mycluster2] [-a S3] [-kr 5] [-ka 10] [-e] [-w] [-t kLog]
+### usage: ./backupNow.py -v mycluster -u admin -j 'Generic NAS' [-j 'Another Job'] [-jl joblist.txt] [-r mycluster2] [-a S3] [-kr 5] [-ka 10] [-e] [-w] [-t kLog]
 
 # import pyhesity wrapper module
 from pyhesity import *
-from time import sleep
+from time import sleep, time
 from datetime import datetime
 from sys import exit
 import codecs
 import copy
+import json
+import os
+import requests
 
 # command line arguments
 import argparse
@@ -49,7 +57,8 @@ parser.add_argument('-p', '--password', type=str, default=None)
 parser.add_argument('-np', '--noprompt', action='store_true')
 parser.add_argument('-mcm', '--mcm', action='store_true')
 parser.add_argument('-c', '--clustername', type=str, default=None)
-parser.add_argument('-j', '--jobName', type=str, required=True)
+parser.add_argument('-j', '--jobName', action='append', type=str)
+parser.add_argument('-jl', '--joblist', type=str, default=None)
 parser.add_argument('-j2', '--jobName2', type=str, default=None)
 parser.add_argument('-y', '--usepolicy', action='store_true')
 parser.add_argument('-l', '--localonly', action='store_true')
@@ -73,11 +82,12 @@ parser.add_argument('-cp', '--cancelpreviousrunminutes', type=int, default=0)
 parser.add_argument('-nrt', '--newruntimeoutsecs', type=int, default=1800)
 parser.add_argument('-debug', '--debug', action='store_true')
 parser.add_argument('-ex', '--extendederrorcodes', action='store_true')
-parser.add_argument('-s', '--sleeptimesecs', type=int, default=120)
+parser.add_argument('-s', '--sleeptimesecs', type=int, default=300)
 parser.add_argument('-es', '--exitstring', type=str, default=None)
 parser.add_argument('-est', '--exitstringtimeoutsecs', type=int, default=120)
 parser.add_argument('-sr', '--statusretries', type=int, default=10)
 parser.add_argument('-pl', '--purgeoraclelogs', action='store_true')
+parser.add_argument('-bk', '--broker', type=str, default=None)
 
 args = parser.parse_args()
 
@@ -90,7 +100,8 @@ password = args.password
 noprompt = args.noprompt
 clustername = args.clustername
 mcm = args.mcm
-jobName = args.jobName
+jobNames = args.jobName
+joblist = args.joblist
 jobName2 = args.jobName2
 keepLocalFor = args.keepLocalFor
 replicateTo = args.replicateTo
@@ -119,10 +130,12 @@ exitstring = args.exitstring
 exitstringtimeoutsecs = args.exitstringtimeoutsecs
 statusretries = args.statusretries
 purgeoraclelogs = args.purgeoraclelogs
+broker = args.broker
 
-# enforce sleep time
-if sleeptimesecs < 30:
-    sleeptimesecs = 30
+# enforce sleep time (shortest and longest wait between status checks)
+minsleepsecs = 2
+if sleeptimesecs < minsleepsecs:
+    sleeptimesecs = minsleepsecs
 
 if newruntimeoutsecs < 720:
     newruntimeoutsecs = 720
@@ -161,6 +174,116 @@ def bail(code=0):
     exit(code)
 
 
+def nextSleep(sleepSecs, etaSecs=None):
+    """seconds until the next check: double the last wait, or less if the run is due to finish sooner"""
+    if etaSecs is not None:
+        sleepSecs = min(etaSecs, sleepSecs * 2)
+    else:
+        sleepSecs = sleepSecs * 2
+    return int(min(sleeptimesecs, max(minsleepsecs, sleepSecs)))
+
+
+# gather job names from the command line and the job list file
+if jobNames is None:
+    jobNames = []
+if joblist is not None:
+    try:
+        f = open(joblist, 'r')
+        jobNames += [e.strip() for e in f.readlines() if e.strip() != '' and not e.strip().startswith('#')]
+        f.close()
+    except Exception:
+        out('Unable to read job list %s' % joblist)
+        if extendederrorcodes is True:
+            bail(3)
+        else:
+            bail(1)
+if len(jobNames) == 0:
+    out('-j, --jobName or -jl, --joblist is required')
+    if extendederrorcodes is True:
+        bail(3)
+    else:
+        bail(1)
+jobNames = [n for (i, n) in enumerate(jobNames) if n.lower() not in [m.lower() for m in jobNames[:i]]]
+jobName = jobNames[0]
+if len(jobNames) > 1 and (objectnames is not None or metadatafile is not None or exitstring is not None or purgeoraclelogs or progress is True or jobName2 is not None):
+    out('-o, -m, -es, -pl, -pr and -j2 can only be used with a single job')
+    if extendederrorcodes is True:
+        bail(3)
+    else:
+        bail(1)
+
+# send the run request to a broker (which coalesces requests for the same jobs and objects)
+if broker is not None and exitstring is None:
+    if progress is True or vip2 is not None:
+        out('-pr and -v2 can not be used with -bk')
+        if extendederrorcodes is True:
+            bail(3)
+        else:
+            bail(1)
+    brokerRequest = {
+        'vip': vip,
+        'clustername': clustername,
+        'jobNames': jobNames,
+        'objectnames': objectnames,
+        'backupType': backupType,
+        'metadatafile': metadatafile,
+        'keepLocalFor': keepLocalFor,
+        'replicateTo': replicateTo,
+        'keepReplicaFor': keepReplicaFor,
+        'archiveTo': archiveTo,
+        'keepArchiveFor': keepArchiveFor,
+        'localonly': localonly,
+        'noreplica': noreplica,
+        'noarchive': noarchive,
+        'abortifrunning': abortIfRunning,
+        'purgeoraclelogs': purgeoraclelogs,
+        'usepolicy': usepolicy,
+        'enable': enable,
+        'waitminutesifrunning': waitminutesifrunning,
+        'cancelpreviousrunminutes': cancelpreviousrunminutes,
+        'newruntimeoutsecs': newruntimeoutsecs
+    }
+    try:
+        response = requests.post('http://%s/runs' % broker, data=json.dumps(brokerRequest), timeout=30)
+        brokerStatus = response.json()
+        if response.status_code != 202:
+            out('Broker rejected request: %s' % brokerStatus.get('error', response.status_code))
+            if extendederrorcodes is True:
+                bail(3)
+            else:
+                bail(1)
+    except Exception as e:
+        out('Broker %s unavailable (%s), running directly' % (broker, e))
+        brokerStatus = None
+    if brokerStatus is not None:
+        out('Queued %s (request %s, batch %s with %s requests)' % (', '.join(jobNames), brokerStatus['id'], brokerStatus['batch'], brokerStatus['requests']))
+        if wait is not True:
+            bail(0)
+        statusRetryCount = 0
+        while brokerStatus['state'] != 'finished':
+            try:
+                response = requests.get('http://%s/runs/%s?waitsecs=%s' % (broker, brokerStatus['id'], sleeptimesecs), timeout=sleeptimesecs + 30)
+                thisStatus = response.json()
+                if response.status_code != 200 or 'state' not in thisStatus:
+                    raise ValueError(thisStatus.get('error', response.status_code))
+                brokerStatus = thisStatus
+                statusRetryCount = 0
+            except Exception:
+                statusRetryCount += 1
+                if statusRetryCount > statusretries:
+                    out("Timed out waiting for status update")
+                    if extendederrorcodes is True:
+                        bail(5)
+                    else:
+                        bail(1)
+                sleep(minsleepsecs)
+        out(brokerStatus['output'].rstrip('\n'))
+        if brokerStatus['exitCode'] == 0 or extendederrorcodes is True:
+            bail(brokerStatus['exitCode'])
+        else:
+            bail(1)
+
+
 if 'api_version' not in globals() or api_version < '2022.09.13':
     out('this script requires pyhesity.py version 2022.09.13 or later')
     if extendederrorcodes is True:
@@ -212,6 +335,8 @@ if apiconnected() is False:
 sources = {}
 cluster = api('get', 'cluster')
 
+finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning', 'kCanceling', '3', '4', '5', '6', 'Canceled', 'Succeeded', 'Failed', 'SucceededWithWarning']
+
 
 # get object ID
 def getObjectId(objectName):
@@ -256,6 +381,169 @@ def cancelRunningJob(job, durationMinutes):
                             out('Canceling previous job run')
 
 
+def getLastRuns(jobStates):
+    """latest run of each job (one call for all jobs, None on error)"""
+    groups = api('get', 'data-protect/protection-groups?ids=%s&includeLastRunInfo=true' % ','.join([s['v2JobId'] for s in jobStates]), v=2)
+    if groups is None or 'error' in groups:
+        return None
+    return dict([(g['id'], g['lastRun']) for g in groups.get('protectionGroups', None) or [] if 'lastRun' in g])
+
+
+copyTargetCache = {}  # policies, remote clusters and vaults (shared by all jobs)
+
+
+def getCopyRunTargets(job, copyRunTargets):
+    # use base retention and copy targets from policy
+    policyPath = 'protectionPolicies/%s' % job['policyId']
+    if policyPath not in copyTargetCache:
+        copyTargetCache[policyPath] = api('get', policyPath)
+    policy = copyTargetCache[policyPath]
+    # if keepLocalFor is None:
+    #     copyRunTargets[0]['daysToKeep'] = policy['daysToKeep']
+
+    # replication
+    if localonly is not True and noreplica is not True:
+        if 'snapshotReplicationCopyPolicies' in policy and replicateTo is None:
+            for replica in policy['snapshotReplicationCopyPolicies']:
+                if replica['target'] not in [p.get('replicationTarget', None) for p in copyRunTargets]:
+                    if keepReplicaFor is not None:
+                        replica['daysToKeep'] = keepReplicaFor
+                    copyRunTargets.append({
+                        "daysToKeep": replica['daysToKeep'],
+                        "replicationTarget": replica['target'],
+                        "type": "kRemote"
+                    })
+    # archival
+    if localonly is not True and noarchive is not True and backupType != 'kLog':
+        if 'snapshotArchivalCopyPolicies' in policy and archiveTo is None:
+            for archive in policy['snapshotArchivalCopyPolicies']:
+                if archive['target'] not in [p.get('archivalTarget', None) for p in copyRunTargets]:
+                    if keepArchiveFor is not None:
+                        archive['daysToKeep'] = keepArchiveFor
+                    copyRunTargets.append({
+                        "archivalTarget": archive['target'],
+                        "daysToKeep": archive['daysToKeep'],
+                        "type": "kArchival"
+                    })
+
+    # use copy targets specified at the command line
+    if replicateTo is not None:
+        if keepReplicaFor is None:
+            out("--keepReplicaFor is required")
+            if extendederrorcodes is True:
+                bail(3)
+            else:
+                bail(1)
+        if 'remoteClusters' not in copyTargetCache:
+            copyTargetCache['remoteClusters'] = api('get', 'remoteClusters')
+        remote = [remote for remote in copyTargetCache['remoteClusters'] if remote['name'].lower() == replicateTo.lower()]
+        if len(remote) > 0:
+            remote = remote[0]
+            copyRunTargets.append({
+                "type": "kRemote",
+                "daysToKeep": keepReplicaFor,
+                "replicationTarget": {
+                    "clusterId": remote['clusterId'],
+                    "clusterName": remote['name']
+                }
+            })
+        else:
+            out("Remote Cluster %s not found!" % replicateTo)
+            if extendederrorcodes is True:
+                bail(3)
+            else:
+                bail(1)
+
+    if archiveTo is not None:
+        if keepArchiveFor is None:
+            out("--keepArchiveFor is required")
+            if extendederrorcodes is True:
+                bail(3)
+            else:
+                bail(1)
+        if 'vaults' not in copyTargetCache:
+            copyTargetCache['vaults'] = api('get', 'vaults')
+        vault = [vault for vault in copyTargetCache['vaults'] if vault['name'].lower() == archiveTo.lower()]
+        if len(vault) > 0:
+            vault = vault[0]
+            copyRunTargets.append({
+                "archivalTarget": {
+                    "vaultId": vault['id'],
+                    "vaultName": vault['name'],
+                    "vaultType": "kCloud"
+                },
+                "daysToKeep": keepArchiveFor,
+                "type": "kArchival"
+            })
+        else:
+            out("Archive target %s not found!" % archiveTo)
+            if extendederrorcodes is True:
+                bail(3)
+            else:
+                bail(1)
+    return copyRunTargets
+
+
+def getSources():
+    """download the sources needed to look up -o objects (once)"""
+    global sources, backupJob, backupSources
+    if sources != {}:
+        return
+    if environment in ['kOracle', 'kSQL']:
+        backupJob = api('get', '/backupjobs/%s' % job['id'])
+        backupSources = api('get', '/backupsources?allUnderHierarchy=false&entityId=%s&excludeTypes=5&includeVMFolders=true' % backupJob[0]['backupJob']['parentSource']['id'])
+    if 'kAWS' in environment:
+        sources = api('get', 'protectionSources?environments=kAWS')
+    else:
+        sources = api('get', 'protectionSources?environments=%s' % environment)
+
+
+# object lookups from previous runs (valid until the job is modified or its source is refreshed)
+def getObjectCache(job):
+    objectCache = {
+        'file': os.path.join(os.path.expanduser('~'), '.pyhesity', 'backupNow', '%s-%s-%s.json' % (cluster['id'], cluster['incarnationId'], job['id'])),
+        'modificationTimeUsecs': job.get('modificationTimeUsecs', None),
+        'refreshTimeUsecs': None,
+        'objects': {},
+        'updated': False
+    }
+    if 'parentSourceId' not in job or objectCache['modificationTimeUsecs'] is None:
+        return objectCache
+    registration = api('get', 'protectionSources/registrationInfo?ids=%s' % job['parentSourceId'], quiet=True)
+    try:
+        objectCache['refreshTimeUsecs'] = registration['rootNodes'][0]['registrationInfo']['refreshTimeUsecs']
+    except Exception:
+        return objectCache
+    try:
+        f = open(objectCache['file'], 'r')
+        cached = json.load(f)
+        f.close()
+        if cached['modificationTimeUsecs'] == objectCache['modificationTimeUsecs'] and cached['refreshTimeUsecs'] == objectCache['refreshTimeUsecs']:
+            objectCache['objects'] = cached['objects']
+    except Exception:
+        pass
+    return objectCache
+
+
+def saveObjectCache(objectCache):
+    if objectCache['updated'] is False or objectCache['refreshTimeUsecs'] is None:
+        return
+    try:
+        if os.path.isdir(os.path.dirname(objectCache['file'])) is False:
+            os.makedirs(os.path.dirname(objectCache['file']))
+        tmpfile = '%s.%s.tmp' % (objectCache['file'], os.getpid())
+        f = open(tmpfile, 'w')
+        json.dump(dict([(k, objectCache[k]) for k in ['modificationTimeUsecs', 'refreshTimeUsecs', 'objects']]), f)
+        f.close()
+        try:
+            os.rename(tmpfile, objectCache['file'])
+        except OSError:
+            os.remove(objectCache['file'])
+            os.rename(tmpfile, objectCache['file'])
+    except Exception:
+        pass
+
+
 # find protectionJob
 jobs = None
 jobRetries = 0
@@ -273,6 +561,140 @@ while jobs is None:
         else:
             sleep(15)
 
+# multiple jobs: run them all and wait for them with one poller
+if len(jobNames) > 1:
+    jobStates = []
+    for thisJobName in jobNames:
+        thisJob = [j for j in jobs if j['name'].lower() == thisJobName.lower() and ('isActive' not in j or j['isActive'] is not False)]
+        if not thisJob:
+            out("Job '%s' not found" % thisJobName)
+            jobStates.append({'name': thisJobName, 'exitCode': 3})
+            continue
+        thisJob = thisJob[0]
+        if thisJob['environment'] not in ['kOracle', 'kSQL'] and backupType == 'kLog':
+            out('BackupType kLog not applicable to %s (%s)' % (thisJob['name'], thisJob['environment']))
+            jobStates.append({'name': thisJob['name'], 'exitCode': 3})
+            continue
+        jobStates.append({
+            'name': thisJob['name'],
+            'job': thisJob,
+            'v2JobId': '%s:%s:%s' % (cluster['id'], cluster['incarnationId'], thisJob['id']),
+            'jobData': {
+                "copyRunTargets": getCopyRunTargets(thisJob, []),
+                "sourceIds": [],
+                "runType": backupType,
+                "usePolicyDefaults": True
+            },
+            'lastRunId': 1,
+            'runStartedUsecs': None,
+            'v2RunId': None,
+            'statusRetryCount': 0,
+            'reportWaiting': True,
+            'exitCode': None
+        })
+
+    # get last run IDs
+    watchStates = [s for s in jobStates if s['exitCode'] is None]
+    if len(watchStates) > 0:
+        lastRuns = getLastRuns(watchStates) or {}
+        for jobState in watchStates:
+            if jobState['v2JobId'] in lastRuns:
+                jobState['lastRunId'] = lastRuns[jobState['v2JobId']]['protectionGroupInstanceId']
+
+    # run protectionJobs and wait for them to finish
+    waitUntil = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S")) + (waitminutesifrunning * 60000000)
+    sleepSecs = minsleepsecs
+    statusRetryCount = 0
+    while True:
+        nowUsecs = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        for jobState in [s for s in jobStates if s['exitCode'] is None and s['runStartedUsecs'] is None]:
+            runNow = api('post', "protectionJobs/run/%s" % jobState['job']['id'], jobState['jobData'], quiet=True)
+            if runNow == "":
+                out("Running %s..." % jobState['name'])
+                jobState['runStartedUsecs'] = nowUsecs
+                if wait is not True:
+                    jobState['exitCode'] = 0
+            elif 'TARGET_NOT_IN_POLICY_NOT_ALLOWED' in LAST_API_ERROR():
+                out('%s: %s' % (jobState['name'], LAST_API_ERROR()))
+                jobState['exitCode'] = 8
+            else:
+                if cancelpreviousrunminutes > 0:
+                    cancelRunningJob(jobState['job'], cancelpreviousrunminutes)
+                if jobState['reportWaiting'] is True:
+                    if abortIfRunning:
+                        out('%s is already running' % jobState['name'])
+                        jobState['exitCode'] = 0
+                        continue
+                    out('Waiting for existing run of %s to finish' % jobState['name'])
+                    jobState['reportWaiting'] = False
+                if nowUsecs >= waitUntil:
+                    out('Timed out waiting for existing run of %s' % jobState['name'])
+                    jobState['exitCode'] = 4
+        if len([s for s in jobStates if s['exitCode'] is None]) == 0:
+            break
+        sleep(sleepSecs)
+        sleepSecs = nextSleep(sleepSecs)
+
+        # one status query for all started runs
+        watchStates = [s for s in jobStates if s['exitCode'] is None and s['runStartedUsecs'] is not None]
+        if len(watchStates) == 0:
+            continue
+        lastRuns = getLastRuns(watchStates)
+        if lastRuns is None:
+            statusRetryCount += 1
+            if statusRetryCount > statusretries:
+                for jobState in watchStates:
+                    out("Timed out waiting for status update of %s" % jobState['name'])
+                    jobState['exitCode'] = 5
+            continue
+        statusRetryCount = 0
+        nowUsecs = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        for jobState in watchStates:
+            run = lastRuns.get(jobState['v2JobId'], None)
+            if jobState['v2RunId'] is None:
+                if run is not None and run['protectionGroupInstanceId'] > jobState['lastRunId']:
+                    jobState['v2RunId'] = run['id']
+                    out("New Job Run ID for %s: %s" % (jobState['name'], run['id']))
+                elif (jobState['runStartedUsecs'] + (newruntimeoutsecs * 1000000)) < nowUsecs:
+                    out("Timed out waiting for new run of %s to appear" % jobState['name'])
+                    jobState['exitCode'] = 6
+                    continue
+                else:
+                    continue
+            if run is None or run['id'] != jobState['v2RunId']:
+                # a later run has started since
+                run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=false' % (jobState['v2JobId'], jobState['v2RunId']), v=2)
+                if run is None:
+                    jobState['statusRetryCount'] += 1
+                    if jobState['statusRetryCount'] > statusretries:
+                        out("Timed out waiting for status update of %s" % jobState['name'])
+                        jobState['exitCode'] = 5
+                    continue
+            jobState['statusRetryCount'] = 0
+            if run is not None and 'localBackupInfo' in run and run['localBackupInfo'].get('status', None) in finishedStates:
+                status = run['localBackupInfo']['status']
+                out("%s finished with status: %s" % (jobState['name'], status))
+                if status == 'Failed' and len(run['localBackupInfo'].get('messages', None) or []) > 0:
+                    out('Error: %s' % run['localBackupInfo']['messages'][0])
+                if status == 'SucceededWithWarning' and len(run['localBackupInfo'].get('messages', None) or []) > 0:
+                    out('Warning: %s' % run['localBackupInfo']['messages'][0])
+                if status == 'Succeeded' or status == 'SucceededWithWarning':
+                    jobState['exitCode'] = 0
+                else:
+                    jobState['exitCode'] = 1
+
+    # report exit code of each job
+    out('\nExit codes:')
+    for jobState in jobStates:
+        out('    %s: %s' % (jobState['name'], jobState['exitCode']))
+    failedStates = [s for s in jobStates if s['exitCode'] != 0]
+    if len(failedStates) == 0:
+        bail(0)
+    elif extendederrorcodes is True:
+        bail(failedStates[0]['exitCode'])
+    else:
+        bail(1)
+
 job = [job for job in jobs if job['name'].lower() == jobName.lower() and ('isActive' not in job or job['isActive'] is not False)]
 
 if not job:
@@ -294,13 +716,7 @@ else:
         else:
             bail(1)
     if objectnames is not None:
-        if environment in ['kOracle', 'kSQL']:
-            backupJob = api('get', '/backupjobs/%s' % job['id'])
-            backupSources = api('get', '/backupsources?allUnderHierarchy=false&entityId=%s&excludeTypes=5&includeVMFolders=true' % backupJob[0]['backupJob']['parentSource']['id'])
-        if 'kAWS' in environment:
-            sources = api('get', 'protectionSources?environments=kAWS')
-        else:
-            sources = api('get', 'protectionSources?environments=%s' % environment)
+        objectCache = getObjectCache(job)
 
 # purge oracle logs
 if purgeoraclelogs and environment == 'kOracle' and backupType == 'kLog':
@@ -313,6 +729,23 @@ selectedSources = []
 runNowParameters = []
 if objectnames is not None:
     for objectname in objectnames:
+        # use the lookup from a previous run
+        cachedObject = objectCache['objects'].get(objectname.lower(), None)
+        if cachedObject is not None and environment in ['kSQL', 'kOracle'] and cachedObject['sourceId'] in job['sourceIds']:
+            if len([obj for obj in runNowParameters if obj['sourceId'] == cachedObject['sourceId']]) == 0:
+                runNowParameters.append({"sourceId": cachedObject['sourceId']})
+                selectedSources.append(cachedObject['sourceId'])
+            if cachedObject['databaseIds'] is not None:
+                for runNowParameter in runNowParameters:
+                    if runNowParameter['sourceId'] == cachedObject['sourceId']:
+                        runNowParameter['databaseIds'] = runNowParameter.get('databaseIds', []) + cachedObject['databaseIds']
+            continue
+        if cachedObject is not None and environment not in ['kSQL', 'kOracle']:
+            sourceIds.append(cachedObject['sourceId'])
+            selectedSources.append(cachedObject['sourceId'])
+            continue
+        getSources()
+        databaseIdCounts = dict([(p['sourceId'], len(p.get('databaseIds', []))) for p in runNowParameters])
         if environment == 'kSQL' or environment == 'kOracle':
             parts = objectname.split('/')
             if environment == 'kSQL':
@@ -420,8 +853,16 @@ if objectnames is not None:
                     bail(3)
                 else:
                     bail(1)
-
-finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning', 'kCanceling', '3', '4', '5', '6', 'Canceled', 'Succeeded', 'Failed', 'SucceededWithWarning']
+        # remember the lookup for next time
+        if environment == 'kSQL' or environment == 'kOracle':
+            cachedObject = {'sourceId': serverObjectId, 'databaseIds': None}
+            if instance is not None:
+                cachedObject['databaseIds'] = [i for p in runNowParameters for i in p.get('databaseIds', [])[databaseIdCounts.get(p['sourceId'], 0):]]
+        else:
+            cachedObject = {'sourceId': sourceId}
+        objectCache['objects'][objectname.lower()] = cachedObject
+        objectCache['updated'] = True
+    saveObjectCache(objectCache)
 
 # job parameters (base)
 # jobData = {
@@ -464,87 +905,8 @@ else:
 if len(runNowParameters) > 0:
     jobData['runNowParameters'] = runNowParameters
 
-# use base retention and copy targets from policy
-policy = api('get', 'protectionPolicies/%s' % job['policyId'])
-# if keepLocalFor is None:
-#     jobData['copyRunTargets'][0]['daysToKeep'] = policy['daysToKeep']
-
-# replication
-if localonly is not True and noreplica is not True:
-    if 'snapshotReplicationCopyPolicies' in policy and replicateTo is None:
-        for replica in policy['snapshotReplicationCopyPolicies']:
-            if replica['target'] not in [p.get('replicationTarget', None) for p in jobData['copyRunTargets']]:
-                if keepReplicaFor is not None:
-                    replica['daysToKeep'] = keepReplicaFor
-                jobData['copyRunTargets'].append({
-                    "daysToKeep": replica['daysToKeep'],
-                    "replicationTarget": replica['target'],
-                    "type": "kRemote"
-                })
-# archival
-if localonly is not True and noarchive is not True and backupType != 'kLog':
-    if 'snapshotArchivalCopyPolicies' in policy and archiveTo is None:
-        for archive in policy['snapshotArchivalCopyPolicies']:
-            if archive['target'] not in [p.get('archivalTarget', None) for p in jobData['copyRunTargets']]:
-                if keepArchiveFor is not None:
-                    archive['daysToKeep'] = keepArchiveFor
-                jobData['copyRunTargets'].append({
-                    "archivalTarget": archive['target'],
-                    "daysToKeep": archive['daysToKeep'],
-                    "type": "kArchival"
-                })
-
-# use copy targets specified at the command line
-if replicateTo is not None:
-    if keepReplicaFor is None:
-        out("--keepReplicaFor is required")
-        if extendederrorcodes is True:
-            bail(3)
-        else:
-            bail(1)
-    remote = [remote for remote in api('get', 'remoteClusters') if remote['name'].lower() == replicateTo.lower()]
-    if len(remote) > 0:
-        remote = remote[0]
-        jobData['copyRunTargets'].append({
-            "type": "kRemote",
-            "daysToKeep": keepReplicaFor,
-            "replicationTarget": {
-                "clusterId": remote['clusterId'],
-                "clusterName": remote['name']
-            }
-        })
-    else:
-        out("Remote Cluster %s not found!" % replicateTo)
-        if extendederrorcodes is True:
-            bail(3)
-        else:
-            bail(1)
-
-if archiveTo is not None:
-    if keepArchiveFor is None:
-        out("--keepArchiveFor is required")
-        if extendederrorcodes is True:
-            bail(3)
-        else:
-            bail(1)
-    vault = [vault for vault in api('get', 'vaults') if vault['name'].lower() == archiveTo.lower()]
-    if len(vault) > 0:
-        vault = vault[0]
-        jobData['copyRunTargets'].append({
-            "archivalTarget": {
-                "vaultId": vault['id'],
-                "vaultName": vault['name'],
-                "vaultType": "kCloud"
-            },
-            "daysToKeep": keepArchiveFor,
-            "type": "kArchival"
-        })
-    else:
-        out("Archive target %s not found!" % archiveTo)
-        if extendederrorcodes is True:
-            bail(3)
-        else:
-            bail(1)
+# use base retention and copy targets from policy, and copy targets specified at the command line
+getCopyRunTargets(job, jobData['copyRunTargets'])
 
 # get last run ID
 runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=1&includeObjectDetails=false' % v2JobId, v=2)
@@ -558,12 +920,12 @@ if purgeoraclelogs and environment == 'kOracle' and backupType == 'kLog':
         for dbparam in obj['dbParams']:
             if objectnames is not None:
                 for objectname in objectnames:
-                    if len(parts) == 2:
-                        (server, instance) = parts
+                    parts = objectname.split('/')
+                    if len(parts) >= 2:
+                        (server, instance) = parts[0:2]
                     else:
                         server = parts[0]
                         instance = None
-                        db = None
                     if server.lower() == obj['sourceName'].lower():
                         if instance is None or instance.lower() == dbparam['dbChannels'][0]['databaseUniqueName'].lower():
                             for channel in dbparam['dbChannels']:
@@ -584,6 +946,7 @@ nowUsecs = dateToUsecs(now.strftime("%Y-%m-%d %H:%M:%S"))
 startUsecs = dateToUsecs(now.strftime("%Y-%m-%d %H:%M:%S"))
 waitUntil = nowUsecs + (waitminutesifrunning * 60000000)
 reportWaiting = True
+sleepSecs = minsleepsecs
 if debugger:
     print(':DEBUG: waiting for new run to be accepted')
 runNow = api('post', "protectionJobs/run/%s" % job['id'], jobData, quiet=True)
@@ -610,7 +973,8 @@ while runNow != "":
             bail(4)
         else:
             bail(1)
-    sleep(sleeptimesecs)
+    sleep(sleepSecs)
+    sleepSecs = nextSleep(sleepSecs)
     if debugger:
         runNow = api('post', "protectionJobs/run/%s" % job['id'], jobData)
     else:
@@ -618,10 +982,12 @@ while runNow != "":
 out("Running %s..." % jobName)
 
 # wait for new job run to appear
+progressTaskId = None
 if wait is True:
     timeOutUsecs = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    sleepSecs = minsleepsecs
     while newRunId <= lastRunId:
-        sleep(15)
+        sleep(sleepSecs)
         if len(selectedSources) > 0:
             runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=10&includeObjectDetails=true' % v2JobId, v=2)
             if runs is not None and 'runs' in runs and len(runs['runs']) > 0:
@@ -638,6 +1004,7 @@ if wait is True:
                     if metadataFilePath == metadatafile:
                         newRunId = run['protectionGroupInstanceId']
                         v2RunId = run['id']
+                        progressTaskId = run['localBackupInfo'].get('progressTaskId', None)
                         break
                 except Exception:
                     print('error getting metadata')
@@ -645,6 +1012,7 @@ if wait is True:
         elif runs is not None and 'runs' not in runs and len(runs) > 0:
             newRunId = runs[0]['protectionGroupInstanceId']
             v2RunId = runs[0]['id']
+            progressTaskId = runs[0]['localBackupInfo'].get('progressTaskId', None)
         if debugger:
             print(':DEBUG: Previous Run ID: %s' % lastRunId)
             print(':DEBUG:   Latest Run ID: %s\n' % newRunId)
@@ -658,7 +1026,7 @@ if wait is True:
                 bail(1)
         if newRunId > lastRunId:
             break
-        sleep(sleeptimesecs)
+        sleepSecs = nextSleep(sleepSecs)
     out("New Job Run ID: %s" % v2RunId)
 
 # wait for job run to finish and report completion
@@ -666,16 +1034,44 @@ if wait is True:
     status = 'unknown'
     lastProgress = -1
     statusRetryCount = 0
+    sleepSecs = minsleepsecs
+    firstProgress = None  # (time, percent) of the first progress reading, for the rate of progress
     while status not in finishedStates:
         x = 0
         s = 0
-        sleep(15)
+        etaSecs = None
+        sleep(sleepSecs)
         try:
-            if exitstring:
-                run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=true' % (v2JobId, v2RunId), v=2)
-            else:
-                run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=false' % (v2JobId, v2RunId), v=2)
-            status = run['localBackupInfo']['status']
+            # while the progress monitor shows the run advancing, it is the only call per check
+            getRun = True
+            if progressTaskId is not None and not exitstring and lastProgress < 100:
+                progressMonitor = api('get', '/progressMonitors?taskPathVec=%s&excludeSubTasks=true&includeFinishedTasks=true' % progressTaskId, quiet=True)
+                try:
+                    taskProgress = progressMonitor['resultGroupVec'][0]['taskVec'][0]['progress']
+                    percentFinished = taskProgress['percentFinished']
+                except Exception:
+                    taskProgress = None
+                if taskProgress is not None:
+                    percentComplete = int(round(percentFinished))
+                    if percentComplete > lastProgress and taskProgress.get('status', 'kActive') == 'kActive' and percentComplete < 100:
+                        getRun = False
+                    if firstProgress is None:
+                        firstProgress = (time(), percentFinished)
+                    elif percentFinished > firstProgress[1]:
+                        etaSecs = (100 - percentFinished) * (time() - firstProgress[0]) / (percentFinished - firstProgress[1])
+                    if percentComplete >= 100:
+                        etaSecs = 0
+                    if progress and percentComplete > lastProgress:
+                        out('%s%% completed' % percentComplete)
+                    lastProgress = max(lastProgress, percentComplete)
+            if getRun is True:
+                if exitstring:
+                    run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=true' % (v2JobId, v2RunId), v=2)
+                else:
+                    run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=false' % (v2JobId, v2RunId), v=2)
+                status = run['localBackupInfo']['status']
+                if progressTaskId is None:
+                    progressTaskId = run['localBackupInfo'].get('progressTaskId', None)
             if exitstring:
                 while x < len(run['objects']) and s < exitstringtimeoutsecs:
                     sleep(15)
@@ -708,15 +1104,6 @@ if wait is True:
                 if x < len(run['objects']):
                     print('*** TIMED OUT WAITING FOR STRING MATCH')
                     exit(1)
-            if progress and lastProgress < 100 and 'progressTaskId' in run['localBackupInfo']:
-                sleep(15)
-                progressPath = run['localBackupInfo']['progressTaskId']
-                progressMonitor = api('get', '/progressMonitors?taskPathVec=%s&excludeSubTasks=true&includeFinishedTasks=false' % progressPath)
-                progressTotal = progressMonitor['resultGroupVec'][0]['taskVec'][0]['progress']['percentFinished']
-                percentComplete = int(round(progressTotal))
-                if percentComplete > lastProgress:
-                    out('%s%% completed' % percentComplete)
-                    lastProgress = percentComplete
             statusRetryCount = 0
         except Exception:
             statusRetryCount += 1
@@ -730,8 +1117,7 @@ if wait is True:
                     bail(5)
                 else:
                     bail(1)
-        if status not in finishedStates:
-            sleep(sleeptimesecs)
+        sleepSecs = nextSleep(sleepSecs, etaSecs)
     out("Job finished with status: %s" % run['localBackupInfo']['status'])
     if run['localBackupInfo']['status'] == 'Failed':
         out('Error: %s' % run['localBackupInfo']['messages'][0])
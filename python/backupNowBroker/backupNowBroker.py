@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+"""BackupNow Request Broker for python"""
+
+# version 2026.10.18
+
+# version history
+# ===============
+# 2026.10.18 - initial release
+
+### usage: ./backupNowBroker.py -v mycluster -u admin [-d local] [-port 8777] [-cw 5]
+
+# import pyhesity wrapper module
+from pyhesity import *
+from datetime import datetime
+from time import time
+from sys import exit
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--vip', type=str, default='helios.cohesity.com')
+parser.add_argument('-u', '--username', type=str, default='helios')
+parser.add_argument('-d', '--domain', type=str, default='local')
+parser.add_argument('-i', '--useApiKey', action='store_true')
+parser.add_argument('-p', '--password', type=str, default=None)
+parser.add_argument('-np', '--noprompt', action='store_true')
+parser.add_argument('-mcm', '--mcm', action='store_true')
+parser.add_argument('-c', '--clustername', type=str, default=None)
+parser.add_argument('-b', '--bind', type=str, default='127.0.0.1')
+parser.add_argument('-port', '--port', type=int, default=8777)
+parser.add_argument('-cw', '--coalescesecs', type=int, default=5)
+parser.add_argument('-mc', '--maxconcurrent', type=int, default=10)
+parser.add_argument('-bn', '--backupnow', type=str, default=None)
+parser.add_argument('-rk', '--resultkeepsecs', type=int, default=3600)
+parser.add_argument('-f', '--logfile', type=str, default=None)
+
+args = parser.parse_args()
+
+vip = args.vip
+username = args.username
+domain = args.domain
+useApiKey = args.useApiKey
+password = args.password
+noprompt = args.noprompt
+mcm = args.mcm
+clustername = args.clustername
+bind = args.bind
+port = args.port
+coalescesecs = args.coalescesecs
+maxconcurrent = args.maxconcurrent
+backupnow = args.backupnow
+resultkeepsecs = args.resultkeepsecs
+logfile = args.logfile
+
+if noprompt is True:
+    prompt = False
+else:
+    prompt = None
+
+if backupnow is None:
+    backupnow = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'backupNow.py')
+if os.path.exists(backupnow) is False:
+    print('%s not found (place backupNow.py in the same folder or use -bn, --backupnow)' % backupnow)
+    exit(1)
+
+# request options passed on to backupNow.py (name, parameter, kind)
+RUNOPTIONS = [
+    ('jobNames', '-j', 'list'),
+    ('objectnames', '-o', 'list'),
+    ('backupType', '-t', 'value'),
+    ('metadatafile', '-m', 'value'),
+    ('keepLocalFor', '-k', 'value'),
+    ('replicateTo', '-r', 'value'),
+    ('keepReplicaFor', '-kr', 'value'),
+    ('archiveTo', '-a', 'value'),
+    ('keepArchiveFor', '-ka', 'value'),
+    ('localonly', '-l', 'flag'),
+    ('noreplica', '-nr', 'flag'),
+    ('noarchive', '-na', 'flag'),
+    ('abortifrunning', '-x', 'flag'),
+    ('purgeoraclelogs', '-pl', 'flag'),
+    ('usepolicy', '-y', 'flag'),
+    ('enable', '-e', 'flag'),
+    ('waitminutesifrunning', '-n', 'value'),
+    ('cancelpreviousrunminutes', '-cp', 'value'),
+    ('newruntimeoutsecs', '-nrt', 'value')
+]
+
+BATCHES = []    # batches of coalesced requests, oldest first
+REQUESTS = {}   # request id: batch
+LOCK = threading.Condition()
+COUNTER = {'request': 0, 'batch': 0}
+
+if logfile is not None:
+    try:
+        log = open(logfile, 'a')
+    except Exception:
+        print('Unable to open log file %s' % logfile)
+        exit(1)
+
+
+def out(message):
+    message = '%s: %s' % (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), message)
+    print(message)
+    if logfile is not None:
+        log.write('%s\n' % message)
+        log.flush()
+
+
+def normalize(runRequest):
+    """validated run options (raises ValueError)"""
+    requestVip = runRequest.get('vip', None)
+    if requestVip is None:
+        raise ValueError('vip is required')
+    if ('%s' % requestVip).lower() != vip.lower() or ('%s' % (runRequest.get('clustername', None) or '')).lower() != (clustername or '').lower():
+        raise ValueError('broker is connected to %s%s, not %s%s' % (vip, ' (%s)' % clustername if clustername else '',
+                                                                   requestVip, ' (%s)' % runRequest['clustername'] if runRequest.get('clustername', None) else ''))
+    unknown = [k for k in runRequest if k not in ['vip', 'clustername'] + [name for (name, param, kind) in RUNOPTIONS]]
+    if len(unknown) > 0:
+        raise ValueError('unsupported options: %s' % ', '.join(sorted(unknown)))
+    options = {}
+    for (name, param, kind) in RUNOPTIONS:
+        value = runRequest.get(name, None)
+        if value is None or value is False or value == []:
+            continue
+        if kind == 'list':
+            if not isinstance(value, list):
+                value = [value]
+            value = sorted(set([('%s' % v).strip() for v in value if ('%s' % v).strip() != '']), key=lambda v: v.lower())
+            if len(value) == 0:
+                continue
+        elif kind == 'flag':
+            value = True
+        else:
+            value = '%s' % value
+        options[name] = value
+    if 'jobNames' not in options:
+        raise ValueError('jobNames is required')
+    if options.get('backupType', 'kRegular') not in ['kLog', 'kRegular', 'kFull']:
+        raise ValueError('backupType must be one of kLog, kRegular or kFull')
+    options['backupType'] = options.get('backupType', 'kRegular')
+    return options
+
+
+def submit(runRequest):
+    """add a request to the queued batch with the same options, or queue a new batch"""
+    options = normalize(runRequest)
+    key = json.dumps(options, sort_keys=True).lower()
+    jobs = set([j.lower() for j in options['jobNames']])
+    with LOCK:
+        busy = [b for b in BATCHES if b['state'] in ['queued', 'running'] and len(b['jobs'] & jobs) > 0]
+        batch = [b for b in BATCHES if b['key'] == key and b['state'] == 'queued']
+        if options.get('abortifrunning', False) is True and len(busy) > 0:
+            # answer now, like backupNow.py -x does when the job is already running
+            COUNTER['batch'] += 1
+            batch = {
+                'id': COUNTER['batch'],
+                'key': key,
+                'options': options,
+                'jobs': jobs,
+                'requests': [],
+                'created': time(),
+                'finished': time(),
+                'state': 'finished',
+                'exitCode': 0,
+                'output': '%s already running (batch %s)\n' % (', '.join(options['jobNames']), busy[0]['id']),
+                'event': threading.Event()
+            }
+            batch['event'].set()
+            BATCHES.append(batch)
+        elif len(batch) > 0:
+            batch = batch[0]
+        else:
+            COUNTER['batch'] += 1
+            batch = {
+                'id': COUNTER['batch'],
+                'key': key,
+                'options': options,
+                'jobs': jobs,
+                'requests': [],
+                'created': time(),
+                'finished': None,
+                'state': 'queued',
+                'exitCode': None,
+                'output': '',
+                'event': threading.Event()
+            }
+            BATCHES.append(batch)
+        COUNTER['request'] += 1
+        requestId = COUNTER['request']
+        batch['requests'].append(requestId)
+        REQUESTS[requestId] = batch
+        LOCK.notify_all()
+    if batch['state'] == 'finished':
+        out('request %s for %s (%s) answered: %s' % (requestId, ', '.join(options['jobNames']), ', '.join(options.get('objectnames', ['all objects'])), batch['output'].strip()))
+    else:
+        out('request %s for %s (%s) added to batch %s (%s requests)' % (requestId, ', '.join(options['jobNames']), ', '.join(options.get('objectnames', ['all objects'])), batch['id'], len(batch['requests'])))
+    return (requestId, batch)
+
+
+def command(batch):
+    """backupNow.py command line for a batch"""
+    cmd = [sys.executable, backupnow, '-v', vip, '-u', username, '-d', domain, '-np', '-w', '-ex']
+    if useApiKey is True:
+        cmd.append('-i')
+    if mcm is True:
+        cmd.append('-mcm')
+    if clustername is not None:
+        cmd += ['-c', clustername]
+    for (name, param, kind) in RUNOPTIONS:
+        value = batch['options'].get(name, None)
+        if value is None:
+            continue
+        if kind == 'list':
+            for v in value:
+                cmd += [param, v]
+        elif kind == 'flag':
+            cmd.append(param)
+        else:
+            cmd += [param, value]
+    return cmd
+
+
+def runBatch(batch):
+    """run backupNow.py for a batch and notify its waiting requests"""
+    try:
+        process = subprocess.Popen(command(batch), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate()[0]
+        exitCode = process.returncode
+        if not isinstance(output, str):
+            output = output.decode('utf-8', 'replace')
+    except Exception as e:
+        output = 'unable to run backupNow.py: %s\n' % e
+        exitCode = 1
+    with LOCK:
+        out('batch %s (%s) finished with exit code %s for %s requests' % (batch['id'], ', '.join(batch['options']['jobNames']), exitCode, len(batch['requests'])))
+        batch['output'] = output
+        batch['exitCode'] = exitCode
+        batch['finished'] = time()
+        batch['state'] = 'finished'
+        batch['event'].set()
+        LOCK.notify_all()
+
+
+def dispatcher():
+    """start queued batches once their coalesce window has passed and none of their jobs is busy"""
+    while True:
+        with LOCK:
+            now = time()
+            for batch in [b for b in BATCHES if b['state'] == 'finished' and now - b['finished'] > resultkeepsecs]:
+                BATCHES.remove(batch)
+                for requestId in batch['requests']:
+                    REQUESTS.pop(requestId, None)
+            busyJobs = set()
+            running = len([b for b in BATCHES if b['state'] == 'running'])
+            for batch in BATCHES:
+                if batch['state'] == 'running':
+                    busyJobs |= batch['jobs']
+            timeout = None
+            for batch in BATCHES:
+                if batch['state'] != 'queued':
+                    continue
+                if now - batch['created'] < coalescesecs:
+                    timeout = min(timeout or coalescesecs, coalescesecs - (now - batch['created']))
+                elif running < maxconcurrent and len(batch['jobs'] & busyJobs) == 0:
+                    batch['state'] = 'running'
+                    running += 1
+                    out('batch %s (%s) started for %s requests' % (batch['id'], ', '.join(batch['options']['jobNames']), len(batch['requests'])))
+                    thread = threading.Thread(target=runBatch, args=(batch,))
+                    thread.daemon = True
+                    thread.start()
+                # later batches for the same jobs wait their turn
+                busyJobs |= batch['jobs']
+            LOCK.wait(timeout or 60)
+
+
+def status(requestId, batch):
+    return {
+        'id': requestId,
+        'batch': batch['id'],
+        'state': batch['state'],
+        'requests': len(batch['requests']),
+        'jobNames': batch['options']['jobNames'],
+        'exitCode': batch['exitCode'],
+        'output': batch['output']
+    }
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, code, result):
+        body = json.dumps(result).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        """POST /runs - queue a run request"""
+        if urlparse(self.path).path != '/runs':
+            return self.send(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0) or 0)
+            runRequest = json.loads(self.rfile.read(length).decode('utf-8'))
+            (requestId, batch) = submit(runRequest)
+        except (ValueError, AttributeError) as e:
+            return self.send(400, {'error': '%s' % e})
+        with LOCK:
+            result = status(requestId, batch)
+        self.send(202, result)
+
+    def do_GET(self):
+        """GET /runs - list batches, GET /runs/<id>?waitsecs=60 - wait for a request to finish"""
+        url = urlparse(self.path)
+        if url.path == '/runs':
+            with LOCK:
+                result = [dict([(k, v) for (k, v) in status(b['requests'][0], b).items() if k not in ['id', 'output']]) for b in BATCHES]
+            return self.send(200, result)
+        m = re.match(r'^/runs/([0-9]+)$', url.path)
+        if m is None:
+            return self.send(404, {'error': 'not found'})
+        with LOCK:
+            batch = REQUESTS.get(int(m.group(1)), None)
+        if batch is None:
+            return self.send(404, {'error': 'request %s not found' % m.group(1)})
+        try:
+            waitsecs = int(parse_qs(url.query).get('waitsecs', ['0'])[0])
+        except ValueError:
+            waitsecs = 0
+        if waitsecs > 0:
+            batch['event'].wait(waitsecs)
+        with LOCK:
+            result = status(int(m.group(1)), batch)
+        self.send(200, result)
+
+
+# authenticate (and store the password for backupNow.py)
+if mcm:
+    apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, helios=True, prompt=prompt)
+else:
+    apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, prompt=prompt)
+
+if apiconnected() is False:
+    print('\nFailed to connect to Cohesity cluster')
+    exit(1)
+
+thread = threading.Thread(target=dispatcher)
+thread.daemon = True
+thread.start()
+
+server = ThreadingServer((bind, port), Handler)
+out('backupNow broker listening on %s:%s' % (bind, port))
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
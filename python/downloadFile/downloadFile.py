@@ -17,6 +17,7 @@ parser.add_argument('-d', '--domain', type=str, default='local')  # the Cohesity
 parser.add_argument('-o', '--objectname', type=str, required=True)  # the protected object to search
 parser.add_argument('-f', '--filesearch', type=str, required=True)  # partial filename to search for
 parser.add_argument('-p', '--destinationpath', type=str, required=True)  # local path to download file to
+parser.add_argument('-th', '--threads', type=int, default=4)  # number of parallel download streams
 
 args = parser.parse_args()
 
@@ -111,4 +112,5 @@ jobStartTimeUsecs = version['instanceId']['jobStartTimeUsecs']
 
 # download the file
 print('Downloading %s to %s' % (filename, destinationpath))
-fileDownload('/downloadfiles?attemptNum=%s&clusterId=%s&clusterIncarnationId=%s&entityId=%s&filepath=%s&jobId=%s&jobInstanceId=%s&jobStartTimeUsecs=%s&viewBoxId=%s' % (attemptNum, clusterId, clusterIncarnationId, entity[0]['id'], encodedfilePath, jobId, jobInstanceId, jobStartTimeUsecs, viewBoxId), outpath)
+if fileDownload('/downloadfiles?attemptNum=%s&clusterId=%s&clusterIncarnationId=%s&entityId=%s&filepath=%s&jobId=%s&jobInstanceId=%s&jobStartTimeUsecs=%s&viewBoxId=%s' % (attemptNum, clusterId, clusterIncarnationId, entity[0]['id'], encodedfilePath, jobId, jobInstanceId, jobStartTimeUsecs, viewBoxId), outpath, threads=args.threads) is not True:
+    exit(1)
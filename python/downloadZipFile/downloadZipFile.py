@@ -21,6 +21,7 @@ parser.add_argument('-pwd', '--password', type=str, default=None)
 parser.add_argument('-n', '--recoveryname', type=str, required=True)
 parser.add_argument('-t', '--tempdir', type=str, default=None)
 parser.add_argument('-r', '--recoverydir', type=str, required=True)
+parser.add_argument('-th', '--threads', type=int, default=4)
 args = parser.parse_args()
 
 vip = args.vip
@@ -74,7 +75,8 @@ if recoveries is not None and 'recoveries' in recoveries and len(recoveries['rec
         # download zip file
         downloadUrl = 'data-protect/recoveries/%s/downloadFiles?' % recovery['id']
         print('Downloading zip file...')
-        fileDownload(downloadUrl, fileName=zipfilePath, v=2)
+        if fileDownload(downloadUrl, fileName=zipfilePath, v=2, threads=args.threads) is not True:
+            exit(1)
         # extract zip file
         print('Extracting zip file to %s...' % recoverydir)
         with zipfile.ZipFile(zipfilePath, 'r') as zip_ref:
@@ -25,6 +25,8 @@ parser.add_argument('-a', '--confirmarchive', action='store_true')     # (option
 parser.add_argument('-at', '--archivetarget', type=str, default=None)  # (optional) archive target to confirm
 parser.add_argument('-n', '--numruns', type=int, default=1000)      # (optional) page size per API call
 parser.add_argument('-s', '--skipmonthlies', action='store_true')   # skip snapshots that land on the first of the month
+parser.add_argument('-th', '--threads', type=int, default=8)        # (optional) number of concurrent expirations
+parser.add_argument('-jf', '--journal', type=str, default=None)  # (optional) resume journal file (e.g. expireOldSnapshots-journal.jsonl)
 args = parser.parse_args()
 
 vip = args.vip
@@ -42,6 +44,8 @@ confirmarchive = args.confirmarchive
 archivetarget = args.archivetarget
 numruns = args.numruns
 skipmonthlies = args.skipmonthlies
+threads = args.threads
+journal = args.journal
 
 # authenticate
 apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, noretry=True)
@@ -81,91 +85,87 @@ nowUsecs = dateToUsecs(now.strftime("%Y-%m-%d %H:%M:%S"))
 
 print("Searching for old snapshots...")
 finishedStates = ['kSuccess', 'kFailure', 'kWarning']
+expireRuns = []
 
 for job in sorted(jobs, key=lambda job: job['name'].lower()):
     if len(jobnames) == 0 or job['name'].lower() in [j.lower() for j in jobnames]:
         print('\n%s' % job['name'])
-        endUsecs = nowUsecs
-        while 1:
-            runs = api('get', 'protectionRuns?jobId=%s&numRuns=%s&endTimeUsecs=%s&excludeTasks=true' % (job['id'], numruns, endUsecs))
-            if len(runs) > 0:
-                endUsecs = runs[-1]['backupRun']['stats']['startTimeUsecs'] - 1
-            else:
-                break
-            for run in runs:
-                if 'backupRun' in run:
-                    status = run['backupRun']['status']
-                    if status in finishedStates:
-                        startdate = usecsToDate(run['backupRun']['stats']['startTimeUsecs'])
-                        startdateusecs = run['backupRun']['stats']['startTimeUsecs']
+        for run in iterRuns(job, page=numruns, endUsecs=nowUsecs, params='excludeTasks=true'):
+            if 'backupRun' in run:
+                status = run['backupRun']['status']
+                if status in finishedStates:
+                    startdate = usecsToDate(run['backupRun']['stats']['startTimeUsecs'])
+                    startdateusecs = run['backupRun']['stats']['startTimeUsecs']
+                else:
+                    continue
+            elif 'copyRun' in run and len(run['copyRun']) > 0:
+                status = run['copyRun'][0]['status']
+                if status in finishedStates:
+                    startdate = usecsToDate(run['copyRun'][0]['runStartTimeUsecs'])
+                    startdateusecs = run['copyRun'][0]['runStartTimeUsecs']
+                else:
+                    continue
+            # check for replication
+            replicated = False
+            for copyRun in run['copyRun']:
+                if copyRun['target']['type'] == 'kRemote':
+                    if copyRun['status'] == 'kSuccess':
+                        if replicationtarget is None or copyRun['target']['replicationTarget']['clusterName'].lower() == replicationtarget.lower():
+                            replicated = True
+
+            # check for archive
+            archived = False
+            for copyRun in run['copyRun']:
+                if copyRun['target']['type'] == 'kArchival':
+                    if copyRun['status'] == 'kSuccess':
+                        if archivetarget is None or copyRun['target']['archivalTarget']['vaultName'].lower() == archivetarget.lower():
+                            archived = True
+
+            if startdateusecs < timeAgo(daystokeep, 'days') and run['backupRun']['snapshotsDeleted'] is False:
+                skip = False
+                if replicated is False and confirmreplication is True:
+                    skip = True
+                    if replicationtarget is not None:
+                        print("    Skipping %s (not replicated to %s)" % (startdate, replicationtarget))
                     else:
-                        continue
-                elif 'copyRun' in run and len(run['copyRun']) > 0:
-                    status = run['copyRun'][0]['status']
-                    if status in finishedStates:
-                        startdate = usecsToDate(run['copyRun'][0]['runStartTimeUsecs'])
-                        startdateusecs = run['copyRun'][0]['runStartTimeUsecs']
+                        print("    Skipping %s (not replicated)" % startdate)
+                elif archived is False and confirmarchive is True:
+                    skip = True
+                    if archivetarget is not None:
+                        print("    Skipping %s (not archived to %s)" % (startdate, archivetarget))
                     else:
-                        continue
-                # check for replication
-                replicated = False
-                for copyRun in run['copyRun']:
-                    if copyRun['target']['type'] == 'kRemote':
-                        if copyRun['status'] == 'kSuccess':
-                            if replicationtarget is None or copyRun['target']['replicationTarget']['clusterName'].lower() == replicationtarget.lower():
-                                replicated = True
-
-                # check for archive
-                archived = False
-                for copyRun in run['copyRun']:
-                    if copyRun['target']['type'] == 'kArchival':
-                        if copyRun['status'] == 'kSuccess':
-                            if archivetarget is None or copyRun['target']['archivalTarget']['vaultName'].lower() == archivetarget.lower():
-                                archived = True
-
-                if startdateusecs < timeAgo(daystokeep, 'days') and run['backupRun']['snapshotsDeleted'] is False:
-                    skip = False
-                    if replicated is False and confirmreplication is True:
-                        skip = True
-                        if replicationtarget is not None:
-                            print("    Skipping %s (not replicated to %s)" % (startdate, replicationtarget))
-                        else:
-                            print("    Skipping %s (not replicated)" % startdate)
-                    elif archived is False and confirmarchive is True:
-                        skip = True
-                        if archivetarget is not None:
-                            print("    Skipping %s (not archived to %s)" % (startdate, archivetarget))
-                        else:
-                            print("    Skipping %s (not archived)" % startdate)
-                    startdatetime = datetime.strptime(startdate, '%Y-%m-%d %H:%M:%S')
-                    if skipmonthlies is True and startdatetime.day == 1:
-                        skip = True
-                        print("    Skipping %s (monthly)" % startdate)
-                    if skip is False:
-                        if expire:
-                            exactRun = api('get', '/backupjobruns?exactMatchStartTimeUsecs=%s&id=%s' % (startdateusecs, job['id']))
-                            jobUid = exactRun[0]['backupJobRuns']['protectionRuns'][0]['backupRun']['base']['jobUid']
-                            expireRun = {
-                                "jobRuns":
-                                    [
-                                        {
-                                            "expiryTimeUsecs": 0,
-                                            "jobUid": {
-                                                "clusterId": jobUid['clusterId'],
-                                                "clusterIncarnationId": jobUid['clusterIncarnationId'],
-                                                "id": jobUid['objectId'],
-                                            },
-                                            "runStartTimeUsecs": startdateusecs,
-                                            "copyRunTargets": [
-                                                {
-                                                    "daysToKeep": 0,
-                                                    "type": "kLocal",
-                                                }
-                                            ]
-                                        }
-                                    ]
-                            }
-                            print("    Expiring %s" % startdate)
-                            api('put', 'protectionRuns', expireRun)
-                        else:
-                            print("    %s" % startdate)
+                        print("    Skipping %s (not archived)" % startdate)
+                startdatetime = datetime.strptime(startdate, '%Y-%m-%d %H:%M:%S')
+                if skipmonthlies is True and startdatetime.day == 1:
+                    skip = True
+                    print("    Skipping %s (monthly)" % startdate)
+                if skip is False:
+                    if expire:
+                        print("    Will expire %s" % startdate)
+                        expireRuns.append({
+                            "jobId": job['id'],
+                            "expiryTimeUsecs": 0,
+                            "runStartTimeUsecs": startdateusecs,
+                            "copyRunTargets": [
+                                {
+                                    "daysToKeep": 0,
+                                    "type": "kLocal",
+                                }
+                            ]
+                        })
+                    else:
+                        print("    %s" % startdate)
+
+# expire runs
+if len(expireRuns) > 0:
+    print('\nExpiring %s snapshots...' % len(expireRuns))
+    # daysToKeep 0 is absolute, so retrying an update that may have been applied is harmless
+    results = updateRuns(expireRuns, threads=threads, journal=journal, retry=True)
+    failed = [r for r in results if r['status'] == 'failed']
+    for result in failed:
+        jobName = [j['name'] for j in jobs if j['id'] == result['jobId']][0]
+        print('    Failed to expire %s %s: %s' % (jobName, usecsToDate(result['runStartTimeUsecs']), result['error']))
+    print('\n%s snapshots expired' % len([r for r in results if r['status'] in ['updated', 'resumed']]))
+    if len(failed) > 0:
+        print('%s snapshots failed to expire (re-run to retry)\n' % len(failed))
+        exit(1)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+"""Run a Chain of Dependent Jobs"""
+
+### usage: ./jobChainRunner.py -v mycluster -u myuser -d mydomain.net -g mychain -f mychain.txt [-mc 4] [-ms 1]
+
+### import pyhesity wrapper module
+from pyhesity import *
+from time import sleep
+from datetime import datetime
+import json
+import os
+
+### command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--vip', type=str, required=True)
+parser.add_argument('-u', '--username', type=str, required=True)
+parser.add_argument('-d', '--domain', type=str, default='local')
+parser.add_argument('-g', '--groupname', type=str, required=True)
+parser.add_argument('-f', '--chainfile', type=str, default=None)
+parser.add_argument('-n', '--new', action='store_true')
+parser.add_argument('-mc', '--maxconcurrent', type=int, default=4)
+parser.add_argument('-ms', '--maxperstoragedomain', type=int, default=1)
+parser.add_argument('-pj', '--pausejobs', action='store_true')
+parser.add_argument('-if', '--ignorefailures', action='store_true')
+parser.add_argument('-s', '--sleeptimesecs', type=int, default=60)
+parser.add_argument('-nrt', '--newruntimeoutsecs', type=int, default=1800)
+parser.add_argument('-wr', '--waitminutesifrunning', type=int, default=60)
+parser.add_argument('-k', '--keepLocalFor', type=int, default=5)
+parser.add_argument('-r', '--replicateTo', type=str, default=None)
+parser.add_argument('-kr', '--keepReplicaFor', type=int, default=5)
+parser.add_argument('-a', '--archiveTo', type=str, default=None)
+parser.add_argument('-ka', '--keepArchiveFor', type=int, default=5)
+parser.add_argument('-t', '--backupType', type=str, choices=['kLog', 'kRegular', 'kFull'], default='kRegular')
+
+args = parser.parse_args()
+
+vip = args.vip
+username = args.username
+domain = args.domain
+groupname = args.groupname
+chainfile = args.chainfile
+new = args.new
+maxconcurrent = args.maxconcurrent
+maxperstoragedomain = args.maxperstoragedomain
+pausejobs = args.pausejobs
+ignorefailures = args.ignorefailures
+sleeptimesecs = args.sleeptimesecs
+newruntimeoutsecs = args.newruntimeoutsecs
+waitminutesifrunning = args.waitminutesifrunning
+keepLocalFor = args.keepLocalFor
+replicateTo = args.replicateTo
+keepReplicaFor = args.keepReplicaFor
+archiveTo = args.archiveTo
+keepArchiveFor = args.keepArchiveFor
+backupType = args.backupType
+
+minsleepsecs = 5
+finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning', 'Canceled', 'Succeeded', 'Failed', 'SucceededWithWarning']
+successStates = ['kSuccess', 'kWarning', 'Succeeded', 'SucceededWithWarning']
+doneStates = ['succeeded', 'failed', 'skipped']
+
+scriptdir = os.path.dirname(os.path.realpath(__file__))
+statefile = os.path.join(scriptdir, '%s-chain.json' % groupname.lower())
+
+
+def out(message):
+    print('%s: %s' % (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), message))
+
+
+### read chain file (one job per line, optionally followed by a colon and the jobs it depends on)
+def readChain(chainfile):
+    chain = {'order': [], 'jobs': {}}
+    f = open(chainfile, 'r')
+    lines = [line.strip() for line in f.readlines() if line.strip() != '' and not line.strip().startswith('#')]
+    f.close()
+    for line in lines:
+        parts = line.split(':', 1)
+        jobName = parts[0].strip()
+        deps = []
+        if len(parts) > 1:
+            deps = [d.strip() for d in parts[1].split(',') if d.strip() != '']
+        if jobName.lower() in chain['jobs']:
+            chain['jobs'][jobName.lower()]['deps'] += [d for d in deps if d.lower() not in chain['jobs'][jobName.lower()]['deps']]
+            continue
+        chain['order'].append(jobName.lower())
+        chain['jobs'][jobName.lower()] = {
+            'name': jobName,
+            'deps': [d.lower() for d in deps],
+            'state': 'waiting',
+            'lastRunId': None,
+            'v2RunId': None,
+            'launchedUsecs': None,
+            'readyUsecs': None,
+            'status': None
+        }
+    # dependencies must be in the chain and must not loop
+    for jobName in chain['order']:
+        for dep in chain['jobs'][jobName]['deps']:
+            if dep not in chain['jobs']:
+                print('%s depends on %s, which is not in the chain' % (chain['jobs'][jobName]['name'], dep))
+                exit(1)
+    ordered = []
+    while len(ordered) < len(chain['order']):
+        ready = [j for j in chain['order'] if j not in ordered and len([d for d in chain['jobs'][j]['deps'] if d not in ordered]) == 0]
+        if len(ready) == 0:
+            print('dependency loop between %s' % ', '.join([chain['jobs'][j]['name'] for j in chain['order'] if j not in ordered]))
+            exit(1)
+        ordered += ready
+    chain['order'] = ordered
+    return chain
+
+
+def saveChain(chain):
+    tmpfile = '%s.%s.tmp' % (statefile, os.getpid())
+    f = open(tmpfile, 'w')
+    json.dump(chain, f, indent=2)
+    f.close()
+    try:
+        os.rename(tmpfile, statefile)
+    except OSError:
+        os.remove(statefile)
+        os.rename(tmpfile, statefile)
+
+
+def getLastRuns(v2JobIds):
+    """latest run of each job (one call for all jobs, None on error)"""
+    groups = api('get', 'data-protect/protection-groups?ids=%s&includeLastRunInfo=true' % ','.join(v2JobIds), v=2)
+    if groups is None or 'error' in groups:
+        return None
+    return dict([(g['id'], g['lastRun']) for g in groups.get('protectionGroups', None) or [] if 'lastRun' in g])
+
+
+### load saved chain (resume) or start a new one
+chain = None
+if new is not True and os.path.exists(statefile):
+    f = open(statefile, 'r')
+    chain = json.load(f)
+    f.close()
+    if len([j for j in chain['order'] if chain['jobs'][j]['state'] not in doneStates]) == 0:
+        chain = None
+    else:
+        out('resuming chain %s started %s' % (groupname, usecsToDate(chain['startedUsecs'])))
+if chain is None:
+    if chainfile is None:
+        print('-f, --chainfile is required to start a new chain')
+        exit(1)
+    chain = readChain(chainfile)
+    chain['startedUsecs'] = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+### authenticate
+apiauth(vip, username, domain)
+if apiconnected() is False:
+    print('\nFailed to connect to Cohesity cluster')
+    exit(1)
+
+cluster = api('get', 'cluster')
+
+### find jobs
+jobs = {}
+for job in api('get', 'protectionJobs'):
+    if job['name'].lower() in chain['jobs'] and ('isActive' not in job or job['isActive'] is not False):
+        jobs[job['name'].lower()] = job
+for jobName in chain['order']:
+    if jobName not in jobs and chain['jobs'][jobName]['state'] not in doneStates:
+        out("Job '%s' not found" % chain['jobs'][jobName]['name'])
+        chain['jobs'][jobName]['state'] = 'failed'
+        chain['jobs'][jobName]['status'] = 'not found'
+    elif jobName in jobs:
+        chain['jobs'][jobName]['v2JobId'] = '%s:%s:%s' % (cluster['id'], cluster['incarnationId'], jobs[jobName]['id'])
+
+### configure job run task
+copyRunTargets = [
+    {
+        "type": "kLocal",
+        "daysToKeep": keepLocalFor
+    }
+]
+
+if replicateTo is not None:
+    remote = [remote for remote in api('get', 'remoteClusters') if remote['name'].lower() == replicateTo.lower()]
+    if len(remote) > 0:
+        remote = remote[0]
+        copyRunTargets.append({
+            "type": "kRemote",
+            "daysToKeep": keepReplicaFor,
+            "replicationTarget": {
+                "clusterId": remote['clusterId'],
+                "clusterName": remote['name']
+            }
+        })
+    else:
+        print("Remote Cluster %s not found!" % replicateTo)
+        exit(1)
+
+if archiveTo is not None:
+    vault = [vault for vault in api('get', 'vaults') if vault['name'].lower() == archiveTo.lower()]
+    if len(vault) > 0:
+        vault = vault[0]
+        copyRunTargets.append({
+            "archivalTarget": {
+                "vaultId": vault['id'],
+                "vaultName": vault['name'],
+                "vaultType": "kCloud"
+            },
+            "daysToKeep": keepArchiveFor,
+            "type": "kArchival"
+        })
+    else:
+        print("Archive target %s not found!" % archiveTo)
+        exit(1)
+
+runNowTask = {
+    "copyRunTargets": copyRunTargets,
+    "sourceIds": [],
+    "runType": backupType
+}
+
+### pause jobs that are waiting in the chain (so they only run when their turn comes)
+if pausejobs is True:
+    for jobName in chain['order']:
+        if chain['jobs'][jobName]['state'] == 'waiting' and jobName in jobs and jobs[jobName].get('isPaused', False) is False:
+            api('post', 'protectionJobState/%s' % jobs[jobName]['id'], {'pause': True})
+
+### run the chain
+sleepSecs = minsleepsecs
+statusRetryCount = 0
+while True:
+    activeJobs = [j for j in chain['order'] if chain['jobs'][j]['state'] not in doneStates]
+    if len(activeJobs) == 0:
+        break
+
+    # one status query for every job that has not finished
+    lastRuns = getLastRuns([chain['jobs'][j]['v2JobId'] for j in activeJobs])
+    if lastRuns is None:
+        statusRetryCount += 1
+        if statusRetryCount > 10:
+            out('Timed out waiting for status update (chain state saved in %s)' % statefile)
+            exit(1)
+        sleep(sleepSecs)
+        continue
+    statusRetryCount = 0
+    nowUsecs = dateToUsecs(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    changed = False
+
+    # check runs in progress
+    for jobName in activeJobs:
+        chainJob = chain['jobs'][jobName]
+        if chainJob['state'] not in ['launching', 'running']:
+            continue
+        run = lastRuns.get(chainJob['v2JobId'], None)
+        if chainJob['v2RunId'] is None:
+            if run is not None and run['protectionGroupInstanceId'] > chainJob['lastRunId']:
+                chainJob['v2RunId'] = run['id']
+                chainJob['state'] = 'running'
+                changed = True
+            elif (chainJob['launchedUsecs'] + (newruntimeoutsecs * 1000000)) < nowUsecs:
+                if chainJob['state'] == 'launching':
+                    # interrupted before the run was accepted (and it never appeared), so run it again
+                    chainJob['state'] = 'waiting'
+                    chainJob['readyUsecs'] = None
+                    changed = True
+                    continue
+                out('Timed out waiting for new run of %s to appear' % chainJob['name'])
+                chainJob['state'] = 'failed'
+                chainJob['status'] = 'timed out waiting for new run'
+                changed = True
+                continue
+            else:
+                continue
+        if run is None or run['id'] != chainJob['v2RunId']:
+            # a later run has started since
+            run = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=false' % (chainJob['v2JobId'], chainJob['v2RunId']), v=2)
+        if run is not None and 'localBackupInfo' in run and run['localBackupInfo'].get('status', None) in finishedStates:
+            chainJob['status'] = run['localBackupInfo']['status']
+            if chainJob['status'] in successStates:
+                chainJob['state'] = 'succeeded'
+            else:
+                chainJob['state'] = 'failed'
+            out('%s finished with status: %s' % (chainJob['name'], chainJob['status']))
+            if pausejobs is True:
+                api('post', 'protectionJobState/%s' % jobs[jobName]['id'], {'pause': True})
+            changed = True
+
+    # launch jobs whose dependencies have finished (within the concurrency limits)
+    inFlight = [j for j in chain['order'] if chain['jobs'][j]['state'] in ['launching', 'running']]
+    for jobName in chain['order']:
+        chainJob = chain['jobs'][jobName]
+        if chainJob['state'] != 'waiting':
+            continue
+        depStates = [chain['jobs'][d]['state'] for d in chainJob['deps']]
+        if ignorefailures is not True and len([s for s in depStates if s in ['failed', 'skipped']]) > 0:
+            out('Skipping %s (a job it depends on did not succeed)' % chainJob['name'])
+            chainJob['state'] = 'skipped'
+            changed = True
+            continue
+        if len([s for s in depStates if s not in doneStates]) > 0:
+            continue
+        if len(inFlight) >= maxconcurrent:
+            continue
+        storageDomainId = jobs[jobName].get('viewBoxId', None)
+        if len([j for j in inFlight if jobs[j].get('viewBoxId', None) == storageDomainId]) >= maxperstoragedomain:
+            continue
+        if chainJob.get('readyUsecs', None) is None:
+            chainJob['readyUsecs'] = nowUsecs
+        elif (chainJob['readyUsecs'] + (waitminutesifrunning * 60000000)) < nowUsecs:
+            out('Timed out waiting for existing run of %s to finish' % chainJob['name'])
+            chainJob['state'] = 'failed'
+            chainJob['status'] = 'timed out waiting for existing run'
+            changed = True
+            continue
+        lastRun = lastRuns.get(chainJob['v2JobId'], None)
+        chainJob['lastRunId'] = 0
+        if lastRun is not None:
+            chainJob['lastRunId'] = lastRun['protectionGroupInstanceId']
+            if lastRun.get('localBackupInfo', {}).get('status', None) not in finishedStates:
+                continue  # wait for the existing run to finish
+        chainJob['state'] = 'launching'
+        chainJob['launchedUsecs'] = nowUsecs
+        saveChain(chain)
+        if pausejobs is True:
+            api('post', 'protectionJobState/%s' % jobs[jobName]['id'], {'pause': False})
+        runNow = api('post', 'protectionJobs/run/%s' % jobs[jobName]['id'], runNowTask, quiet=True)
+        if runNow == "":
+            out('Running %s...' % chainJob['name'])
+            chainJob['state'] = 'running'
+            inFlight.append(jobName)
+            changed = True
+            continue
+        if pausejobs is True:
+            api('post', 'protectionJobState/%s' % jobs[jobName]['id'], {'pause': True})
+        if 'TARGET_NOT_IN_POLICY_NOT_ALLOWED' in LAST_API_ERROR():
+            out('%s: %s' % (chainJob['name'], LAST_API_ERROR()))
+            chainJob['state'] = 'failed'
+            chainJob['status'] = LAST_API_ERROR()
+            changed = True
+        else:
+            # probably already running, try again next time (until waitminutesifrunning)
+            chainJob['state'] = 'waiting'
+
+    saveChain(chain)
+    if len([j for j in chain['order'] if chain['jobs'][j]['state'] not in doneStates]) == 0:
+        break
+    if changed is True:
+        sleepSecs = minsleepsecs
+    sleep(sleepSecs)
+    sleepSecs = min(sleeptimesecs, sleepSecs * 2)
+
+### report
+print('')
+for jobName in chain['order']:
+    print('%s: %s%s' % (chain['jobs'][jobName]['name'], chain['jobs'][jobName]['state'], ' (%s)' % chain['jobs'][jobName]['status'] if chain['jobs'][jobName]['status'] else ''))
+if len([j for j in chain['order'] if chain['jobs'][j]['state'] != 'succeeded']) > 0:
+    exit(1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""run scripts against the mock Cohesity server and record wall time, api calls and peak memory"""
+
+# usage: ./benchmark.py [ -s storagePerObjectReport ] [ -n 3 ] [ -o results.jsonl ] [ -- mockCohesity options ]
+
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.request import urlopen
+
+SCRIPTDIR = os.path.dirname(os.path.realpath(__file__))
+REPODIR = os.path.dirname(os.path.dirname(SCRIPTDIR))
+PYTHONDIR = os.path.join(REPODIR, 'python')
+
+# scenario name: (script path relative to the repo, arguments) - {vip} is replaced with the mock server address
+SCENARIOS = {
+    'storagePerObjectReport': ('reports/python/storagePerObjectReport/storagePerObjectReport.py',
+                               ['-v', '{vip}', '-u', 'admin', '-pwd', 'admin']),
+    'backupNow': ('python/backupNow/backupNow.py',
+                  ['-v', '{vip}', '-u', 'admin', '-p', 'admin', '-j', 'job-0001']),
+    'backupNowWait': ('python/backupNow/backupNow.py',
+                      ['-v', '{vip}', '-u', 'admin', '-p', 'admin', '-j', 'job-0002', '-w']),
+    'backupNowMulti': ('python/backupNow/backupNow.py',
+                       ['-v', '{vip}', '-u', 'admin', '-p', 'admin', '-j', 'job-0003', '-j', 'job-0004', '-j', 'job-0005', '-j', 'job-0006', '-w']),
+    'backedUpFileList': ('python/backedUpFileList/backedUpFileList.py',
+                         ['-v', '{vip}', '-u', 'admin', '-pwd', 'admin', '-s', 'vm-0001-0001', '-j', 'job-0001']),
+    'expireOldSnapshotsDryRun': ('python/expireOldSnapshots/expireOldSnapshots.py',
+                                 ['-v', '{vip}', '-u', 'admin', '-pwd', 'admin', '-k', '7'])
+}
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-s', '--scenario', action='append', type=str)   # scenarios to run (default is all)
+parser.add_argument('-n', '--repeat', type=int, default=1)           # runs per scenario
+parser.add_argument('-p', '--port', type=int, default=8443)          # mock server port
+parser.add_argument('-o', '--outfile', type=str, default=None)       # append results to this JSON lines file
+parser.add_argument('-t', '--tag', type=str, default=None)           # label for this set of results (e.g. git commit)
+parser.add_argument('-k', '--keepoutput', action='store_true')       # keep script output folders
+parser.add_argument('-py', '--python', type=str, default=sys.executable)  # python interpreter for the scripts
+parser.add_argument('mockargs', nargs=argparse.REMAINDER)            # options passed to mockCohesity.py (after --)
+args = parser.parse_args()
+
+scenarios = args.scenario or sorted(SCENARIOS.keys())
+for scenario in scenarios:
+    if scenario not in SCENARIOS:
+        print('unknown scenario %s (choices are %s)' % (scenario, ', '.join(sorted(SCENARIOS.keys()))))
+        exit(1)
+
+mockargs = [a for a in args.mockargs if a != '--']
+vip = '127.0.0.1:%s' % args.port
+unverified = ssl._create_unverified_context()
+
+
+def mock(path):
+    return json.loads(urlopen('https://%s/mock/%s' % (vip, path), context=unverified, timeout=30).read().decode('utf-8'))
+
+
+# start mock server
+server = subprocess.Popen([sys.executable, os.path.join(SCRIPTDIR, 'mockCohesity.py'), '-q', '-p', str(args.port)] + mockargs,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+listening = server.stdout.readline().decode('utf-8')  # printed once the port is bound (or the start up error)
+started = None
+for i in range(100):
+    if server.poll() is not None:
+        break
+    try:
+        mock('stats')
+        started = True
+        break
+    except Exception:
+        time.sleep(0.2)
+# fail if the mock server exited (e.g. the port is in use), rather than benchmarking whatever else answers on the port
+if started is None or server.poll() is not None or not listening.startswith('mock cluster listening'):
+    try:
+        output = server.communicate(timeout=10)[0]
+    except subprocess.TimeoutExpired:
+        server.kill()
+        output = server.communicate()[0]
+    print('mock server failed to start:\n%s%s' % (listening, output.decode('utf-8')))
+    exit(1)
+print(listening.strip())
+
+results = []
+try:
+    print('\n%-26s %4s %9s %8s %11s %6s' % ('scenario', 'run', 'seconds', 'calls', 'peak MiB', 'exit'))
+    print('%-26s %4s %9s %8s %11s %6s' % ('--------', '---', '-------', '-----', '--------', '----'))
+    for scenario in scenarios:
+        (script, scriptargs) = SCENARIOS[scenario]
+        for n in range(args.repeat):
+            mock('reset')
+            workdir = tempfile.mkdtemp(prefix='benchmark-%s-' % scenario)
+            env = dict(os.environ)
+            env['HOME'] = workdir  # no cached tokens or responses from earlier runs
+            env['PYHESITY_LOGFILE'] = os.path.join(workdir, 'pyhesity-debug.log')  # keep the debug log out of the repo
+            env['PYTHONPATH'] = PYTHONDIR + os.pathsep + env.get('PYTHONPATH', '')
+            command = [args.python, os.path.join(REPODIR, script)] + [a.replace('{vip}', vip) for a in scriptargs]
+            outfile = open(os.path.join(workdir, 'output.txt'), 'w')
+            start = time.time()
+            process = subprocess.Popen(command, cwd=workdir, env=env, stdout=outfile, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+            (pid, status, usage) = os.wait4(process.pid, 0)
+            elapsed = time.time() - start
+            outfile.close()
+            exitcode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status >> 8
+            calls = mock('stats')
+            peakbytes = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+            result = {
+                'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'tag': args.tag,
+                'scenario': scenario,
+                'mockargs': ' '.join(mockargs),
+                'seconds': round(elapsed, 3),
+                'apiCalls': calls['total'],
+                'calls': calls['calls'],
+                'peakMemoryBytes': peakbytes,
+                'exitCode': exitcode
+            }
+            results.append(result)
+            print('%-26s %4s %9.2f %8s %11.1f %6s' % (scenario, n + 1, elapsed, calls['total'], peakbytes / 1048576.0, exitcode))
+            if args.keepoutput:
+                print('    output in %s' % workdir)
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+finally:
+    server.terminate()
+    server.wait()
+
+if args.outfile is not None:
+    with open(args.outfile, 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+    print('\nResults appended to %s' % args.outfile)
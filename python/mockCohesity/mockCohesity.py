@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""mock Cohesity REST API server (synthetic data for testing and benchmarking scripts)"""
+
+# usage: ./mockCohesity.py [ -p 8443 ] [ -j 10 ] [ -r 30 ] [ -o 10 ] [ -f 100 ] [ -l 20 ]
+
+import argparse
+import json
+import os
+import re
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-p', '--port', type=int, default=8443)           # port to listen on
+parser.add_argument('-b', '--bind', type=str, default='127.0.0.1')    # address to listen on
+parser.add_argument('-j', '--jobs', type=int, default=10)             # number of protection jobs
+parser.add_argument('-r', '--runs', type=int, default=30)             # runs per job (one per day)
+parser.add_argument('-o', '--objects', type=int, default=10)          # objects (VMs) per job
+parser.add_argument('-f', '--files', type=int, default=100)           # files per directory
+parser.add_argument('-sd', '--subdirs', type=int, default=3)          # subdirectories per directory
+parser.add_argument('-dd', '--dirdepth', type=int, default=2)         # directory depth
+parser.add_argument('-vw', '--views', type=int, default=10)           # number of views
+parser.add_argument('-rt', '--restoretasks', type=int, default=20)    # number of restore tasks
+parser.add_argument('-al', '--auditlogs', type=int, default=2500)     # number of audit log entries
+parser.add_argument('-l', '--latency', type=int, default=0)           # latency per call (milliseconds)
+parser.add_argument('-rs', '--runsecs', type=int, default=30)         # seconds a new run takes to finish
+parser.add_argument('-c', '--certfile', type=str, default=None)       # certificate (created if missing)
+parser.add_argument('-q', '--quiet', action='store_true')             # don't log calls
+args = parser.parse_args()
+
+CLUSTERID = 1234567890
+INCARNATIONID = 1600000000000
+CLUSTERNAME = 'mockcluster'
+VCENTERID = 1
+DAYUSECS = 86400000000
+NOWUSECS = int(time.time() * 1000000)
+GIB = 1024 * 1024 * 1024
+PAGESIZE = 1000  # directoryList entries per page
+
+CALLS = {}
+CALLSLOCK = threading.Lock()
+NEWRUNS = {}  # jobId: list of runs started by protectionJobs/run
+RUNSLOCK = threading.RLock()
+IDPATTERN = re.compile(r'/([0-9]+(:[0-9]+)*)(?=/|$)')
+
+
+### synthetic dataset
+def jobId(j):
+    return 100 + j
+
+
+def jobIndex(jid):
+    return int(jid) - 100
+
+
+def v2JobId(jid):
+    return '%s:%s:%s' % (CLUSTERID, INCARNATIONID, jid)
+
+
+def jobName(j):
+    return 'job-%04d' % (j + 1)
+
+
+def objectId(j, o):
+    return 1000 + j * args.objects + o
+
+
+def objectName(j, o):
+    return 'vm-%04d-%04d' % (j + 1, o + 1)
+
+
+def findObject(name):
+    m = re.match(r'^vm-([0-9]+)-([0-9]+)$', name.lower())
+    if m is None:
+        return None
+    (j, o) = (int(m.group(1)) - 1, int(m.group(2)) - 1)
+    if j < 0 or j >= args.jobs or o < 0 or o >= args.objects:
+        return None
+    return (j, o)
+
+
+def runs(j):
+    """list of (instanceId, startTimeUsecs, endTimeUsecs, status) newest first"""
+    jid = jobId(j)
+    with RUNSLOCK:
+        newruns = list(NEWRUNS.get(jid, []))
+    result = []
+    for run in reversed(newruns):
+        endUsecs = run['startTimeUsecs'] + args.runsecs * 1000000
+        status = 'Succeeded' if time.time() * 1000000 >= endUsecs else 'Running'
+        result.append((run['instanceId'], run['startTimeUsecs'], endUsecs, status))
+    for i in range(args.runs):
+        startUsecs = NOWUSECS - (i + 1) * DAYUSECS + j * 60000000
+        result.append((args.runs - i, startUsecs, startUsecs + 600000000, 'Succeeded'))
+    return result
+
+
+def isArchived(run):
+    """weekly archive to the S3 vault"""
+    return run[3] == 'Succeeded' and run[0] % 7 == 0
+
+
+def v2Run(j, run, details=False):
+    (instanceId, startUsecs, endUsecs, status) = run
+    result = {
+        'id': '%s:%s' % (instanceId, startUsecs),
+        'protectionGroupInstanceId': instanceId,
+        'protectionGroupId': v2JobId(jobId(j)),
+        'protectionGroupName': jobName(j),
+        'isReplicationRun': False,
+        'localBackupInfo': {
+            'runType': 'kRegular',
+            'status': status,
+            'startTimeUsecs': startUsecs,
+            'progressTaskId': 'backup_%s_%s' % (jobId(j), instanceId),
+            'messages': []
+        }
+    }
+    if status != 'Running':
+        result['localBackupInfo']['endTimeUsecs'] = endUsecs
+    if isArchived(run):
+        result['archivalInfo'] = {
+            'archivalTargetResults': [{
+                'targetId': 9,
+                'targetName': 'S3',
+                'targetType': 'Cloud',
+                'status': 'Succeeded',
+                'startTimeUsecs': endUsecs,
+                'endTimeUsecs': endUsecs + 600000000,
+                'expiryTimeUsecs': startUsecs + 90 * DAYUSECS,
+                'stats': {'logicalBytesTransferred': args.objects * 50 * GIB, 'physicalBytesTransferred': args.objects * 1048576}
+            }]
+        }
+    if details:
+        result['objects'] = []
+        for o in range(args.objects):
+            result['objects'].append({
+                'object': {
+                    'id': objectId(j, o),
+                    'name': objectName(j, o),
+                    'sourceId': VCENTERID,
+                    'environment': 'kVMware',
+                    'objectType': 'kVirtualMachine'
+                },
+                'localSnapshotInfo': {
+                    'snapshotInfo': {
+                        'status': 'kSuccessful',
+                        'startTimeUsecs': startUsecs,
+                        'endTimeUsecs': endUsecs,
+                        'stats': {
+                            'logicalSizeBytes': (50 + o) * GIB,
+                            'bytesWritten': (o + 1) * 1048576,
+                            'bytesRead': (o + 1) * 10485760
+                        }
+                    }
+                }
+            })
+    return result
+
+
+def v1Run(j, run):
+    (instanceId, startUsecs, endUsecs, status) = run
+    v1status = 'kSuccess' if status == 'Succeeded' else 'kRunning'
+    return {
+        'jobId': jobId(j),
+        'jobName': jobName(j),
+        'backupRun': {
+            'jobRunId': instanceId,
+            'runType': 'kRegular',
+            'status': v1status,
+            'snapshotsDeleted': False,
+            'stats': {'startTimeUsecs': startUsecs, 'endTimeUsecs': endUsecs, 'totalBytesReadFromSource': 10485760}
+        },
+        'copyRun': [{
+            'target': {'type': 'kLocal'},
+            'status': v1status,
+            'runStartTimeUsecs': startUsecs,
+            'expiryTimeUsecs': startUsecs + 30 * DAYUSECS
+        }] + ([{
+            'target': {'type': 'kArchival', 'archivalTarget': {'vaultId': 9, 'vaultName': 'S3', 'vaultType': 'kCloud'}},
+            'status': 'kSuccess',
+            'runStartTimeUsecs': startUsecs,
+            'expiryTimeUsecs': startUsecs + 90 * DAYUSECS,
+            'stats': {'logicalBytesTransferred': args.objects * 50 * GIB, 'physicalBytesTransferred': args.objects * 1048576}
+        }] if isArchived(run) else [])
+    }
+
+
+def v1Job(j):
+    return {
+        'id': jobId(j),
+        'name': jobName(j),
+        'environment': 'kVMware',
+        'policyId': '%s:%s:1' % (CLUSTERID, INCARNATIONID),
+        'viewBoxId': 5,
+        'parentSourceId': VCENTERID,
+        'sourceIds': [objectId(j, o) for o in range(args.objects)],
+        'isActive': True,
+        'isPaused': False,
+        'modificationTimeUsecs': NOWUSECS - 30 * DAYUSECS
+    }
+
+
+def v2Job(j):
+    return {
+        'id': v2JobId(jobId(j)),
+        'name': jobName(j),
+        'environment': 'kVMware',
+        'policyId': '%s:%s:1' % (CLUSTERID, INCARNATIONID),
+        'storageDomainId': 5,
+        'isActive': True,
+        'isDeleted': False,
+        'isPaused': False,
+        'vmwareParams': {
+            'sourceId': VCENTERID,
+            'objects': [{'id': objectId(j, o), 'name': objectName(j, o)} for o in range(args.objects)]
+        }
+    }
+
+
+def vcenter():
+    vms = []
+    for j in range(args.jobs):
+        for o in range(args.objects):
+            vms.append({
+                'protectionSource': {
+                    'id': objectId(j, o),
+                    'parentId': 2,
+                    'name': objectName(j, o),
+                    'environment': 'kVMware',
+                    'vmWareProtectionSource': {'type': 'kVirtualMachine', 'name': objectName(j, o)}
+                }
+            })
+    return {
+        'protectionSource': {
+            'id': VCENTERID,
+            'name': 'vcenter.mock.local',
+            'environment': 'kVMware',
+            'vmWareProtectionSource': {'type': 'kVCenter', 'name': 'vcenter.mock.local'}
+        },
+        'registrationInfo': {'refreshTimeUsecs': NOWUSECS},
+        'protectedSourcesSummary': [{'environment': 'kVMware', 'leavesCount': len(vms), 'totalLogicalSize': len(vms) * 50 * GIB}],
+        'nodes': [{
+            'protectionSource': {
+                'id': 2,
+                'parentId': VCENTERID,
+                'name': 'Datacenter',
+                'environment': 'kVMware',
+                'vmWareProtectionSource': {'type': 'kDatacenter', 'name': 'Datacenter'}
+            },
+            'nodes': vms
+        }]
+    }
+
+
+def searchVm(j, o):
+    return {
+        'vmDocument': {
+            'objectName': objectName(j, o),
+            'jobName': jobName(j),
+            'backupType': 0,
+            'objectId': {
+                'jobId': jobId(j),
+                'jobUid': {'clusterId': CLUSTERID, 'clusterIncarnationId': INCARNATIONID, 'objectId': jobId(j)},
+                'entity': {'id': objectId(j, o), 'displayName': objectName(j, o), 'type': 1}
+            },
+            'registeredSource': {'id': VCENTERID, 'displayName': 'vcenter.mock.local', 'type': 1},
+            'versions': [{
+                'instanceId': {'attemptNum': 1, 'jobInstanceId': run[0], 'jobStartTimeUsecs': run[1]},
+                'snapshotTimestampUsecs': run[1],
+                'numEntriesIndexed': 0,
+                'indexingStatus': 0,
+                'replicaInfo': {'replicaVec': [{'target': {'type': 1}, 'expiryTimeUsecs': run[1] + 30 * DAYUSECS}] + ([
+                    {'target': {'type': 3, 'archivalTarget': {'vaultId': 9, 'name': 'S3', 'type': 0}}, 'expiryTimeUsecs': run[1] + 90 * DAYUSECS}
+                ] if isArchived(run) else [])}
+            } for run in runs(j) if run[3] == 'Succeeded']
+        }
+    }
+
+
+def directoryList(dirPath, cookie=0):
+    dirPath = '/' + '/'.join([p for p in dirPath.split('/') if p != ''])
+    depth = len([p for p in dirPath.split('/') if p != ''])
+    names = []
+    if depth < args.dirdepth:
+        names += [('dir%02d' % d, 'kDirectory') for d in range(args.subdirs)]
+    names += [('file%05d.dat' % f, 'kFile') for f in range(args.files)]
+    page = names[cookie:cookie + PAGESIZE]
+    entries = []
+    for (name, entryType) in page:
+        entry = {'name': name, 'type': entryType, 'fullPath': '%s/%s' % (dirPath.rstrip('/'), name)}
+        entry['fstatInfo'] = {'size': 0 if entryType == 'kDirectory' else 4096 * (len(name) + depth), 'mtimeUsecs': NOWUSECS - depth * DAYUSECS}
+        entries.append(entry)
+    result = {'entries': entries}
+    if cookie + PAGESIZE < len(names):
+        result['cookie'] = str(cookie + PAGESIZE)
+    return result
+
+
+def consumerStats(name, consumerId):
+    return {
+        'id': consumerId,
+        'name': name,
+        'stats': {
+            'dataInBytes': 100 * GIB,
+            'dataInBytesAfterDedup': 40 * GIB,
+            'dataWrittenBytes': 20 * GIB,
+            'storageConsumedBytes': 40 * GIB,
+            'storageConsumedBytesPrev': 38 * GIB
+        }
+    }
+
+
+def view(v):
+    return {
+        'viewId': 10000 + v,
+        'name': 'view-%04d' % (v + 1),
+        'storageDomainId': 5,
+        'storageDomainName': 'DefaultStorageDomain',
+        'stats': {'dataUsageStats': {'totalLogicalUsageBytes': 10 * GIB, 'dataInBytes': 10 * GIB, 'dataInBytesAfterDedup': 5 * GIB, 'dataWrittenBytes': 4 * GIB, 'localTotalPhysicalUsageBytes': 8 * GIB}}
+    }
+
+
+def auditLog(n):
+    return {
+        'timestampUsecs': NOWUSECS - n * 600000000,
+        'username': 'admin',
+        'domain': 'LOCAL',
+        'entityName': jobName(n % max(1, args.jobs)),
+        'entityType': 'ProtectionGroup',
+        'action': 'Modify',
+        'ip': '10.0.0.%s' % (n % 250 + 1),
+        'details': 'User admin modified protection group %s' % jobName(n % max(1, args.jobs))
+    }
+
+
+def restoreTask(t):
+    return {
+        'id': 50000 + t,
+        'name': 'Recover-VMs-%04d' % (t + 1),
+        'type': 'kRecoverVMs',
+        'status': 'kFinished',
+        'startTimeUsecs': NOWUSECS - t * 3600000000,
+        'endTimeUsecs': NOWUSECS - t * 3600000000 + 600000000,
+        'objects': [{'jobId': jobId(t % max(1, args.jobs)), 'protectionSourceId': objectId(t % max(1, args.jobs), 0)}]
+    }
+
+
+def timeSeries(query):
+    startMsecs = int(query.get('startTimeMsecs', [NOWUSECS // 1000 - 86400000])[0])
+    endMsecs = int(query.get('endTimeMsecs', [NOWUSECS // 1000])[0])
+    interval = int(query.get('rollupIntervalSecs', [3600])[0]) * 1000
+    points = []
+    t = startMsecs
+    while t <= endMsecs and len(points) < 10000:
+        points.append({'timestampMsecs': t, 'data': {'int64Value': 100 * GIB + (t // interval) % 1000 * 1048576}})
+        t += interval
+    return {'metricName': query.get('metricName', [''])[0], 'dataPointVec': points}
+
+
+### request routing
+def routeGet(path, query):
+    q = dict([(k, v[0]) for k, v in query.items()])
+    v1 = re.match(r'^/irisservices/api/v1(/public)?/(.*)$', path)
+    v2 = re.match(r'^/v2/(.*)$', path)
+    if v1 is not None:
+        resource = v1.group(2)
+        if resource == 'cluster':
+            return (200, {'id': CLUSTERID, 'incarnationId': INCARNATIONID, 'name': CLUSTERNAME, 'clusterSoftwareVersion': '7.1.mock',
+                          'stats': {'usagePerfStats': {'dataInBytes': 100 * GIB, 'dataInBytesAfterReduction': 25 * GIB, 'dataInBytesAfterjobReduction': 25 * GIB}}})
+        if resource == 'protectionJobs':
+            return (200, [v1Job(j) for j in range(args.jobs)])
+        m = re.match(r'^protectionJobs/([0-9]+)$', resource)
+        if m is not None and 0 <= jobIndex(m.group(1)) < args.jobs:
+            return (200, v1Job(jobIndex(m.group(1))))
+        if resource == 'protectionPolicies':
+            return (200, [{'id': '%s:%s:1' % (CLUSTERID, INCARNATIONID), 'name': 'Gold', 'daysToKeep': 30}])
+        if resource.startswith('protectionPolicies/'):
+            return (200, {'id': '%s:%s:1' % (CLUSTERID, INCARNATIONID), 'name': 'Gold', 'daysToKeep': 30})
+        if resource == 'protectionRuns':
+            jobs = range(args.jobs)
+            if 'jobId' in q:
+                jobs = [jobIndex(q['jobId'])]
+            numRuns = int(q.get('numRuns', 1000))
+            endUsecs = int(q.get('endTimeUsecs', 0)) or None
+            result = []
+            for j in jobs:
+                if 0 <= j < args.jobs:
+                    result += [v1Run(j, r) for r in runs(j) if endUsecs is None or r[1] <= endUsecs][:numRuns]
+            return (200, result)
+        if resource == 'backupjobruns':
+            j = jobIndex(q.get('id', 0))
+            startUsecs = int(q.get('exactMatchStartTimeUsecs', 0))
+            if 0 <= j < args.jobs and startUsecs in [r[1] for r in runs(j)]:
+                return (200, [{'backupJobRuns': {'protectionRuns': [{'backupRun': {'base': {
+                    'jobUid': {'clusterId': CLUSTERID, 'clusterIncarnationId': INCARNATIONID, 'objectId': jobId(j)},
+                    'startTimeUsecs': startUsecs}}}]}}])
+            return (200, [{'backupJobRuns': {}}])
+        if resource == 'protectionSources/registrationInfo':
+            return (200, {'rootNodes': [{'rootNode': vcenter()['protectionSource'], 'registrationInfo': {'refreshTimeUsecs': NOWUSECS}}]})
+        if resource == 'protectionSources/rootNodes':
+            return (200, [{'protectionSource': vcenter()['protectionSource']}])
+        if resource == 'protectionSources':
+            if 'id' in q and int(q['id']) != VCENTERID:
+                sourceId = int(q['id'])
+                j = (sourceId - 1000) // max(1, args.objects)
+                if 0 <= j < args.jobs:
+                    o = (sourceId - 1000) % args.objects
+                    return (200, [{'protectionSource': {'id': sourceId, 'name': objectName(j, o), 'environment': 'kVMware', 'vmWareProtectionSource': {'type': 'kVirtualMachine'}},
+                                   'protectedSourcesSummary': [{'environment': 'kVMware', 'leavesCount': 1, 'totalLogicalSize': 50 * GIB}]}])
+                return (200, [])
+            return (200, [vcenter()])
+        if resource == 'viewBoxes':
+            return (200, [{'id': 5, 'name': 'DefaultStorageDomain', 'storagePolicy': {'numFailuresTolerated': 1}}])
+        if resource in ['vaults', 'remoteClusters']:
+            if resource == 'vaults':
+                return (200, [{'id': 9, 'name': 'S3', 'type': 'kAmazon'}])
+            return (200, [])
+        if resource == 'reports/dataTransferToVaults':
+            return (200, {'dataTransferSummary': [{'vaultName': 'S3', 'dataTransferPerProtectionJob': [
+                {'protectionJobName': jobName(j), 'storageConsumed': GIB} for j in range(args.jobs)]}]})
+        if resource == 'stats/consumers':
+            if q.get('consumerType', '') == 'kViews':
+                return (200, {'statsList': [consumerStats('view-%04d' % (v + 1), 10000 + v) for v in range(args.views)]})
+            ids = query.get('consumerIdList', [])
+            return (200, {'statsList': [consumerStats(jobName(jobIndex(i)), int(i)) for i in ids]})
+        if resource == 'statistics/timeSeriesStats':
+            return (200, timeSeries(query))
+        if resource == 'restoretasks':
+            return (200, [restoreTask(t) for t in range(args.restoretasks)])
+        if resource == 'searchvms':
+            if 'jobIds' in q:
+                j = jobIndex(q['jobIds'].split(',')[0])
+                if j < 0 or j >= args.jobs:
+                    return (200, {})
+                (start, size) = (int(q.get('from', 0)), int(q.get('size', 10)))
+                return (200, {'vms': [searchVm(j, o) for o in range(start, min(start + size, args.objects))], 'count': args.objects})
+            found = findObject(q.get('vmName', ''))
+            if found is None:
+                return (200, {})
+            return (200, {'vms': [searchVm(found[0], found[1])]})
+        if resource == 'vm/volumeInfo':
+            return (200, {'volumeInfos': [{'name': 'C'}], 'volumeInfoCookie': 1})
+        if resource == 'vm/directoryList':
+            return (200, directoryList(q.get('dirPath', '/'), int(q.get('cookie', 0))))
+        if resource == 'progressMonitors':
+            (percent, status) = (100.0, 'kFinished')
+            m = re.match(r'^backup_([0-9]+)_([0-9]+)$', q.get('taskPathVec', ''))
+            if m is not None:
+                j = jobIndex(m.group(1))
+                for run in runs(j) if 0 <= j < args.jobs else []:
+                    if run[0] == int(m.group(2)) and run[3] == 'Running':
+                        percent = min(99.0, 100.0 * (time.time() * 1000000 - run[1]) / max(1, run[2] - run[1]))
+                        status = 'kActive'
+            return (200, {'resultGroupVec': [{'taskVec': [{'progress': {'percentFinished': percent, 'status': status, 'eventVec': []}, 'subTaskVec': []}]}]})
+        return (404, {'errorCode': 'KNotFound', 'message': 'unsupported mock api call: %s' % path})
+    if v2 is not None:
+        resource = v2.group(1)
+        if resource == 'data-protect/protection-groups':
+            ids = [i for i in q.get('ids', '').split(',') if i != '']
+            groups = []
+            for j in range(args.jobs):
+                if len(ids) > 0 and v2JobId(jobId(j)) not in ids:
+                    continue
+                group = v2Job(j)
+                if q.get('includeLastRunInfo', 'false') == 'true' and len(runs(j)) > 0:
+                    group['lastRun'] = v2Run(j, runs(j)[0])
+                groups.append(group)
+            return (200, {'protectionGroups': groups})
+        m = re.match(r'^data-protect/protection-groups/[0-9]+:[0-9]+:([0-9]+)(/runs(/([0-9]+:[0-9]+))?)?$', resource)
+        if m is not None:
+            j = jobIndex(m.group(1))
+            if j < 0 or j >= args.jobs:
+                return (404, {'errorCode': 'KNotFound', 'message': 'protection group not found'})
+            details = q.get('includeObjectDetails', 'false') == 'true'
+            if m.group(2) is None:
+                return (200, v2Job(j))
+            if m.group(4) is not None:
+                run = [r for r in runs(j) if '%s:%s' % (r[0], r[1]) == m.group(4)]
+                if len(run) == 0:
+                    return (404, {'errorCode': 'KNotFound', 'message': 'run not found'})
+                return (200, v2Run(j, run[0], details))
+            numRuns = int(q.get('numRuns', 100))
+            endUsecs = int(q.get('endTimeUsecs', 0)) or None
+            selected = [r for r in runs(j) if endUsecs is None or r[1] <= endUsecs][:numRuns]
+            return (200, {'runs': [v2Run(j, r, details) for r in selected], 'totalRuns': len(selected)})
+        if resource == 'file-services/views':
+            (start, maxCount) = (int(q.get('paginationCookie', 0)), int(q.get('maxCount', 1000)))
+            result = {'views': [view(v) for v in range(start, min(start + maxCount, args.views))], 'count': args.views}
+            if start + maxCount < args.views:
+                result['paginationCookie'] = str(start + maxCount)
+            return (200, result)
+        if resource == 'audit-logs':
+            (start, count) = (int(q.get('startIndex', 0)), int(q.get('count', 100)))
+            endUsecs = int(q.get('endTimeUsecs', NOWUSECS))
+            startUsecs = int(q.get('startTimeUsecs', 0))
+            # one entry every 10 minutes, newest first
+            logs = [log for log in [auditLog(n) for n in range(args.auditlogs)] if startUsecs <= log['timestampUsecs'] <= endUsecs]
+            return (200, {'auditLogs': logs[start:start + count], 'count': len(logs)})
+        if resource == 'data-protect/recoveries':
+            return (200, {'recoveries': [{'id': '%s:%s:%s' % (CLUSTERID, INCARNATIONID, t['id']), 'name': t['name'], 'status': 'Succeeded',
+                                          'startTimeUsecs': t['startTimeUsecs'], 'endTimeUsecs': t['endTimeUsecs']} for t in [restoreTask(t) for t in range(args.restoretasks)]]})
+        return (404, {'errorCode': 'KNotFound', 'message': 'unsupported mock api call: %s' % path})
+    return (404, {'errorCode': 'KNotFound', 'message': 'unsupported mock api call: %s' % path})
+
+
+def routeWrite(method, path, query, body):
+    if path.endswith('/public/accessTokens'):
+        return (201, {'accessToken': 'mocktoken-%s' % body.get('username', ''), 'tokenType': 'Bearer'})
+    if path.endswith('/v2/users/sessions'):
+        return (201, {'sessionId': 'mocksession'})
+    m = re.match(r'^/irisservices/api/v1/public/protectionJobs/run/([0-9]+)$', path)
+    if m is not None and method == 'POST':
+        j = jobIndex(m.group(1))
+        if j < 0 or j >= args.jobs:
+            return (404, {'errorCode': 'KNotFound', 'message': 'job not found'})
+        with RUNSLOCK:
+            active = [r for r in runs(j) if r[3] == 'Running']
+            if len(active) > 0:
+                return (500, {'errorCode': 'KAlreadyRunning', 'message': 'Protection group can only have one active backup run at a time'})
+            instanceId = max([r[0] for r in runs(j)] + [0]) + 1
+            NEWRUNS.setdefault(jobId(j), []).append({'instanceId': instanceId, 'startTimeUsecs': int(time.time() * 1000000)})
+        return (204, None)
+    if re.match(r'^/irisservices/api/v1/public/protectionRuns(/cancel/[0-9]+)?$', path):
+        return (204, None)
+    if re.match(r'^/irisservices/api/v1/public/protectionJobState/[0-9]+$', path):
+        return (204, None)
+    if path.endswith('/public/restoretasks') or path.endswith('/public/restore/recover'):
+        return (201, restoreTask(args.restoretasks))
+    if re.match(r'^/v2/data-protect/protection-groups/[0-9:]+$', path) and method == 'PUT':
+        return (200, body)
+    return (404, {'errorCode': 'KNotFound', 'message': 'unsupported mock api call: %s %s' % (method, path)})
+
+
+def template(method, path):
+    return '%s %s' % (method, IDPATTERN.sub('/{id}', path))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body):
+        if status == 204 or body is None:
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_call(self, method):
+        url = urlparse(self.path)
+        path = re.sub(r'/+', '/', url.path)
+        query = parse_qs(url.query)
+        body = {}
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        if length > 0:
+            try:
+                body = json.loads(self.rfile.read(length).decode('utf-8'))
+            except ValueError:
+                body = {}
+        if path.startswith('/mock/'):
+            return self.mock(method, path)
+        with CALLSLOCK:
+            key = template(method, path)
+            CALLS[key] = CALLS.get(key, 0) + 1
+        if args.latency > 0:
+            time.sleep(args.latency / 1000.0)
+        if not path.endswith('/accessTokens') and not path.endswith('/users/sessions'):
+            if 'authorization' not in self.headers and 'session-id' not in self.headers and 'apiKey' not in self.headers:
+                return self.send(401, {'errorCode': 'KStatusUnauthorized', 'message': 'Authentication required'})
+        if method == 'GET':
+            (status, result) = routeGet(path, query)
+        else:
+            (status, result) = routeWrite(method, path, query, body)
+        if args.quiet is not True:
+            print('%s %s %s' % (method, self.path, status))
+        self.send(status, result)
+
+    def mock(self, method, path):
+        """control endpoints for the benchmark harness"""
+        with CALLSLOCK:
+            calls = dict(CALLS)
+            if path == '/mock/reset':
+                CALLS.clear()
+        if path == '/mock/reset':
+            with RUNSLOCK:
+                NEWRUNS.clear()
+        self.send(200, {'calls': calls, 'total': sum(calls.values())})
+
+    def do_GET(self):
+        self.handle_call('GET')
+
+    def do_POST(self):
+        self.handle_call('POST')
+
+    def do_PUT(self):
+        self.handle_call('PUT')
+
+    def do_DELETE(self):
+        self.handle_call('DELETE')
+
+
+### self signed certificate
+def certificate(certfile):
+    if certfile is None:
+        certfile = os.path.join(tempfile.gettempdir(), 'mockCohesity.pem')
+    if not os.path.exists(certfile):
+        keyfile = '%s.key' % certfile
+        subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                               '-subj', '/CN=localhost', '-keyout', keyfile, '-out', '%s.crt' % certfile],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(certfile, 'w') as f:
+            for part in [keyfile, '%s.crt' % certfile]:
+                f.write(open(part).read())
+                os.remove(part)
+    return certfile
+
+
+server = ThreadingHTTPServer((args.bind, args.port), Handler)
+server.daemon_threads = True
+context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+context.load_cert_chain(certificate(args.certfile))
+server.socket = context.wrap_socket(server.socket, server_side=True)
+print('mock cluster listening on %s:%s (%s jobs, %s runs per job, %s objects per job)' % (args.bind, args.port, args.jobs, args.runs, args.objects), flush=True)
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
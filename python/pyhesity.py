@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-"""Cohesity Python REST API Wrapper Module - 2023.04.06"""
+"""Cohesity Python REST API Wrapper Module - 2026.10.18"""
 
 ##########################################################################################
 # Change Log
@@ -20,6 +20,23 @@
 # 2022.11.26 - added v2 file download
 # 2023.03.09 - added impersonate and switchback functions and improved tenant ID lookup
 # 2023.03.30 - added try/except for log file
+# 2026.10.18 - added pooled keep-alive http session per api context
+# 2026.10.18 - added CohesityClient class and context support for all api functions
+# 2026.10.18 - added iterRuns (paged protection runs with background prefetch)
+# 2026.10.18 - added opt-in on-disk response cache for read-mostly GETs
+# 2026.10.18 - cache access tokens/sessions between runs, re-authenticate on 401
+# 2026.10.18 - added stream_items option to api (incremental decoding of large arrays)
+# 2026.10.18 - added retry policy with backoff, Retry-After and per cluster circuit breaker
+# 2026.10.18 - added per endpoint api call statistics (PYHESITY_STATS, PYHESITY_STATS_FILE)
+# 2026.10.18 - parallel ranged, resumable fileDownload
+# 2026.10.18 - added SourceIndex (indexed protection source tree)
+# 2026.10.18 - added updateRuns (concurrent protection run updates with dry run and resume journal)
+# 2026.10.18 - added record / replay of api traffic (PYHESITY_RECORD, PYHESITY_REPLAY)
+# 2026.10.18 - added opt-in in-process memoization and coalescing of identical GETs
+# 2026.10.18 - indexed, lock-safe credential store (~/.pyhesity/credentials.db)
+# 2026.10.18 - debug log written as JSON lines by a background thread, repeated messages counted instead of sleeping
+# 2026.10.18 - added helios_map (run a function against many helios connected clusters concurrently)
+# 2026.10.18 - added paginate (paged GETs with paginationCookie, count or offset paging and prefetch)
 #
 ##########################################################################################
 # Install Notes
@@ -40,9 +57,46 @@ import getpass
 import base64
 import os
 import urllib3
-import traceback
+import threading
+import hashlib
+import codecs
+import numbers
+import random
+import email.utils
+import atexit
+import re
+import sys
+import gzip
+import io
+from collections import OrderedDict
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 from os.path import expanduser
 
+try:
+    import ijson  # optional: faster streaming json parser
+except ImportError:
+    ijson = None
+
+try:
+    import sqlite3  # credential store
+except ImportError:
+    sqlite3 = None
+
+try:
+    import fcntl  # cross-process file locking (not available on Windows)
+except ImportError:
+    fcntl = None
+
+try:
+    from urllib.parse import urlparse, parse_qsl, urlencode
+except ImportError:
+    from urlparse import urlparse, parse_qsl
+    from urllib import urlencode
+
 ### ignore unsigned certificates
 import requests.packages.urllib3
 
@@ -74,9 +128,24 @@ __all__ = ['api_version',
            'setContext',
            'getDate',
            'impersonate',
-           'switchback']
-
-api_version = '2023.04.06'
+           'switchback',
+           'CohesityClient',
+           'iterRuns',
+           'enableApiCache',
+           'disableApiCache',
+           'clearApiCache',
+           'setRetryPolicy',
+           'apiStats',
+           'printApiStats',
+           'writeApiStats',
+           'SourceIndex',
+           'updateRuns',
+           'enableApiMemo',
+           'disableApiMemo',
+           'helios_map',
+           'paginate']
+
+api_version = '2026.10.18'
 
 COHESITY_API = {
     'User-Agent': 'pyhesity/%s' % api_version,
@@ -84,159 +153,301 @@ COHESITY_API = {
     'APIROOTv2': '',
     'HEADER': {},
     'AUTHENTICATED': False,
-    'LAST_ERROR': 'OK'
+    'LAST_ERROR': 'OK',
+    'SESSION': None,
+    'POOLSIZE': 10
 }
 
 APIMETHODS = ['get', 'post', 'put', 'delete']
 CONFIGDIR = expanduser("~") + '/.pyhesity'
 SCRIPTDIR = os.path.dirname(os.path.realpath(__file__))
 PWFILE = os.path.join(SCRIPTDIR, 'YWRtaW4')
-LOGFILE = os.path.join(SCRIPTDIR, 'pyhesity-debug.log')
+LOGFILE = os.environ.get('PYHESITY_LOGFILE', '') or os.path.join(SCRIPTDIR, 'pyhesity-debug.log')
+
+### debug log
+DEBUGLOG = {
+    'MAXBYTES': 1048576,
+    'DEDUPSECS': 5,
+    'REPEATS': {},
+    'QUEUE': None,
+    'THREAD': None,
+    'FILE': None,
+    'BYTES': 0,
+    'CLOSED': False,
+    'LOCK': threading.Lock()
+}
+
+### retry policy (GETs are retried, writes only when called with retry=True)
+RETRYPOLICY = {
+    'RETRIES': 3,
+    'BACKOFF': 2,
+    'MAXBACKOFF': 60,
+    'MAXRETRYAFTER': 300,
+    'STATUSCODES': [429, 502, 503, 504],
+    'BREAKERTHRESHOLD': 5,
+    'BREAKERCOOLDOWN': 60
+}
+CIRCUITS = {}
+CIRCUITLOCK = threading.Lock()
+
+### api call statistics (PYHESITY_STATS=1 prints a summary at exit, PYHESITY_STATS_FILE=file.prom or file.jsonl)
+APISTATS = {'CALLS': {}}
+APISTATSLOCK = threading.Lock()
+STATSIDPATTERN = re.compile(r'^([0-9]+|[0-9]+(:[0-9]+)+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,})$')
+
+### credential store (PYHESITY_NOPWSTORE=1 to use the PWFILE / per-password files only)
+PWSTORE = {
+    'ENABLED': sqlite3 is not None and os.environ.get('PYHESITY_NOPWSTORE', '0') in ['', '0'],
+    'FILE': os.path.join(CONFIGDIR, 'credentials.db'),
+    'TIMEOUT': 30
+}
+
+### cached access tokens / sessions (PYHESITY_NOTOKENCACHE=1 to disable)
+TOKENCACHE = {
+    'ENABLED': os.environ.get('PYHESITY_NOTOKENCACHE', '0') in ['', '0'],
+    'DIR': os.path.join(CONFIGDIR, 'tokens'),
+    'TTL': 43200
+}
+
+### on-disk response cache (opt-in: PYHESITY_CACHE=1 or enableApiCache)
+APICACHE = {
+    'ENABLED': os.environ.get('PYHESITY_CACHE', '0') not in ['', '0'] and os.environ.get('PYHESITY_NOCACHE', '0') in ['', '0'],
+    'DIR': os.path.join(CONFIGDIR, 'cache'),
+    'MAXBYTES': 256 * 1048576,
+    'RECOUNTSECS': 600,  # recount the cache when its size index is older than this
+    'TTL': {
+        'protectionJobs': 300,
+        'protectionPolicies': 900,
+        'protectionSources': 900,
+        'viewBoxes': 1800,
+        'vaults': 1800,
+        'remoteClusters': 1800
+    }
+}
+
+### in-process memoization of GETs (opt-in: PYHESITY_MEMO=1 or PYHESITY_MEMO=family,family or enableApiMemo)
+APIMEMO = {
+    'ENABLED': os.environ.get('PYHESITY_MEMO', '0') not in ['', '0'],
+    'FAMILIES': ['cluster', 'protectionSources', 'protectionJobs', 'protectionPolicies', 'viewBoxes', 'vaults', 'remoteClusters'],
+    'MAXENTRIES': 1000,
+    'RESPONSES': OrderedDict(),
+    'INFLIGHT': {},
+    'LOCK': threading.Lock()
+}
+if os.environ.get('PYHESITY_MEMO', '0') not in ['', '0', '1']:
+    APIMEMO['FAMILIES'] = [f.strip() for f in os.environ['PYHESITY_MEMO'].split(',') if f.strip() != '']
+
+### paged GET styles (page size parameter, cursor or offset parameter, total in the response)
+PAGESTYLES = {
+    'cookie': {'size': 'maxCount', 'cursor': 'paginationCookie'},
+    'count': {'size': 'count', 'offset': 'startIndex', 'total': 'count'},
+    'offset': {'size': 'size', 'offset': 'from', 'total': 'count'}
+}
+
+# v2 resources that share a cache family (and invalidation) with their v1 equivalent
+CACHEFAMILIES = {
+    'data-protect/protection-groups': 'protectionJobs',
+    'data-protect/policies': 'protectionPolicies',
+    'data-protect/sources': 'protectionSources',
+    'storage-domains': 'viewBoxes',
+    'data-protect/external-targets': 'vaults',
+    'remote-clusters': 'remoteClusters'
+}
+
+
+### record / replay api traffic (PYHESITY_RECORD=folder or PYHESITY_REPLAY=folder)
+CASSETTE = {
+    'RECORD': os.environ.get('PYHESITY_RECORD', '') or None,
+    'REPLAY': os.environ.get('PYHESITY_REPLAY', '') or None,
+    'LATENCY': float(os.environ.get('PYHESITY_REPLAY_LATENCY', '1') or 1),
+    'FILE': None,
+    'RESPONSES': None,
+    'LOCK': threading.Lock()
+}
+
+# request bodies (credentials) of these calls are not recorded
+CASSETTEAUTHPATHS = ['/public/accessTokens', '/users/sessions', '/email-otp']
+CASSETTEHEADERS = ['Content-Type', 'Content-Range', 'Content-Length', 'Retry-After']
+
+if CASSETTE['REPLAY'] is not None:
+    TOKENCACHE['ENABLED'] = False
 
 
 ### get last error
-def LAST_API_ERROR():
+def LAST_API_ERROR(context=None):
+    if context is not None:
+        return context['LAST_ERROR']
     return COHESITY_API['LAST_ERROR']
 
 
 ### authentication
-def apiauth(vip='helios.cohesity.com', username='helios', domain='local', password=None, updatepw=None, prompt=None, quiet=None, helios=False, useApiKey=False, tenantId=None, noretry=False, regionid=None, mfaType='Totp', mfaCode=None, emailMfaCode=False):
+def apiauth(vip='helios.cohesity.com', username='helios', domain='local', password=None, updatepw=None, prompt=None, quiet=None, helios=False, useApiKey=False, tenantId=None, noretry=False, regionid=None, mfaType='Totp', mfaCode=None, emailMfaCode=False, poolsize=None, context=None):
     """authentication function"""
     global COHESITY_API
     global HELIOSCLUSTERS
     global CONNECTEDHELIOSCLUSTERS
 
-    COHESITY_API['APIROOTMCM'] = 'https://%s/mcm/' % vip
-    COHESITY_API['APIROOTMCMv2'] = 'https://%s/v2/mcm/' % vip
-    COHESITY_API['APIROOTREPORTINGv2'] = 'https://%s/heliosreporting/api/v1/public/' % vip
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+
+    # new connection gets a new pooled session (saved contexts keep their own)
+    THISCONTEXT['SESSION'] = None
+    if poolsize is not None:
+        THISCONTEXT['POOLSIZE'] = poolsize
+
+    THISCONTEXT['APIROOTMCM'] = 'https://%s/mcm/' % vip
+    THISCONTEXT['APIROOTMCMv2'] = 'https://%s/v2/mcm/' % vip
+    THISCONTEXT['APIROOTREPORTINGv2'] = 'https://%s/heliosreporting/api/v1/public/' % vip
 
     if '\\' in username:
         (domain, username) = username.split('\\')
     if '/' in username:
         (domain, username) = username.split('/')
+    THISCONTEXT['USER'] = '%s/%s' % (domain, username)
 
     pwd = password
     # if password is None:
     pwd = __getpassword(vip=vip, username=username, password=password, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
     if pwd is None:
-        COHESITY_API['AUTHENTICATED'] = False
-        COHESITY_API['LAST_ERROR'] = 'no password provided for %s/%s at %s' % (domain, username, vip)
+        THISCONTEXT['AUTHENTICATED'] = False
+        THISCONTEXT['LAST_ERROR'] = 'no password provided for %s/%s at %s' % (domain, username, vip)
         return None
-    COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json'}
-    COHESITY_API['APIROOT'] = 'https://' + vip + '/irisservices/api/v1'
-    COHESITY_API['APIROOTv2'] = 'https://' + vip + '/v2/'
-    if vip == 'helios.cohesity.com' or helios is not False:
-        COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd}
+    THISCONTEXT['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json'}
+    THISCONTEXT['APIROOT'] = 'https://' + vip + '/irisservices/api/v1'
+    THISCONTEXT['APIROOTv2'] = 'https://' + vip + '/v2/'
+    THISCONTEXT['AUTHARGS'] = None
+    isHelios = (vip == 'helios.cohesity.com' or helios is not False)
+    if isHelios is False:
+        # reuse a cached access token / session / validated api key
+        tokenfile = __tokenfile(vip, domain, username, useApiKey, tenantId, pwd)
+        if updatepw is None:
+            cachedheader = __tokenget(tokenfile)
+            if cachedheader is not None:
+                THISCONTEXT['HEADER'] = cachedheader
+                THISCONTEXT['AUTHENTICATED'] = True
+                THISCONTEXT['LAST_ERROR'] = 'OK'
+                THISCONTEXT['AUTHARGS'] = {'vip': vip, 'username': username, 'domain': domain, 'password': pwd, 'useApiKey': useApiKey, 'tenantId': tenantId}
+                if quiet is None:
+                    print("Connected!")
+                return None
+    if isHelios is True:
+        THISCONTEXT['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd}
         if regionid is not None:
-            COHESITY_API['HEADER']['regionid'] = regionid
-        URL = COHESITY_API['APIROOTMCM'] + 'clusters/connectionStatus'
+            THISCONTEXT['HEADER']['regionid'] = regionid
+        URL = THISCONTEXT['APIROOTMCM'] + 'clusters/connectionStatus'
         try:
-            HELIOSCLUSTERS = (requests.get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=300)).json()
-            if HELIOSCLUSTERS is not None and 'message' in HELIOSCLUSTERS:
-                print(HELIOSCLUSTERS['message'])
-                if 'Authentication failed' in HELIOSCLUSTERS['message'] and noretry is False and prompt is not False:
-                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True)
+            heliosclusters = (__session(THISCONTEXT).get(URL, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)).json()
+            if heliosclusters is not None and 'message' in heliosclusters:
+                print(heliosclusters['message'])
+                if 'Authentication failed' in heliosclusters['message'] and noretry is False and prompt is not False:
+                    return apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True, context=context)
                 else:
-                    COHESITY_API['AUTHENTICATED'] = False
-                    COHESITY_API['LAST_ERROR'] = 'Helios/MCM authentication failed'
+                    THISCONTEXT['AUTHENTICATED'] = False
+                    THISCONTEXT['LAST_ERROR'] = 'Helios/MCM authentication failed'
                     return None
-            if HELIOSCLUSTERS is not None and 'errorCode' not in HELIOSCLUSTERS:
-                CONNECTEDHELIOSCLUSTERS = [cluster for cluster in HELIOSCLUSTERS if cluster['connectedToCluster'] is True]
-                COHESITY_API['AUTHENTICATED'] = True
-                COHESITY_API['LAST_ERROR'] = 'OK'
+            if heliosclusters is not None and 'errorCode' not in heliosclusters:
+                THISCONTEXT['HELIOSCLUSTERS'] = heliosclusters
+                THISCONTEXT['CONNECTEDHELIOSCLUSTERS'] = [cluster for cluster in heliosclusters if cluster['connectedToCluster'] is True]
+                if context is None:
+                    HELIOSCLUSTERS = heliosclusters
+                    CONNECTEDHELIOSCLUSTERS = THISCONTEXT['CONNECTEDHELIOSCLUSTERS']
+                THISCONTEXT['AUTHENTICATED'] = True
+                THISCONTEXT['LAST_ERROR'] = 'OK'
                 if quiet is None:
                     print("Connected!")
             else:
-                URL = COHESITY_API['APIROOTMCMv2'] + 'dms/regions'
-                REGIONS = (requests.get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=300)).json()
+                URL = THISCONTEXT['APIROOTMCMv2'] + 'dms/regions'
+                REGIONS = (__session(THISCONTEXT).get(URL, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)).json()
                 if REGIONS is not None and 'message' in REGIONS:
                     print(REGIONS['message'])
-                    COHESITY_API['AUTHENTICATED'] = False
-                    COHESITY_API['LAST_ERROR'] = 'DMaaS authentication failed'
+                    THISCONTEXT['AUTHENTICATED'] = False
+                    THISCONTEXT['LAST_ERROR'] = 'DMaaS authentication failed'
                     return None
                 if REGIONS is not None and 'errorCode' not in REGIONS:
-                    COHESITY_API['AUTHENTICATED'] = True
-                    COHESITY_API['LAST_ERROR'] = 'OK'
+                    THISCONTEXT['AUTHENTICATED'] = True
+                    THISCONTEXT['LAST_ERROR'] = 'OK'
                     if quiet is None:
                         print("Connected!")
         except requests.exceptions.RequestException as e:
-            COHESITY_API['AUTHENTICATED'] = False
-            COHESITY_API['LAST_ERROR'] = e
+            THISCONTEXT['AUTHENTICATED'] = False
+            THISCONTEXT['LAST_ERROR'] = e
             if 'Authentication failed' in e and noretry is False and prompt is not False:
-                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                return apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
             if quiet is None:
                 __writelog(e)
                 print(e)
     elif useApiKey is True:
-        COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd}
-        COHESITY_API['AUTHENTICATED'] = True
+        THISCONTEXT['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd}
+        THISCONTEXT['AUTHENTICATED'] = True
         if tenantId is not None:
-            impersonate(tenantId)
-        COHESITY_API['LAST_ERROR'] = 'OK'
-        cluster = api('get', 'cluster', quiet=True)
+            impersonate(tenantId, context=context)
+        THISCONTEXT['LAST_ERROR'] = 'OK'
+        cluster = api('get', 'cluster', quiet=True, context=THISCONTEXT)
         if cluster is not None and 'id' in cluster:
             if quiet is None:
                 print("Connected!")
         else:
-            COHESITY_API['AUTHENTICATED'] = False
-            if 'StatusUnauthorized' in COHESITY_API['LAST_ERROR'] or 'invalid header value' in COHESITY_API['LAST_ERROR']:
-                COHESITY_API['LAST_ERROR'] = 'API key authentication failed'
+            THISCONTEXT['AUTHENTICATED'] = False
+            if 'StatusUnauthorized' in THISCONTEXT['LAST_ERROR'] or 'invalid header value' in THISCONTEXT['LAST_ERROR']:
+                THISCONTEXT['LAST_ERROR'] = 'API key authentication failed'
                 print('API key authentication failed')
                 if prompt is not False and noretry is not True:
-                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                    return apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
             else:
-                print('Connection failed: %s' % COHESITY_API['LAST_ERROR'])
+                print('Connection failed: %s' % THISCONTEXT['LAST_ERROR'])
     else:
         creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": mfaType, "otpCode": mfaCode})
         emailcreds = json.dumps({"domain": domain, "password": pwd, "username": username})
 
-        url = COHESITY_API['APIROOT'] + '/public/accessTokens'
+        url = THISCONTEXT['APIROOT'] + '/public/accessTokens'
         try:
             if emailMfaCode is True:
-                emailurl = COHESITY_API['APIROOTv2'] + 'email-otp'
-                response = requests.post(emailurl, data=emailcreds, headers=COHESITY_API['HEADER'], verify=False, timeout=300)
+                emailurl = THISCONTEXT['APIROOTv2'] + 'email-otp'
+                response = __session(THISCONTEXT).post(emailurl, data=emailcreds, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)
                 mfaCode = getpass.getpass("Enter emailed MFA code: ")
                 creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": 'Email', "otpCode": mfaCode})
 
-            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=300)
+            response = __session(THISCONTEXT).post(url, data=creds, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)
             if response != '':
                 if response.status_code == 201:
                     accessToken = response.json()['accessToken']
                     tokenType = response.json()['tokenType']
-                    COHESITY_API['HEADER'] = {'accept': 'application/json',
+                    THISCONTEXT['HEADER'] = {'accept': 'application/json',
                                               'content-type': 'application/json',
                                               'authorization': tokenType + ' ' + accessToken}
-                    COHESITY_API['AUTHENTICATED'] = True
+                    THISCONTEXT['AUTHENTICATED'] = True
                     if tenantId is not None:
-                        impersonate(tenantId)
-                    COHESITY_API['LAST_ERROR'] = 'OK'
+                        impersonate(tenantId, context=context)
+                    THISCONTEXT['LAST_ERROR'] = 'OK'
                     if quiet is None:
                         print("Connected!")
                 else:
                     # try session auth
                     if response.status_code == 400 and 'access denied' in response.json()['message'].lower():
                         try:
-                            url = COHESITY_API['APIROOTv2'] + 'users/sessions'
+                            url = THISCONTEXT['APIROOTv2'] + 'users/sessions'
                             creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": mfaType.lower(), "otpCode": mfaCode})
                             if emailMfaCode is True:
                                 creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": 'email', "otpCode": mfaCode})
                             # creds = json.dumps({"domain": domain, "password": pwd, "username": username})
-                            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=300)
+                            response = __session(THISCONTEXT).post(url, data=creds, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)
                             if response != '':
                                 if response.status_code == 201:
                                     sessionId = response.json()['sessionId']
-                                    COHESITY_API['HEADER'] = {'accept': 'application/json',
+                                    THISCONTEXT['HEADER'] = {'accept': 'application/json',
                                                               'content-type': 'application/json',
                                                               'session-id': sessionId}
-                                    COHESITY_API['AUTHENTICATED'] = True
+                                    THISCONTEXT['AUTHENTICATED'] = True
                                     if tenantId is not None:
-                                        impersonate(tenantId)
-                                    COHESITY_API['LAST_ERROR'] = 'OK'
+                                        impersonate(tenantId, context=context)
+                                    THISCONTEXT['LAST_ERROR'] = 'OK'
                                     if quiet is None:
                                         print("Connected!")
                                 else:
-                                    COHESITY_API['AUTHENTICATED'] = False
-                                    COHESITY_API['LAST_ERROR'] = 'Error %s' % response.status_code
+                                    THISCONTEXT['AUTHENTICATED'] = False
+                                    THISCONTEXT['LAST_ERROR'] = 'Error %s' % response.status_code
                                     __writelog('Error %s' % response.status_code)
                                     # __writelog(response.json()['message'])
                                     if quiet is None:
@@ -244,87 +455,299 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                                         # print(response.json()['message'])
                                     if response.status_code == 400 and 'invalid username' in response.json()['message'].lower():
                                         if noretry is not True and prompt is not False:
-                                            apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                                            return apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
                         except requests.exceptions.RequestException as e2:
                             __writelog(e2)
-                            COHESITY_API['AUTHENTICATED'] = False
-                            COHESITY_API['LAST_ERROR'] = e2
+                            THISCONTEXT['AUTHENTICATED'] = False
+                            THISCONTEXT['LAST_ERROR'] = e2
                             if quiet is None:
                                 print(e2)
                     else:
-                        COHESITY_API['AUTHENTICATED'] = False
+                        THISCONTEXT['AUTHENTICATED'] = False
                         if response.status_code == 400:
-                            COHESITY_API['LAST_ERROR'] = 'invalid username or password.'
+                            THISCONTEXT['LAST_ERROR'] = 'invalid username or password.'
                         else:
-                            COHESITY_API['LAST_ERROR'] = 'Error %s' % response.status_code
+                            THISCONTEXT['LAST_ERROR'] = 'Error %s' % response.status_code
                         # __writelog(response.json()['message'])
-                        __writelog(COHESITY_API['LAST_ERROR'])
+                        __writelog(THISCONTEXT['LAST_ERROR'])
                         if quiet is None:
-                            print(COHESITY_API['LAST_ERROR'])
+                            print(THISCONTEXT['LAST_ERROR'])
                         if response.status_code == 400 and 'invalid username' in response.json()['message'].lower():
                             if noretry is False and prompt is not False:
-                                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                                return apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
 
         except requests.exceptions.RequestException as e:
             __writelog(e)
-            COHESITY_API['AUTHENTICATED'] = False
-            COHESITY_API['LAST_ERROR'] = e
+            THISCONTEXT['AUTHENTICATED'] = False
+            THISCONTEXT['LAST_ERROR'] = e
             if quiet is None:
                 print(e)
 
+    # cache the new token for future runs (and re-authentication on 401)
+    if isHelios is False and THISCONTEXT['AUTHENTICATED'] is True:
+        __tokenput(tokenfile, THISCONTEXT['HEADER'])
+        if mfaCode is None and emailMfaCode is False:
+            THISCONTEXT['AUTHARGS'] = {'vip': vip, 'username': username, 'domain': domain, 'password': pwd, 'useApiKey': useApiKey, 'tenantId': tenantId}
+
 
-def apiconnected():
+def apiconnected(context=None):
+    if context is not None:
+        return context['AUTHENTICATED']
     return COHESITY_API['AUTHENTICATED']
 
 
-def apidrop():
+def apidrop(context=None):
     global COHESITY_API
-    COHESITY_API['AUTHENTICATED'] = False
+    if context is not None:
+        context['AUTHENTICATED'] = False
+    else:
+        COHESITY_API['AUTHENTICATED'] = False
 
 
-def impersonate(tenantId):
-    if COHESITY_API['AUTHENTICATED'] is True:
-        tenants = api('get', 'tenants')
+def impersonate(tenantId, context=None):
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    if THISCONTEXT['AUTHENTICATED'] is True:
+        tenants = api('get', 'tenants', context=THISCONTEXT)
         if tenants is not None and len(tenants) > 0:
             thistenant = [t for t in tenants if t['name'].lower() == tenantId.lower()]
             if thistenant is not None and len(thistenant) > 0:
-                COHESITY_API['HEADER']['x-impersonate-tenant-id'] = thistenant[0]['tenantId']
+                THISCONTEXT['HEADER']['x-impersonate-tenant-id'] = thistenant[0]['tenantId']
             else:
                 print('tenant %s not found' % tenantId)
         else:
             print('tenant %s not found' % tenantId)
 
 
-def switchback():
-    if 'x-impersonate-tenant-id' in COHESITY_API['HEADER']:
-        del COHESITY_API['HEADER']['x-impersonate-tenant-id']
+def switchback(context=None):
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    if 'x-impersonate-tenant-id' in THISCONTEXT['HEADER']:
+        del THISCONTEXT['HEADER']['x-impersonate-tenant-id']
 
 
-def heliosCluster(clusterName=None, verbose=False):
+def heliosCluster(clusterName=None, verbose=False, context=None):
     global COHESITY_API
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    connectedclusters = THISCONTEXT.get('CONNECTEDHELIOSCLUSTERS', [])
     if clusterName is not None:
         if isinstance(clusterName, dict) is True:
             clusterName = clusterName['name']
-        accessCluster = [cluster for cluster in CONNECTEDHELIOSCLUSTERS if cluster['name'].lower() == clusterName.lower()]
+        accessCluster = [cluster for cluster in connectedclusters if cluster['name'].lower() == clusterName.lower()]
         if not accessCluster:
             print('Cluster %s not connected to Helios' % clusterName)
         else:
-            COHESITY_API['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
+            THISCONTEXT['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
             if verbose is True:
                 print('Using %s' % clusterName)
     else:
         print("\n{0:<20}{1:<36}{2}".format('ClusterID', 'SoftwareVersion', "ClusterName"))
         print("{0:<20}{1:<36}{2}".format('---------', '---------------', "-----------"))
-        for cluster in sorted(CONNECTEDHELIOSCLUSTERS, key=lambda cluster: cluster['name'].lower()):
+        for cluster in sorted(connectedclusters, key=lambda cluster: cluster['name'].lower()):
             print("{0:<20}{1:<36}{2}".format(cluster['clusterId'], cluster['softwareVersion'], cluster['name']))
 
 
-def heliosClusters():
-    return sorted(CONNECTEDHELIOSCLUSTERS, key=lambda cluster: cluster['name'].lower())
+def heliosClusters(context=None):
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    return sorted(THISCONTEXT.get('CONNECTEDHELIOSCLUSTERS', []), key=lambda cluster: cluster['name'].lower())
+
+
+### pooled http session
+def __session(context):
+    """get (or create) the keep-alive session for an api context"""
+    session = context.get('SESSION', None)
+    if session is None:
+        poolsize = context.get('POOLSIZE', 10)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=poolsize, pool_maxsize=poolsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.verify = False
+        if CASSETTE['REPLAY'] is not None:
+            session = __CassetteSession()
+        elif CASSETTE['RECORD'] is not None:
+            session = __CassetteSession(session)
+        context['SESSION'] = session
+    return session
+
+
+### recorded api response
+class __ReplayResponse(object):
+    """stands in for a requests response (recorded responses, and streamed responses while recording)"""
+
+    def __init__(self, status_code, reason, headers, content):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.raw = io.BytesIO(content)
+        self.retries = 0
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+
+### session that records api traffic to, or replays it from, a cassette
+class __CassetteSession(object):
+
+    dumps = staticmethod(json.dumps)
+    response = None  # __ReplayResponse (set below, class private names are mangled in here)
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def get(self, url, headers=None, **kwargs):
+        return self.request('GET', url, headers=headers, **kwargs)
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        return self.request('POST', url, data=data, headers=headers, **kwargs)
+
+    def request(self, method, url, headers=None, json=None, data=None, verify=False, timeout=300, stream=False):
+        method = method.upper()
+        key = self.key(method, url, headers)
+        if self.session is None:
+            return self.replay(method, url, key)
+        start = time.time()
+        response = self.session.request(method, url, headers=headers, json=json, data=data, verify=verify, timeout=timeout)
+        entry = {
+            'm': method,
+            'u': url,
+            'k': key,
+            's': response.status_code,
+            'r': response.reason,
+            'h': dict([(h, response.headers[h]) for h in CASSETTEHEADERS if h in response.headers]),
+            't': round(time.time() - start, 4)
+        }
+        auth = len([p for p in CASSETTEAUTHPATHS if urlparse(url).path.endswith(p)]) > 0
+        if json is not None and auth is False:
+            entry['b'] = json
+        content = response.content
+        if auth is True and response.status_code in [200, 201]:
+            content = b'{"accessToken": "replay", "tokenType": "Bearer", "sessionId": "replay"}'
+        try:
+            entry['c'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['c'] = base64.b64encode(content).decode('ascii')
+            entry['e'] = 'base64'
+        with CASSETTE['LOCK']:
+            if CASSETTE['FILE'] is None:
+                if os.path.isdir(CASSETTE['RECORD']) is False:
+                    os.makedirs(CASSETTE['RECORD'])
+                script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0] or 'python'
+                fileName = '%s-%s-%s.jsonl.gz' % (script, datetime.now().strftime('%Y%m%d%H%M%S'), os.getpid())
+                CASSETTE['FILE'] = gzip.open(os.path.join(CASSETTE['RECORD'], fileName), 'wb')
+            CASSETTE['FILE'].write((self.dumps(entry) + '\n').encode('utf-8'))
+        if stream is True:
+            return self.response(response.status_code, response.reason, response.headers, response.content)
+        return response
+
+    def replay(self, method, url, key):
+        with CASSETTE['LOCK']:
+            if CASSETTE['RESPONSES'] is None:
+                CASSETTE['RESPONSES'] = self.load(CASSETTE['REPLAY'])
+            entry = None
+            for k in [key, self.key(method, url, None, fuzzy=True)]:
+                entries = CASSETTE['RESPONSES'].get(k, None)
+                if entries:
+                    entry = entries[0]
+                    if len(entries) > 1:
+                        entries.pop(0)  # the last response is replayed for any further identical calls
+                    break
+        if entry is None:
+            if len([p for p in CASSETTEAUTHPATHS if urlparse(url).path.endswith(p)]) > 0:
+                content = b'{"accessToken": "replay", "tokenType": "Bearer", "sessionId": "replay"}'
+                return self.response(201, 'Created', {'Content-Type': 'application/json'}, content)
+            content = self.dumps({'errorCode': 'KReplayMissing', 'message': 'no recorded response for %s %s' % (method, url)}).encode('utf-8')
+            return self.response(404, 'Not Recorded', {'Content-Type': 'application/json'}, content)
+        if CASSETTE['LATENCY'] > 0:
+            time.sleep(entry['t'] * CASSETTE['LATENCY'])
+        if entry.get('e', None) == 'base64':
+            content = base64.b64decode(entry['c'])
+        else:
+            content = entry['c'].encode('utf-8')
+        return self.response(entry['s'], entry['r'], entry['h'], content)
+
+    @staticmethod
+    def key(method, url, headers, fuzzy=False):
+        """requests are matched on method, path, query (and the helios cluster and byte range)"""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        if fuzzy is True or headers is None:
+            # timestamps in the query differ from run to run
+            query = [(k, '*' if v.isdigit() and len(v) >= 10 else v) for (k, v) in query]
+        key = '%s %s?%s' % (method, parsed.path, urlencode(query))
+        if headers is not None:
+            for header in ['accessClusterId', 'Range']:
+                if header in headers:
+                    key += ' %s=%s' % (header, headers[header])
+        return key
+
+    @classmethod
+    def load(cls, folder):
+        """recorded responses by request key (and by fuzzy key), in the order they were recorded"""
+        responses = {}
+        if os.path.isdir(folder) is False:
+            return responses
+        for fileName in sorted(os.listdir(folder)):
+            if not fileName.endswith('.jsonl.gz'):
+                continue
+            f = gzip.open(os.path.join(folder, fileName), 'rb')
+            try:
+                for line in f:
+                    try:
+                        entry = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        continue
+                    responses.setdefault(entry['k'], []).append(entry)
+                    fuzzy = cls.key(entry['m'], entry['u'], None, fuzzy=True)
+                    if fuzzy != entry['k']:
+                        responses.setdefault(fuzzy, []).append(entry)
+            except (IOError, EOFError):
+                pass  # cassette of an interrupted run
+            f.close()
+        return responses
+
+
+__CassetteSession.response = __ReplayResponse
+
+
+def __cassetteclose():
+    with CASSETTE['LOCK']:
+        if CASSETTE['FILE'] is not None:
+            CASSETTE['FILE'].close()
+            CASSETTE['FILE'] = None
+
+
+atexit.register(__cassetteclose)
 
 
 ### api call function
-def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None):
+def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, nocache=None, stream_items=None, retry=None):
     """api call function"""
     if context is not None:
         THISCONTEXT = context
@@ -334,75 +757,979 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
         print('Not Connected')
         return None
     response = ''
+    (url, uri) = __apiurl(THISCONTEXT, uri, mcm=mcm, mcmv2=mcmv2, v=v, reportingv2=reportingv2)
+
+    if method in APIMETHODS:
+        if stream_items is not None:
+            return __streamitems(THISCONTEXT, method, url, uri, data, stream_items, quiet, retry)
+        memo = None
+        if method == 'get' and APIMEMO['ENABLED'] is True and nocache is not True and __memoable(url) is True:
+            memo = __memoget(THISCONTEXT, url)
+            if 'result' in memo:
+                __apistat(method, url, 'memo', 0)
+                THISCONTEXT['LAST_ERROR'] = 'OK'
+                return memo['result']
+        try:
+            if method == 'get' and APICACHE['ENABLED'] is True and nocache is not True:
+                cached = __cacheget(THISCONTEXT, url)
+                if cached is not None:
+                    __apistat(method, url, 'cached', 0)
+                    THISCONTEXT['LAST_ERROR'] = 'OK'
+                    if memo is not None:
+                        memo['result'] = cached
+                    return cached
+            start = time.time()
+            try:
+                response = __request(THISCONTEXT, method, url, data, retry=retry)
+                if response.status_code == 401 and __reauth(THISCONTEXT) is True:
+                    response = __request(THISCONTEXT, method, url, data, retry=retry)
+                THISCONTEXT['LAST_ERROR'] = 'OK'
+            except requests.exceptions.RequestException as e:
+                __writelog(e, endpoint='%s %s' % (method, url), latency=time.time() - start)
+                THISCONTEXT['LAST_ERROR'] = '%s' % e
+                if quiet is None:
+                    print(e)
+            result = __apiresponse(THISCONTEXT, response, uri, quiet)
+            if response != '' and response.status_code < 300:
+                if method != 'get':
+                    if APICACHE['ENABLED'] is True:
+                        __cacheinvalidate(THISCONTEXT, url)
+                    __memoinvalidate(THISCONTEXT, url)
+                elif THISCONTEXT['LAST_ERROR'] == 'OK':
+                    if APICACHE['ENABLED'] is True and nocache is not True:
+                        __cacheput(THISCONTEXT, url, result)
+                    if memo is not None:
+                        memo['result'] = result
+            return result
+        finally:
+            if memo is not None:
+                __memoput(memo)
+    else:
+        if quiet is None:
+            print("invalid api method")
+
+
+### send api request
+def __send(context, method, url, data=None, stream=False, headers=None):
+    session = __session(context)
+    header = context['HEADER']
+    if headers is not None:
+        header = dict(header)
+        header.update(headers)
+    if method == 'get':
+        return session.get(url, headers=header, verify=False, timeout=300, stream=stream)
+    return session.request(method.upper(), url, headers=header, json=data, verify=False, timeout=300, stream=stream)
+
+
+### send api request (with retries and instrumentation)
+def __request(context, method, url, data=None, stream=False, retry=None, headers=None):
+    start = time.time()
+    try:
+        response = __retryrequest(context, method, url, data, stream=stream, retry=retry, headers=headers)
+    except requests.exceptions.RequestException:
+        __apistat(method, url, 'error', time.time() - start)
+        raise
+    if stream is True:
+        nbytes = int(response.headers.get('Content-Length', 0))
+    else:
+        nbytes = len(response.content)
+    __apistat(method, url, response.status_code, time.time() - start, nbytes, response.retries)
+    return response
+
+
+def __retryrequest(context, method, url, data=None, stream=False, retry=None, headers=None):
+    """send request, retrying (GETs, or writes flagged retry=True) on connection errors and 429/502/503/504"""
+    host = urlparse(url).netloc.lower()
+    retryable = (method == 'get' and retry is not False) or retry is True
+    attempt = 0
+    while True:
+        __circuitcheck(host)
+        try:
+            response = __send(context, method, url, data, stream=stream, headers=headers)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            __circuitresult(host, False)
+            if retryable is False or attempt >= RETRYPOLICY['RETRIES']:
+                raise
+            delay = __backoff(attempt)
+            __writelog('retrying in %0.1f seconds: %s' % (delay, e), endpoint='%s %s' % (method, url))
+        else:
+            if response.status_code not in RETRYPOLICY['STATUSCODES']:
+                __circuitresult(host, True)
+                response.retries = attempt
+                return response
+            if response.status_code != 429:
+                __circuitresult(host, False)
+            if retryable is False or attempt >= RETRYPOLICY['RETRIES']:
+                response.retries = attempt
+                return response
+            delay = __retryafter(response)
+            if delay is None:
+                delay = __backoff(attempt)
+            response.close()
+            __writelog('retrying in %0.1f seconds: status %s' % (delay, response.status_code), endpoint='%s %s' % (method, url), latency=response.elapsed.total_seconds() if hasattr(response, 'elapsed') else None)
+        attempt += 1
+        time.sleep(delay)
+
+
+def __backoff(attempt):
+    """exponential backoff with jitter"""
+    delay = min(RETRYPOLICY['MAXBACKOFF'], RETRYPOLICY['BACKOFF'] * (2 ** attempt))
+    return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+
+def __retryafter(response):
+    """seconds requested by a Retry-After header (or None)"""
+    retryafter = response.headers.get('Retry-After', None)
+    if retryafter is None:
+        return None
+    try:
+        delay = float(retryafter)
+    except ValueError:
+        try:
+            delay = email.utils.mktime_tz(email.utils.parsedate_tz(retryafter)) - time.time()
+        except Exception:
+            return None
+    return max(0, min(delay, RETRYPOLICY['MAXRETRYAFTER'])) + random.uniform(0, 1)
+
+
+### per cluster circuit breaker
+def __circuitcheck(host):
+    """fail fast while a cluster's circuit is open"""
+    with CIRCUITLOCK:
+        circuit = CIRCUITS.get(host, None)
+        if circuit is not None and circuit['openUntil'] > time.time():
+            raise requests.exceptions.ConnectionError('circuit open for %s after %s consecutive failures' % (host, circuit['failures']))
+
+
+def __circuitresult(host, success):
+    with CIRCUITLOCK:
+        if success is True:
+            if host in CIRCUITS:
+                del CIRCUITS[host]
+            return
+        circuit = CIRCUITS.setdefault(host, {'failures': 0, 'openUntil': 0})
+        circuit['failures'] += 1
+        if circuit['failures'] >= RETRYPOLICY['BREAKERTHRESHOLD']:
+            circuit['openUntil'] = time.time() + RETRYPOLICY['BREAKERCOOLDOWN']
+
+
+def setRetryPolicy(retries=None, backoff=None, maxbackoff=None, statuscodes=None, breakerthreshold=None, breakercooldown=None):
+    """change retry / circuit breaker settings"""
+    if retries is not None:
+        RETRYPOLICY['RETRIES'] = retries
+    if backoff is not None:
+        RETRYPOLICY['BACKOFF'] = backoff
+    if maxbackoff is not None:
+        RETRYPOLICY['MAXBACKOFF'] = maxbackoff
+    if statuscodes is not None:
+        RETRYPOLICY['STATUSCODES'] = statuscodes
+    if breakerthreshold is not None:
+        RETRYPOLICY['BREAKERTHRESHOLD'] = breakerthreshold
+    if breakercooldown is not None:
+        RETRYPOLICY['BREAKERCOOLDOWN'] = breakercooldown
+
+
+### streaming api call
+def __streamitems(context, method, url, uri, data, path, quiet=None, retry=None):
+    """yield the elements of an array in the response (path is a dotted key path, or True for a top level array)"""
+    start = time.time()
+    try:
+        response = __request(context, method, url, data, stream=True, retry=retry)
+        if response.status_code == 401 and __reauth(context) is True:
+            response = __request(context, method, url, data, stream=True, retry=retry)
+        context['LAST_ERROR'] = 'OK'
+    except requests.exceptions.RequestException as e:
+        __writelog(e, endpoint='%s %s' % (method, url), latency=time.time() - start)
+        context['LAST_ERROR'] = '%s' % e
+        if quiet is None:
+            print(e)
+        return
+    if response.status_code != 200:
+        # errors and empty responses are small, process them as usual
+        result = __apiresponse(context, response, uri, quiet)
+        if isinstance(result, list):
+            for item in result:
+                yield item
+        return
+    if path is True or path == '':
+        keys = []
+    else:
+        keys = path.split('.')
+    try:
+        if ijson is not None:
+            response.raw.decode_content = True
+            for item in ijson.items(response.raw, '.'.join(keys + ['item']), use_float=True):
+                yield item
+        else:
+            for item in __jsonitems(response.iter_content(chunk_size=1048576), keys):
+                yield item
+    finally:
+        response.close()
+
+
+### incremental json array parser
+def __jsonitems(chunks, keys):
+    """yield elements of the array found at keys (list of object keys) in a stream of json bytes"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    state = {'buf': '', 'pos': 0, 'eof': False}
+
+    def fill():
+        for chunk in chunks:
+            text = utf8.decode(chunk)
+            if text:
+                state['buf'] = state['buf'][state['pos']:] + text
+                state['pos'] = 0
+                return True
+        state['eof'] = True
+        return False
+
+    def peek():
+        while True:
+            buf = state['buf']
+            pos = state['pos']
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            state['pos'] = pos
+            if pos < len(buf):
+                return buf[pos]
+            if fill() is False:
+                return None
+
+    def value():
+        peek()
+        while True:
+            try:
+                (obj, end) = decoder.raw_decode(state['buf'], state['pos'])
+                if end < len(state['buf']) or state['eof'] is True or isinstance(obj, bool) or not isinstance(obj, numbers.Number):
+                    state['pos'] = end
+                    return obj
+                # a number or literal at the end of the buffer may continue in the next chunk
+                if fill() is False:
+                    state['pos'] = end
+                    return obj
+            except ValueError:
+                if fill() is False:
+                    raise
+
+    for key in keys:
+        if peek() != '{':
+            return
+        state['pos'] += 1
+        while True:
+            c = peek()
+            if c is None or c == '}':
+                return
+            if c == ',':
+                state['pos'] += 1
+                continue
+            thiskey = value()
+            if peek() != ':':
+                return
+            state['pos'] += 1
+            if thiskey == key:
+                break
+            value()
+    if peek() != '[':
+        return
+    state['pos'] += 1
+    while True:
+        c = peek()
+        if c is None or c == ']':
+            return
+        if c == ',':
+            state['pos'] += 1
+            continue
+        yield value()
+
+
+### re-authenticate after token expiry
+def __reauth(context):
+    """re-authenticate once with the original credentials (returns True if successful)"""
+    authargs = context.get('AUTHARGS', None)
+    if authargs is None:
+        return False
+    context['AUTHARGS'] = None
+    __tokendrop(__tokenfile(authargs['vip'], authargs['domain'], authargs['username'], authargs['useApiKey'], authargs['tenantId'], authargs['password']))
+    __writelog('re-authenticating to %s' % authargs['vip'])
+    apiauth(quiet=True, noretry=True, prompt=False, context=context, **authargs)
+    return context['AUTHENTICATED']
+
+
+### access token cache
+def __tokenfile(vip, domain, username, useApiKey, tenantId, pwd):
+    tokenkey = '%s|%s|%s|%s|%s|%s' % (vip.lower(), domain.lower(), username.lower(), useApiKey, tenantId, pwd)
+    return os.path.join(TOKENCACHE['DIR'], hashlib.sha256(tokenkey.encode('utf-8')).hexdigest())
+
+
+def __tokenget(tokenfile):
+    if TOKENCACHE['ENABLED'] is not True:
+        return None
+    try:
+        f = open(tokenfile, 'r')
+        token = json.load(f)
+        f.close()
+        if token['expires'] > time.time():
+            return token['header']
+        os.remove(tokenfile)
+    except Exception:
+        pass
+    return None
+
+
+def __tokenput(tokenfile, header):
+    if TOKENCACHE['ENABLED'] is not True:
+        return
+    try:
+        if os.path.isdir(TOKENCACHE['DIR']) is False:
+            os.makedirs(TOKENCACHE['DIR'], 0o700)
+        tmpfile = '%s.%s.tmp' % (tokenfile, os.getpid())
+        f = os.fdopen(os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w')
+        json.dump({'expires': time.time() + TOKENCACHE['TTL'], 'header': header}, f)
+        f.close()
+        os.rename(tmpfile, tokenfile)
+    except Exception:
+        pass
+
+
+def __tokendrop(tokenfile):
+    try:
+        os.remove(tokenfile)
+    except Exception:
+        pass
+
+
+### build api url
+def __apiurl(context, uri, mcm=None, mcmv2=None, v=1, reportingv2=None):
+    """return full url (and the uri used for error messages)"""
     if mcm is not None:
-        url = THISCONTEXT['APIROOTMCM'] + uri
+        url = context['APIROOTMCM'] + uri
     elif mcmv2 is not None:
-        url = THISCONTEXT['APIROOTMCMv2'] + uri
+        url = context['APIROOTMCMv2'] + uri
     elif reportingv2 is not None:
-        url = THISCONTEXT['APIROOTREPORTINGv2'] + uri
+        url = context['APIROOTREPORTINGv2'] + uri
     else:
         if v == 2:
-            url = THISCONTEXT['APIROOTv2'] + uri
+            url = context['APIROOTv2'] + uri
         else:
             if uri[0] != '/':
                 uri = '/public/' + uri
-            url = THISCONTEXT['APIROOT'] + uri
+            url = context['APIROOT'] + uri
+    return (url, uri)
+
+
+### api call statistics
+def __apitemplate(url):
+    """endpoint template of a url (ids and query values removed)"""
+    parsed = urlparse(url)
+    path = parsed.path
+    if path.startswith('/irisservices/api/v1/'):
+        path = path[len('/irisservices/api/v1/'):]
+    path = '/'.join([STATSIDPATTERN.sub('{id}', p) for p in path.strip('/').split('/')])
+    params = sorted(set([k for (k, v) in parse_qsl(parsed.query, keep_blank_values=True)]))
+    if len(params) > 0:
+        path += '?' + '&'.join(params)
+    return path
+
+
+def __apistat(method, url, status, latency, nbytes=0, retries=0):
+    """record one api call"""
+    key = (method, __apitemplate(url), str(status))
+    with APISTATSLOCK:
+        stat = APISTATS['CALLS'].get(key, None)
+        if stat is None:
+            stat = APISTATS['CALLS'][key] = {'calls': 0, 'seconds': 0.0, 'maxSeconds': 0.0, 'bytes': 0, 'retries': 0}
+        stat['calls'] += 1
+        stat['seconds'] += latency
+        stat['maxSeconds'] = max(stat['maxSeconds'], latency)
+        stat['bytes'] += nbytes
+        stat['retries'] += retries
+
+
+def apiStats():
+    """list of per endpoint statistics for api calls made so far"""
+    with APISTATSLOCK:
+        return [dict(method=k[0], endpoint=k[1], status=k[2], **v) for (k, v) in sorted(APISTATS['CALLS'].items())]
+
+
+def printApiStats(out=None):
+    """print summary table of api calls"""
+    if out is None:
+        out = sys.stderr
+    stats = sorted(apiStats(), key=lambda s: s['seconds'], reverse=True)
+    out.write('\n%8s %9s %9s %10s %8s  %-7s %-7s %s\n' % ('Calls', 'Avg ms', 'Max ms', 'MiB', 'Retries', 'Method', 'Status', 'Endpoint'))
+    for stat in stats:
+        out.write('%8s %9.1f %9.1f %10.2f %8s  %-7s %-7s %s\n' % (stat['calls'], 1000 * stat['seconds'] / stat['calls'], 1000 * stat['maxSeconds'], stat['bytes'] / 1048576.0, stat['retries'], stat['method'], stat['status'], stat['endpoint']))
+    out.write('%8s calls, %0.1f seconds\n\n' % (sum([s['calls'] for s in stats]), sum([s['seconds'] for s in stats])))
+
+
+def writeApiStats(filename):
+    """write api statistics as a prometheus textfile (.prom) or json lines (anything else)"""
+    script = os.path.basename(sys.argv[0]) if len(sys.argv) > 0 and sys.argv[0] else 'python'
+    filename = filename.replace('{script}', script)
+    stats = apiStats()
+    try:
+        if filename.endswith('.prom'):
+            metrics = [('pyhesity_api_calls_total', 'counter', 'api calls', 'calls'),
+                       ('pyhesity_api_latency_seconds_sum', 'counter', 'total api call latency', 'seconds'),
+                       ('pyhesity_api_latency_seconds_max', 'gauge', 'slowest api call', 'maxSeconds'),
+                       ('pyhesity_api_response_bytes_total', 'counter', 'api response bytes', 'bytes'),
+                       ('pyhesity_api_retries_total', 'counter', 'api call retries', 'retries')]
+            tmpfile = '%s.%s.tmp' % (filename, os.getpid())
+            f = open(tmpfile, 'w')
+            for (name, metrictype, description, field) in metrics:
+                f.write('# HELP %s %s\n# TYPE %s %s\n' % (name, description, name, metrictype))
+                for stat in stats:
+                    f.write('%s{script="%s",method="%s",endpoint="%s",status="%s"} %s\n' % (name, script, stat['method'], stat['endpoint'], stat['status'], stat[field]))
+            f.close()
+            os.rename(tmpfile, filename)
+        else:
+            f = open(filename, 'a')
+            now = dateToString(datetime.now())
+            for stat in stats:
+                stat['script'] = script
+                stat['time'] = now
+                f.write('%s\n' % json.dumps(stat, sort_keys=True))
+            f.close()
+    except Exception as e:
+        __writelog('error writing api stats: %s' % e)
 
-    if method in APIMETHODS:
+
+def __apistatsexit():
+    if len(APISTATS['CALLS']) == 0:
+        return
+    if os.environ.get('PYHESITY_STATS', '0') not in ['', '0']:
+        printApiStats()
+    if os.environ.get('PYHESITY_STATS_FILE', '') != '':
+        writeApiStats(os.environ['PYHESITY_STATS_FILE'])
+
+
+atexit.register(__apistatsexit)
+
+
+### api response cache
+def enableApiCache(ttl=None, maxbytes=None, cachedir=None):
+    """cache read-mostly GETs on disk (ttl is a dict of {resource: seconds})"""
+    if ttl is not None:
+        APICACHE['TTL'].update(ttl)
+    if maxbytes is not None:
+        APICACHE['MAXBYTES'] = maxbytes
+    if cachedir is not None:
+        APICACHE['DIR'] = cachedir
+    APICACHE['ENABLED'] = True
+
+
+def disableApiCache():
+    APICACHE['ENABLED'] = False
+
+
+def clearApiCache():
+    """delete all cached responses"""
+    for (root, dirs, files) in os.walk(APICACHE['DIR'], topdown=False):
+        for name in files:
+            try:
+                os.remove(os.path.join(root, name))
+            except Exception:
+                pass
+
+
+def __cachefamily(url):
+    """resource family of a url (e.g. protectionJobs for public/protectionJobs/123)"""
+    path = urlparse(url).path
+    for prefix in ['/irisservices/api/v1/public/', '/irisservices/api/v1/', '/v2/mcm/', '/v2/', '/mcm/']:
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    parts = [p for p in path.split('/') if p != '']
+    if len(parts) == 0:
+        return None
+    if len(parts) > 1 and '/'.join(parts[0:2]) in CACHEFAMILIES:
+        return CACHEFAMILIES['/'.join(parts[0:2])]
+    return CACHEFAMILIES.get(parts[0], parts[0])
+
+
+def __cachepaths(context, url):
+    """(family folder, entry file) for a url in this context"""
+    family = __cachefamily(url)
+    if family is None:
+        return (None, None)
+    header = context['HEADER']
+    parsed = urlparse(url)
+    identity = '%s|%s|%s|%s' % (parsed.netloc.lower(), header.get('accessClusterId', ''), header.get('x-impersonate-tenant-id', ''), context.get('USER', ''))
+    identity = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    entry = hashlib.sha1(('%s?%s' % (parsed.path, query)).encode('utf-8')).hexdigest()
+    folder = os.path.join(APICACHE['DIR'], identity, family)
+    return (folder, os.path.join(folder, entry + '.json'))
+
+
+def __cacheget(context, url):
+    family = __cachefamily(url)
+    if family not in APICACHE['TTL']:
+        return None
+    (folder, entry) = __cachepaths(context, url)
+    try:
+        f = open(entry, 'r')
+        cached = json.load(f)
+        f.close()
+        if time.time() - cached['time'] > APICACHE['TTL'][family]:
+            size = os.path.getsize(entry)
+            os.remove(entry)
+            __cachesize(-size)
+            return None
+        os.utime(entry, None)  # most recently used
+        return cached['response']
+    except Exception:
+        return None
+
+
+def __cacheput(context, url, response):
+    family = __cachefamily(url)
+    if family not in APICACHE['TTL'] or response is None or response == '':
+        return
+    (folder, entry) = __cachepaths(context, url)
+    try:
+        if os.path.isdir(folder) is False:
+            os.makedirs(folder)
+        oldsize = 0
+        if os.path.exists(entry):
+            oldsize = os.path.getsize(entry)
+        tmpfile = '%s.%s.tmp' % (entry, os.getpid())
+        f = open(tmpfile, 'w')
+        json.dump({'time': time.time(), 'url': url, 'response': response}, f)
+        f.close()
+        os.rename(tmpfile, entry)
+        __cachesize(os.path.getsize(entry) - oldsize)
+    except Exception:
+        pass
+
+
+def __cacheinvalidate(context, url):
+    """drop cached responses for the resource family of a write"""
+    (folder, entry) = __cachepaths(context, url)
+    if folder is None or os.path.isdir(folder) is False:
+        return
+    removedbytes = 0
+    for name in os.listdir(folder):
         try:
-            if method == 'get':
-                response = requests.get(url, headers=THISCONTEXT['HEADER'], verify=False, timeout=300)
-            if method == 'post':
-                response = requests.post(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=300)
-            if method == 'put':
-                response = requests.put(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=300)
-            if method == 'delete':
-                response = requests.delete(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=300)
-            COHESITY_API['LAST_ERROR'] = 'OK'
-        except requests.exceptions.RequestException as e:
-            __writelog(e)
-            COHESITY_API['LAST_ERROR'] = '%s' % e
-            if quiet is None:
-                print(e)
+            size = os.path.getsize(os.path.join(folder, name))
+            os.remove(os.path.join(folder, name))
+            removedbytes += size
+        except Exception:
+            pass
+    if removedbytes > 0:
+        __cachesize(-removedbytes)
 
-        if isinstance(response, bool):
-            return ''
-        if response != '':
-            if response.status_code == 204:
-                COHESITY_API['LAST_ERROR'] = response.reason
-                return ''
-            if response.status_code == 404:
-                COHESITY_API['LAST_ERROR'] = response.reason
-                if quiet is None:
-                    print('Invalid api call: ' + uri)
-                return None
+
+def __cachesize(delta):
+    """add delta to the total size of the cache kept in its index file (locked, so puts don't have to scan the cache),
+    recounting the cache when the index is missing or stale and trimming it when it is over its limit, returns the new total"""
+    indexfile = os.path.join(APICACHE['DIR'], 'cachesize')
+    lockfile = open('%s.lock' % indexfile, 'a')
+    try:
+        if fcntl is not None:
+            fcntl.flock(lockfile.fileno(), fcntl.LOCK_EX)
+        try:
+            if time.time() - os.path.getmtime(indexfile) > APICACHE['RECOUNTSECS']:
+                return __cacheevict()  # other processes may have changed the cache without the index
+            f = open(indexfile, 'r')
+            totalbytes = max(0, int(f.read()) + delta)
+            f.close()
+        except Exception:
+            return __cacheevict()  # no index yet: count (and trim) the cache once
+        if totalbytes > APICACHE['MAXBYTES']:
+            return __cacheevict()
+        __cachesizeput(totalbytes)
+        return totalbytes
+    finally:
+        lockfile.close()
+
+
+def __cachesizeput(totalbytes):
+    indexfile = os.path.join(APICACHE['DIR'], 'cachesize')
+    try:
+        tmpfile = '%s.%s.tmp' % (indexfile, os.getpid())
+        f = open(tmpfile, 'w')
+        f.write('%s' % totalbytes)
+        f.close()
+        try:
+            os.rename(tmpfile, indexfile)
+        except OSError:
+            os.remove(indexfile)  # windows won't rename over an existing file
+            os.rename(tmpfile, indexfile)
+    except Exception:
+        pass
+
+
+def __cacheevict():
+    """count the cache and, if it is over its size limit, remove least recently used entries, returns the new total (call with the index locked)"""
+    entries = []
+    totalbytes = 0
+    for (root, dirs, files) in os.walk(APICACHE['DIR']):
+        for name in files:
+            if root == APICACHE['DIR'] and name.startswith('cachesize'):
+                continue
             try:
-                responsejson = response.json()
-            except ValueError as ve:
-                COHESITY_API['LAST_ERROR'] = response.reason
-                return None
-            if isinstance(responsejson, bool):
-                return ''
-            if responsejson is not None:
-                if 'errorCode' in responsejson:
-                    if 'message' in responsejson:
-                        COHESITY_API['LAST_ERROR'] = responsejson['errorCode'][1:] + ': ' + responsejson['message']
-                        if quiet is None:
-                            print(responsejson['errorCode'][1:] + ': ' + responsejson['message'])
-                            return {'error': responsejson['errorCode'][1:] + ': ' + responsejson['message']}
-                        else:
-                            return None
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                totalbytes += stat.st_size
+            except Exception:
+                pass
+    if totalbytes > APICACHE['MAXBYTES']:
+        # trim to 90% of the limit, so the next few puts don't have to evict again
+        for (mtime, size, path) in sorted(entries):
+            try:
+                os.remove(path)
+                totalbytes -= size
+            except Exception:
+                pass
+            if totalbytes <= APICACHE['MAXBYTES'] * 0.9:
+                break
+    __cachesizeput(totalbytes)
+    return totalbytes
+
+
+### in-process memoization
+def enableApiMemo(families=None, maxentries=None):
+    """reuse GET responses of the named resource families for the rest of this run (writes drop memoized responses of the same resource)"""
+    if families is not None:
+        if not isinstance(families, list):
+            families = [families]
+        APIMEMO['FAMILIES'] = families
+    if maxentries is not None:
+        APIMEMO['MAXENTRIES'] = maxentries
+    APIMEMO['ENABLED'] = True
+
+
+def disableApiMemo():
+    APIMEMO['ENABLED'] = False
+    with APIMEMO['LOCK']:
+        APIMEMO['RESPONSES'].clear()
+
+
+def __memoable(url):
+    """only memoize the chosen families, never runs or pages of a paged GET"""
+    if __cachefamily(url) not in APIMEMO['FAMILIES']:
+        return False
+    parsed = urlparse(url)
+    if 'protectionRuns' in parsed.path or '/runs' in parsed.path:
+        return False
+    pageparams = [style[p] for style in PAGESTYLES.values() for p in ['cursor', 'offset'] if p in style] + [PAGESTYLES['cookie']['size']]
+    if len([p for p in parsed.query.split('&') if p.split('=')[0] in pageparams]) > 0:
+        return False
+    return True
+
+
+def __memoget(context, url):
+    """memoized result, or wait for an identical call in flight, or claim the call"""
+    header = context['HEADER']
+    identity = '%s|%s|%s' % (header.get('accessClusterId', ''), header.get('x-impersonate-tenant-id', ''), context.get('USER', ''))
+    key = (identity, __cachefamily(url), url)
+    while True:
+        with APIMEMO['LOCK']:
+            if key in APIMEMO['RESPONSES']:
+                response = APIMEMO['RESPONSES'].pop(key)
+                APIMEMO['RESPONSES'][key] = response
+                return {'key': key, 'result': json.loads(response)}
+            inflight = APIMEMO['INFLIGHT'].get(key, None)
+            if inflight is None:
+                APIMEMO['INFLIGHT'][key] = threading.Event()
+                return {'key': key}
+        inflight.wait()
+
+
+def __memoput(memo):
+    """store the result of a claimed call (if successful) and release any waiting identical calls"""
+    with APIMEMO['LOCK']:
+        if 'result' in memo and memo['result'] is not None and APIMEMO['ENABLED'] is True:
+            APIMEMO['RESPONSES'][memo['key']] = json.dumps(memo['result'])
+            while len(APIMEMO['RESPONSES']) > APIMEMO['MAXENTRIES']:
+                APIMEMO['RESPONSES'].popitem(last=False)
+        inflight = APIMEMO['INFLIGHT'].pop(memo['key'], None)
+    if inflight is not None:
+        inflight.set()
+
+
+def __memoinvalidate(context, url):
+    """drop memoized responses for the resource family of a write"""
+    family = __cachefamily(url)
+    with APIMEMO['LOCK']:
+        for key in [k for k in APIMEMO['RESPONSES'] if k[1] == family]:
+            del APIMEMO['RESPONSES'][key]
+
+
+### process api response
+def __apiresponse(context, response, uri, quiet=None):
+    """return decoded response (or error) the way api() always has"""
+    if isinstance(response, bool):
+        return ''
+    if response != '':
+        if response.status_code == 204:
+            context['LAST_ERROR'] = response.reason
+            return ''
+        if response.status_code == 404:
+            context['LAST_ERROR'] = response.reason
+            if quiet is None:
+                print('Invalid api call: ' + uri)
+            return None
+        try:
+            responsejson = response.json()
+        except ValueError:
+            context['LAST_ERROR'] = response.reason
+            return None
+        if isinstance(responsejson, bool):
+            return ''
+        if responsejson is not None:
+            if 'errorCode' in responsejson:
+                if 'message' in responsejson:
+                    context['LAST_ERROR'] = responsejson['errorCode'][1:] + ': ' + responsejson['message']
+                    if quiet is None:
+                        print(responsejson['errorCode'][1:] + ': ' + responsejson['message'])
+                        return {'error': responsejson['errorCode'][1:] + ': ' + responsejson['message']}
                     else:
-                        if quiet is None:
-                            print(responsejson)
-                            return 'error'
-                        else:
-                            return None
+                        return None
                 else:
-                    return responsejson
+                    if quiet is None:
+                        print(responsejson)
+                        return 'error'
+                    else:
+                        return None
+            else:
+                return responsejson
+
+
+### run a function in the background
+def __prefetch(fn, *args):
+    """start fn(*args) in a background thread, return a function that waits for the result"""
+    result = {}
+
+    def run():
+        try:
+            result['value'] = fn(*args)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+
+    def wait():
+        thread.join()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+    return wait
+
+
+### protection run start time (v1 or v2 run)
+def __runstartusecs(run):
+    if 'backupRun' in run:
+        return run['backupRun']['stats']['startTimeUsecs']
+    if 'copyRun' in run and len(run['copyRun']) > 0:
+        return run['copyRun'][0]['runStartTimeUsecs']
+    for info in ['localBackupInfo', 'originalBackupInfo']:
+        if info in run:
+            return run[info]['startTimeUsecs']
+    if 'archivalInfo' in run:
+        return run['archivalInfo']['archivalTargetResults'][0]['startTimeUsecs']
+    if 'replicationInfo' in run:
+        return run['replicationInfo']['replicationTargetResults'][0]['startTimeUsecs']
+    return None
+
+
+### iterate protection runs
+def iterRuns(job, since=None, page=1000, v=1, endUsecs=None, params=None, context=None):
+    """yield protection runs (newest first), fetching the next page while the caller processes this one"""
+    if isinstance(job, dict):
+        jobId = job['id']
     else:
-        if quiet is None:
-            print("invalid api method")
+        jobId = job
+
+    def getpage(endTimeUsecs):
+        if v == 2:
+            uri = 'data-protect/protection-groups/%s/runs?numRuns=%s' % (jobId, page)
+        else:
+            uri = 'protectionRuns?jobId=%s&numRuns=%s' % (jobId, page)
+        if endTimeUsecs is not None:
+            uri += '&endTimeUsecs=%s' % endTimeUsecs
+        if params is not None:
+            uri += '&%s' % params
+        runs = api('get', uri, v=v, context=context)
+        if v == 2:
+            if isinstance(runs, dict) and 'runs' in runs:
+                return runs['runs']
+            return []
+        if isinstance(runs, list):
+            return runs
+        return []
+
+    lastpage = set()
+    nextpage = __prefetch(getpage, endUsecs)
+    while True:
+        runs = [r for r in nextpage() if __runstartusecs(r) is not None]
+        thispage = set([__runstartusecs(r) for r in runs])
+        newruns = [r for r in runs if __runstartusecs(r) not in lastpage]
+        if len(newruns) == 0:
+            return
+        lastpage = thispage
+        if since is None or min(thispage) >= since:
+            nextpage = __prefetch(getpage, min(thispage) - 1)
+        else:
+            nextpage = lambda: []
+        for run in newruns:
+            if since is not None and __runstartusecs(run) < since:
+                return
+            yield run
+
+
+### iterate the items of a paged GET
+def paginate(uri, style='cookie', key=None, page=1000, parallel=None, v=2, context=None, **kwargs):
+    """yield the items of a paged GET, fetching the next page while the caller processes this one. style is cookie
+    (maxCount / paginationCookie), count (count / startIndex) or offset (size / from). With parallel=N, count and
+    offset pages are fetched N at a time when the response includes the total"""
+    pagestyle = PAGESTYLES[style]
+    separator = '&' if '?' in uri else '?'
+
+    def getpage(cursor):
+        params = [(pagestyle['size'], page)]
+        if cursor is not None:
+            params.append((pagestyle.get('cursor', None) or pagestyle['offset'], cursor))
+        return api('get', '%s%s%s' % (uri, separator, urlencode(params)), v=v, context=context, **kwargs)
+
+    def items(response):
+        if isinstance(response, list):
+            return response
+        if not isinstance(response, dict):
+            return []
+        if key is not None:
+            return response.get(key, None) or []
+        for value in response.values():
+            if isinstance(value, list):
+                return value
+        return []
+
+    # cookie: each page points to the next
+    if 'cursor' in pagestyle:
+        nextpage = __prefetch(getpage, None)
+        while nextpage is not None:
+            response = nextpage()
+            pageitems = items(response)
+            cookie = response.get(pagestyle['cursor'], None) if isinstance(response, dict) else None
+            nextpage = None
+            if cookie and len(pageitems) > 0:
+                nextpage = __prefetch(getpage, cookie)
+            for item in pageitems:
+                yield item
+        return
+
+    # count / offset: pages are at known offsets (and if the total is known, several can be fetched at once)
+    response = getpage(0)
+    total = response.get(pagestyle['total'], None) if isinstance(response, dict) else None
+    if not isinstance(total, numbers.Integral):
+        total = None
+    workers = max(1, parallel or 1) if total is not None else 1
+    offset = page
+    pending = []
+    while True:
+        pageitems = items(response)
+        if total is not None or len(pageitems) >= page:
+            while len(pending) < workers and (total is None or offset < total):
+                pending.append(__prefetch(getpage, offset))
+                offset += page
+        for item in pageitems:
+            yield item
+        if len(pageitems) == 0 or (total is None and len(pageitems) < page) or len(pending) == 0:
+            return
+        response = pending.pop(0)()
+
+
+### update many protection runs
+def updateRuns(jobRuns, threads=8, dryrun=False, journal=None, retry=False, context=None):
+    """apply protectionRuns updates (jobRuns entries with a jobId instead of a jobUid) concurrently, returns per item results.
+    only set retry=True if repeating an update is harmless (e.g. daysToKeep 0 to expire, not a relative extension)"""
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    results = [None] * len(jobRuns)
+    finished = set()
+    if journal is not None and os.path.exists(journal):
+        f = open(journal, 'r')
+        for line in f:
+            try:
+                finished.add(json.loads(line)['key'])
+            except Exception:
+                pass  # partial line from an interrupted run
+        f.close()
+    lock = threading.Lock()
+    todo = []
+    for (i, jobRun) in enumerate(jobRuns):
+        key = hashlib.sha256(json.dumps(jobRun, sort_keys=True).encode('utf-8')).hexdigest()
+        results[i] = {'jobId': jobRun.get('jobId', None), 'runStartTimeUsecs': jobRun['runStartTimeUsecs'], 'status': None, 'error': None}
+        if key in finished:
+            results[i]['status'] = 'resumed'
+        elif dryrun is True:
+            results[i]['status'] = 'dryrun'
+        else:
+            todo.append((i, key))
+    journalfile = None
+    if journal is not None and len(todo) > 0:
+        journalfile = open(journal, 'a')
+
+    def update(i, key):
+        jobRun = dict(jobRuns[i])
+        jobId = jobRun.pop('jobId', None)
+        if 'jobUid' not in jobRun:
+            thisRun = api('get', '/backupjobruns?id=%s&exactMatchStartTimeUsecs=%s' % (jobId, jobRun['runStartTimeUsecs']), quiet=True, context=THISCONTEXT)
+            try:
+                jobUid = thisRun[0]['backupJobRuns']['protectionRuns'][0]['backupRun']['base']['jobUid']
+            except Exception:
+                return 'run not found: %s' % LAST_API_ERROR(THISCONTEXT)
+            jobRun['jobUid'] = {
+                'clusterId': jobUid['clusterId'],
+                'clusterIncarnationId': jobUid['clusterIncarnationId'],
+                'id': jobUid['objectId']
+            }
+        result = api('put', 'protectionRuns', {'jobRuns': [jobRun]}, quiet=True, retry=retry, context=THISCONTEXT)
+        if result is None:
+            return LAST_API_ERROR(THISCONTEXT)
+        return None
+
+    def worker():
+        while True:
+            with lock:
+                if len(todo) == 0:
+                    return
+                (i, key) = todo.pop(0)
+            try:
+                error = update(i, key)
+            except Exception as e:
+                error = '%s' % e
+            with lock:
+                if error is None:
+                    results[i]['status'] = 'updated'
+                    if journalfile is not None:
+                        journalfile.write(json.dumps({'key': key, 'jobId': results[i]['jobId'], 'runStartTimeUsecs': results[i]['runStartTimeUsecs']}) + '\n')
+                        journalfile.flush()
+                else:
+                    results[i]['status'] = 'failed'
+                    results[i]['error'] = error
+                    __writelog('updateRuns: job %s run %s failed: %s' % (results[i]['jobId'], results[i]['runStartTimeUsecs'], error))
+
+    try:
+        workers = [threading.Thread(target=worker) for t in range(max(1, min(threads, len(todo))))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        if journalfile is not None:
+            journalfile.close()
+    if journal is not None and dryrun is not True and os.path.exists(journal) and len([r for r in results if r['status'] == 'failed']) == 0:
+        os.remove(journal)
+    return results
 
 
 ### convert usecs to date string
@@ -459,11 +1786,18 @@ def dayDiff(newdate, olddate):
     return int(round((newdate - olddate) / float(86400000000)))
 
 
-### get/store password for future runs
-def __getpassword(vip, username, password, domain, useApiKey, helios, updatepw, prompt):
-    """get/set stored password"""
-    if domain.lower() != 'local' and helios is False and vip != 'helios.cohesity.com' and useApiKey is False:
-        vip = '--'  # wildcard vip
+### credential store
+def __pwkey(vip, domain, username, useApiKey):
+    return '%s:%s:%s:%s' % (vip.lower(), domain.lower(), username.lower(), useApiKey)
+
+
+def __pwlegacypath(vip, domain, username, useApiKey):
+    return os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
+
+
+def __pwfileread():
+    """list of (vip, domain, username, useApiKey, opwd) from PWFILE"""
+    entries = []
     if os.path.exists(PWFILE):
         f = open(PWFILE, 'r')
         pwdlist = [e.strip() for e in f.readlines() if e.strip() != '']
@@ -471,56 +1805,202 @@ def __getpassword(vip, username, password, domain, useApiKey, helios, updatepw,
         for pwditem in pwdlist:
             try:
                 v, d, u, k, opwd = pwditem.split(":", 5)
-                if v.lower() == vip.lower() and d.lower() == domain.lower() and u.lower() == username.lower() and k == str(useApiKey):
-                    if password is not None:
-                        setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey, password=password)
-                        return password
-                    if updatepw is not None:
-                        setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey)
-                        return pw(vip, username, domain)
-                    else:
-                        return base64.b64decode(opwd.encode('utf-8')).decode('utf-8')
+                entries.append((v, d, u, k, opwd))
             except Exception:
                 pass
-    pwpath = os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
-    if password is not None:
-        pwd = password
+    return entries
+
+
+def __pwfilewrite(v, d, u, useApiKey, opwd):
+    """add or replace an entry in PWFILE (locked, written to a temp file and renamed)"""
+    lockfile = open('%s.lock' % PWFILE, 'a')
+    try:
+        if fcntl is not None:
+            fcntl.flock(lockfile.fileno(), fcntl.LOCK_EX)
+        tmpfile = '%s.%s.tmp' % (PWFILE, os.getpid())
+        f = open(tmpfile, 'w')
+        foundPwd = False
+        for (vip, domain, username, k, cpwd) in __pwfileread():
+            if __pwkey(vip, domain, username, k) == __pwkey(v, d, u, useApiKey):
+                f.write('%s:%s:%s:%s:%s\n' % (v, d, u, useApiKey, opwd))
+                foundPwd = True
+            else:
+                f.write('%s:%s:%s:%s:%s\n' % (vip, domain, username, k, cpwd))
+        if foundPwd is False:
+            f.write('%s:%s:%s:%s:%s\n' % (v, d, u, useApiKey, opwd))
+        f.close()
         try:
-            pwdfile = open(pwpath, 'w')
-            opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
-            pwdfile.write(opwd)
-            pwdfile.close()
-            return pwd
-        except Exception:
-            __writelog('error storing password')
-            print('error storing password')
-            return pwd
-    if updatepw is not None:
-        if os.path.isfile(pwpath) is True:
-            os.remove(pwpath)
+            os.rename(tmpfile, PWFILE)
+        except OSError:
+            os.remove(PWFILE)  # windows won't rename over an existing file
+            os.rename(tmpfile, PWFILE)
+    finally:
+        lockfile.close()
+
+
+def __pwimport(db, force=False):
+    """(re)import PWFILE entries if PWFILE has changed since the last import"""
+    if os.path.exists(PWFILE) is False:
+        return
+    stat = os.stat(PWFILE)
+    signature = '%s:%s' % (stat.st_mtime, stat.st_size)
+    row = db.execute('select signature from imports where path = ?', (PWFILE,)).fetchone()
+    if force is False and row is not None and row[0] == signature:
+        return
+    with db:
+        db.execute('delete from credentials where origin = ?', (PWFILE,))
+        for (v, d, u, k, opwd) in __pwfileread():
+            db.execute('insert or replace into credentials values (?, ?, ?)', (__pwkey(v, d, u, k), PWFILE, opwd))
+        db.execute('insert or replace into imports values (?, ?)', (PWFILE, signature))
+
+
+def __pwstore(force=False):
+    """open the credential store (None if disabled)"""
+    if PWSTORE['ENABLED'] is not True:
+        return None
+    if os.path.exists(PWSTORE['FILE']) is False:
+        os.close(os.open(PWSTORE['FILE'], os.O_WRONLY | os.O_CREAT, 0o600))
+    db = sqlite3.connect(PWSTORE['FILE'], timeout=PWSTORE['TIMEOUT'])
+    try:
+        db.execute('create table if not exists credentials (key text, origin text, opwd text, primary key (key, origin))')
+        db.execute('create table if not exists imports (path text primary key, signature text)')
+        __pwimport(db, force)
+    except Exception:
+        db.close()
+        raise
+    return db
+
+
+def __pwget(vip, domain, username, useApiKey):
+    """returns (password, origin) - origin is PWFILE or '' (None, None if not found)"""
+    key = __pwkey(vip, domain, username, useApiKey)
+    row = None
     try:
-        pwdfile = open(pwpath, 'r')
-        opwd = pwdfile.read()
-        pwd = base64.b64decode(opwd.encode('utf-8')).decode('utf-8')
+        db = __pwstore()
+    except Exception as e:
+        __writelog('credential store unavailable: %s' % e)
+        db = None
+    if db is not None:
+        try:
+            row = db.execute("select opwd, origin from credentials where key = ? and origin in (?, '') order by origin = '' limit 1", (key, PWFILE)).fetchone()
+            if row is None:
+                # migrate password file from ~/.pyhesity
+                opwd = __pwlegacyread(vip, domain, username, useApiKey)
+                if opwd is not None:
+                    with db:
+                        db.execute("insert or replace into credentials values (?, '', ?)", (key, opwd))
+                    row = (opwd, '')
+        except Exception as e:
+            __writelog('credential store error: %s' % e)
+        finally:
+            db.close()
+    else:
+        for (v, d, u, k, opwd) in __pwfileread():
+            if __pwkey(v, d, u, k) == key:
+                row = (opwd, PWFILE)
+                break
+        if row is None:
+            opwd = __pwlegacyread(vip, domain, username, useApiKey)
+            if opwd is not None:
+                row = (opwd, '')
+    if row is None:
+        return (None, None)
+    try:
+        return (base64.b64decode(row[0].encode('utf-8')).decode('utf-8'), row[1])
+    except Exception:
+        return (None, None)
+
+
+def __pwlegacyread(vip, domain, username, useApiKey):
+    try:
+        pwdfile = open(__pwlegacypath(vip, domain, username, useApiKey), 'r')
+        opwd = pwdfile.read().strip()
         pwdfile.close()
-        return pwd
+        return opwd
     except Exception:
-        if prompt is not False:
-            __writelog('prompting for password...')
-            pwd = getpass.getpass("Enter your password: ")
+        return None
+
+
+def __pwput(vip, domain, username, useApiKey, pwd):
+    """store password (returns False on error)"""
+    opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
+    try:
+        db = __pwstore()
+        if db is not None:
             try:
-                pwdfile = open(pwpath, 'w')
-                opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
-                pwdfile.write(opwd)
-                pwdfile.close()
-                return pwd
-            except Exception:
-                print('error storing password')
-                return pwd
-        else:
-            print('no password provided for %s/%s at %s' % (domain, username, vip))
-            __writelog('no password provided for %s/%s at %s' % (domain, username, vip))
-            return None
+                with db:
+                    db.execute("insert or replace into credentials values (?, '', ?)", (__pwkey(vip, domain, username, useApiKey), opwd))
+            finally:
+                db.close()
+            return True
+    except Exception as e:
+        __writelog('credential store error: %s' % e)
+    try:
+        pwpath = __pwlegacypath(vip, domain, username, useApiKey)
+        tmpfile = '%s.%s.tmp' % (pwpath, os.getpid())
+        pwdfile = os.fdopen(os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w')
+        pwdfile.write(opwd)
+        pwdfile.close()
+        try:
+            os.rename(tmpfile, pwpath)
+        except OSError:
+            os.remove(pwpath)
+            os.rename(tmpfile, pwpath)
+        return True
+    except Exception:
+        return False
+
+
+def __pwdrop(vip, domain, username, useApiKey):
+    try:
+        db = __pwstore()
+        if db is not None:
+            try:
+                with db:
+                    db.execute("delete from credentials where key = ? and origin = ''", (__pwkey(vip, domain, username, useApiKey),))
+            finally:
+                db.close()
+    except Exception as e:
+        __writelog('credential store error: %s' % e)
+    pwpath = __pwlegacypath(vip, domain, username, useApiKey)
+    if os.path.isfile(pwpath) is True:
+        os.remove(pwpath)
+
+
+### get/store password for future runs
+def __getpassword(vip, username, password, domain, useApiKey, helios, updatepw, prompt):
+    """get/set stored password"""
+    if domain.lower() != 'local' and helios is False and vip != 'helios.cohesity.com' and useApiKey is False:
+        vip = '--'  # wildcard vip
+    (pwd, origin) = __pwget(vip, domain, username, useApiKey)
+    if origin == PWFILE:
+        if password is not None:
+            if password != pwd:
+                setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey, password=password)
+            return password
+        if updatepw is not None:
+            setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey)
+            return __pwget(vip, domain, username, useApiKey)[0]
+        return pwd
+    if password is not None:
+        if password != pwd and __pwput(vip, domain, username, useApiKey, password) is False:
+            __writelog('error storing password')
+            print('error storing password')
+        return password
+    if updatepw is not None:
+        __pwdrop(vip, domain, username, useApiKey)
+    elif pwd is not None:
+        return pwd
+    if prompt is not False:
+        __writelog('prompting for password...')
+        pwd = getpass.getpass("Enter your password: ")
+        if __pwput(vip, domain, username, useApiKey, pwd) is False:
+            print('error storing password')
+        return pwd
+    else:
+        print('no password provided for %s/%s at %s' % (domain, username, vip))
+        __writelog('no password provided for %s/%s at %s' % (domain, username, vip))
+        return None
 
 
 # store password in PWFILE
@@ -532,27 +2012,13 @@ def setpwd(v='helios.cohesity.com', u='helios', d='local', useApiKey=False, heli
     else:
         pwd = password
     opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
-    if os.path.exists(PWFILE):
-        f = open(PWFILE, 'r')
-        pwdlist = [e.strip() for e in f.readlines() if e.strip() != '']
-        f.close()
-    else:
-        pwdlist = []
-    f = open(PWFILE, 'w')
-    foundPwd = False
-    for pwditem in pwdlist:
-        try:
-            vip, domain, username, k, cpwd = pwditem.split(":", 5)
-            if v.lower() == vip.lower() and d.lower() == domain.lower() and u.lower() == username.lower() and k == str(useApiKey):
-                f.write('%s:%s:%s:%s:%s\n' % (v, d, u, useApiKey, opwd))
-                foundPwd = True
-            else:
-                f.write('%s\n' % pwditem)
-        except Exception:
-            pass
-    if foundPwd is False:
-        f.write('%s:%s:%s:%s:%s\n' % (v, d, u, useApiKey, opwd))
-    f.close()
+    __pwfilewrite(v, d, u, useApiKey, opwd)
+    try:
+        db = __pwstore(force=True)
+        if db is not None:
+            db.close()
+    except Exception as e:
+        __writelog('credential store error: %s' % e)
 
 
 ### pwstore for alternate infrastructure
@@ -564,51 +2030,109 @@ def pw(vip, username, domain='local', password=None, updatepw=None, useApiKey=Fa
 def storePasswordFromInput(vip, username, password, domain='local', useApiKey=False, helios=False):
     if domain.lower() != 'local' and helios is False and vip != 'helios.cohesity.com' and useApiKey is False:
         vip = '--'  # wildcard vip
-    pwpath = os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
-    try:
-        pwdfile = open(pwpath, 'w')
-        opwd = base64.b64encode(password.encode('utf-8')).decode('utf-8')
-        pwdfile.write(opwd)
-        pwdfile.close()
-    except Exception:
+    if __pwput(vip, domain, username, useApiKey, password) is False:
         print('error trying to store password')
 
 
-lastapierrorusecs = dateToUsecs()
-lastapierror = ''
-
-
-### debug log
-def __writelog(logmessage):
-    global lastapierrorusecs
-    global lastapierror
-    apidate = datetime.now()
-    apierrordatestring = apidate.strftime("%Y-%m-%d-%H-%M-%S")
-    apierrorusecs = dateToUsecs(apidate)
-
+### debug log (JSON lines, written by a background thread)
+def __writelog(logmessage, endpoint=None, latency=None):
+    """queue a log entry (repeats of the same message from the same caller within DEDUPSECS are counted, not written)"""
+    now = time.time()
+    frame = sys._getframe(1)
+    while frame.f_back is not None:
+        frame = frame.f_back
+    caller = '%s:%s' % (frame.f_code.co_filename, frame.f_lineno)
+    message = '%s' % logmessage
+    key = (caller, message)
+    with DEBUGLOG['LOCK']:
+        repeats = DEBUGLOG['REPEATS']
+        repeat = repeats.get(key, None)
+        if repeat is not None and now < repeat['time'] + DEBUGLOG['DEDUPSECS']:
+            repeat['count'] += 1
+            return
+        entry = {'time': datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], 'caller': caller, 'message': message}
+        if endpoint is not None:
+            entry['endpoint'] = endpoint
+        if latency is not None:
+            entry['latency'] = round(latency, 3)
+        if repeat is not None and repeat['count'] > 0:
+            entry['suppressed'] = repeat['count']
+        if len(repeats) >= 1000:
+            for oldkey in [k for k in repeats if repeats[k]['time'] + DEBUGLOG['DEDUPSECS'] < now]:
+                __logsuppressed(oldkey, repeats.pop(oldkey))
+        repeats[key] = {'time': now, 'count': 0}
+        __logentry(entry)
+
+
+def __logsuppressed(key, repeat):
+    """write the count of repeats not yet written"""
+    if repeat['count'] > 0:
+        __logentry({'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], 'caller': key[0], 'message': key[1], 'suppressed': repeat['count']})
+
+
+def __logentry(entry):
+    """hand the entry to the log writer thread (or write it now after the writer has stopped)"""
+    if DEBUGLOG['CLOSED'] is True:
+        __logwrite([entry])
+        return
+    if DEBUGLOG['QUEUE'] is None:
+        DEBUGLOG['QUEUE'] = queue.Queue()
+        writer = threading.Thread(target=__logwriter, args=(DEBUGLOG['QUEUE'],))
+        writer.daemon = True
+        writer.start()
+        DEBUGLOG['THREAD'] = writer
+        atexit.register(__logclose)
+    DEBUGLOG['QUEUE'].put(entry)
+
+
+def __logwriter(logqueue):
+    while True:
+        entries = [logqueue.get()]
+        while True:
+            try:
+                entries.append(logqueue.get_nowait())
+            except queue.Empty:
+                break
+        __logwrite([e for e in entries if e is not None])
+        if None in entries:
+            return
+
+
+def __logwrite(entries):
+    """append entries to LOGFILE (keeping the file open and rotating when it passes MAXBYTES)"""
+    if len(entries) == 0:
+        return
+    lines = ''.join(['%s\n' % json.dumps(e) for e in entries])
     try:
-        # rotate log
-        if os.path.exists(LOGFILE):
-            logsize = os.path.getsize(LOGFILE)
-            if logsize > 1048576:
-                os.rename(LOGFILE, '%s-%s.txt' % (LOGFILE, apierrordatestring))
-    except:
-        pass
+        if DEBUGLOG['FILE'] is None:
+            DEBUGLOG['FILE'] = open(LOGFILE, 'a')
+            DEBUGLOG['BYTES'] = os.path.getsize(LOGFILE)
+        if DEBUGLOG['BYTES'] > DEBUGLOG['MAXBYTES']:
+            DEBUGLOG['FILE'].close()
+            # another process may have rotated it already
+            if os.path.getsize(LOGFILE) > DEBUGLOG['MAXBYTES']:
+                os.rename(LOGFILE, '%s-%s.txt' % (LOGFILE, datetime.now().strftime("%Y-%m-%d-%H-%M-%S")))
+            DEBUGLOG['FILE'] = open(LOGFILE, 'a')
+            DEBUGLOG['BYTES'] = os.path.getsize(LOGFILE)
+        DEBUGLOG['FILE'].write(lines)
+        DEBUGLOG['FILE'].flush()
+        DEBUGLOG['BYTES'] += len(lines)
+    except Exception:
+        DEBUGLOG['FILE'] = None
 
-    # avoid race condition
-    callstack = traceback.format_stack()[0].replace('\n', ' ').strip()
-    apierror = '%s :: %s' % (callstack, logmessage)
-    if apierror == lastapierror and apierrorusecs < (lastapierrorusecs + 5000000):
-        time.sleep(5)
-    try:
-        # output log message
-        debuglog = open(LOGFILE, 'a')
-        debuglog.write('%s: %s\n' % (apierrordatestring, apierror))
-        debuglog.close()
-    except:
-        pass
-    lastapierrorusecs = apierrorusecs
-    lastapierror = apierror
+
+def __logclose():
+    """write outstanding repeat counts and wait for the log writer to finish"""
+    with DEBUGLOG['LOCK']:
+        for key in list(DEBUGLOG['REPEATS'].keys()):
+            __logsuppressed(key, DEBUGLOG['REPEATS'].pop(key))
+        DEBUGLOG['QUEUE'].put(None)
+    DEBUGLOG['THREAD'].join(5)
+    with DEBUGLOG['LOCK']:
+        DEBUGLOG['CLOSED'] = True
+        if DEBUGLOG['FILE'] is not None:
+            DEBUGLOG['FILE'].close()
+            DEBUGLOG['FILE'] = None
 
 
 ### display json/dictionary as formatted text
@@ -623,21 +2147,158 @@ def display(myjson):
         print(json.dumps(myjson, sort_keys=True, indent=4, separators=(', ', ': ')))
 
 
-def fileDownload(uri, fileName, v=1):
-    """download file"""
-    if COHESITY_API['AUTHENTICATED'] is False:
-        return "Not Connected"
+def fileDownload(uri, fileName, v=1, context=None, threads=4, partsize=33554432, quiet=None):
+    """download file (in parallel ranged parts when supported, resuming an interrupted download), returns True or False"""
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    if THISCONTEXT['AUTHENTICATED'] is False:
+        THISCONTEXT['LAST_ERROR'] = 'Not Connected'
+        return False
     if v == 2:
-        response = requests.get(COHESITY_API['APIROOTv2'] + uri, headers=COHESITY_API['HEADER'], verify=False, timeout=300, stream=True)
+        url = THISCONTEXT['APIROOTv2'] + uri
     else:
         if uri[0] != '/':
             uri = '/public/' + uri
-        response = requests.get(COHESITY_API['APIROOT'] + uri, headers=COHESITY_API['HEADER'], verify=False, timeout=300, stream=True)
-    f = open(fileName, 'wb')
-    for chunk in response.iter_content(chunk_size=1048576):
-        if chunk:
-            f.write(chunk)
-    f.close()
+        url = THISCONTEXT['APIROOT'] + uri
+    partfile = '%s.part' % fileName  # renamed to fileName once complete
+    ranged = False
+    starttime = time.time()
+    try:
+        # probe for range support
+        response = __request(THISCONTEXT, 'get', url, stream=True, headers={'Range': 'bytes=0-0'})
+        contentrange = response.headers.get('Content-Range', '')
+        if response.status_code == 206 and contentrange.split('/')[-1].isdigit():
+            response.close()
+            ranged = True
+            totalbytes = int(contentrange.split('/')[-1])
+            __rangeddownload(THISCONTEXT, url, partfile, totalbytes, threads, partsize)
+        else:
+            # no range support, single stream
+            if response.status_code == 416:
+                # empty file (there is no byte 0 to return), download without a range
+                response.close()
+                response = __request(THISCONTEXT, 'get', url, stream=True)
+            if response.status_code != 200:
+                response.close()
+                raise IOError('download returned status %s %s' % (response.status_code, response.reason))
+            totalbytes = 0
+            f = open(partfile, 'wb')
+            for chunk in response.iter_content(chunk_size=1048576):
+                if chunk:
+                    f.write(chunk)
+                    totalbytes += len(chunk)
+            f.close()
+        try:
+            os.rename(partfile, fileName)
+        except OSError:
+            os.remove(fileName)  # windows won't rename over an existing file
+            os.rename(partfile, fileName)
+        THISCONTEXT['LAST_ERROR'] = 'OK'
+    except (requests.exceptions.RequestException, IOError, OSError) as e:
+        __writelog('download failed: %s' % e)
+        THISCONTEXT['LAST_ERROR'] = '%s' % e
+        if quiet is None:
+            if ranged is True:
+                print('download failed: %s (rerun to resume)' % e)
+            else:
+                print('download failed: %s' % e)
+        return False
+    if quiet is None:
+        elapsed = max(time.time() - starttime, 0.001)
+        print('Downloaded %0.1f MiB in %0.1f seconds (%0.1f MiB/s)' % (totalbytes / 1048576.0, elapsed, totalbytes / 1048576.0 / elapsed))
+    return True
+
+
+def __rangeddownload(context, url, partfile, totalbytes, threads, partsize):
+    """download byte ranges in parallel into a preallocated part file, tracking finished parts in a progress file"""
+    progressfile = '%s.progress' % partfile
+    numparts = max(1, (totalbytes + partsize - 1) // partsize)
+    done = set()
+    try:
+        f = open(progressfile, 'r')
+        progress = json.load(f)
+        f.close()
+        if progress['url'] == url and progress['size'] == totalbytes and progress['partsize'] == partsize and os.path.getsize(partfile) == totalbytes:
+            done = set(progress['done'])
+    except Exception:
+        pass
+    fd = os.open(partfile, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+    lock = threading.Lock()
+    todo = [p for p in range(numparts) if p not in done]
+    errors = []
+
+    def saveprogress():
+        tmpfile = '%s.tmp' % progressfile
+        f = open(tmpfile, 'w')
+        json.dump({'url': url, 'size': totalbytes, 'partsize': partsize, 'done': sorted(done)}, f)
+        f.close()
+        try:
+            os.rename(tmpfile, progressfile)
+        except OSError:
+            os.remove(progressfile)  # windows won't rename over an existing file
+            os.rename(tmpfile, progressfile)
+
+    def pwrite(data, offset):
+        if hasattr(os, 'pwrite'):
+            while len(data) > 0:
+                written = os.pwrite(fd, data, offset)
+                data = data[written:]
+                offset += written
+        else:
+            with lock:
+                os.lseek(fd, offset, 0)
+                os.write(fd, data)
+
+    def worker():
+        while True:
+            with lock:
+                if len(todo) == 0 or len(errors) > 0:
+                    return
+                part = todo.pop(0)
+            first = part * partsize
+            last = min(totalbytes, first + partsize) - 1
+            try:
+                response = __request(context, 'get', url, stream=True, headers={'Range': 'bytes=%s-%s' % (first, last)})
+                if response.status_code != 206:
+                    raise IOError('range request returned status %s' % response.status_code)
+                offset = first
+                for chunk in response.iter_content(chunk_size=1048576):
+                    if chunk:
+                        pwrite(chunk, offset)
+                        offset += len(chunk)
+                response.close()
+                if offset != last + 1:
+                    raise IOError('incomplete download of bytes %s-%s' % (first, last))
+                with lock:
+                    done.add(part)
+                    saveprogress()
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                return
+
+    try:
+        if len(done) == 0:
+            os.ftruncate(fd, totalbytes)
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(fd, 0, totalbytes)
+                except OSError:
+                    pass  # filesystem does not support preallocation
+            saveprogress()
+        workers = [threading.Thread(target=worker) for t in range(max(1, min(threads, len(todo))))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        os.close(fd)
+    if len(errors) > 0:
+        raise errors[0]
+    os.remove(progressfile)
 
 
 def showProps(obj, parent='myobject', search=None):
@@ -658,17 +2319,283 @@ def showProps(obj, parent='myobject', search=None):
 
 
 def getContext():
-    return COHESITY_API.copy()
+    context = COHESITY_API.copy()
+    context['HEADER'] = COHESITY_API['HEADER'].copy()
+    return context
 
 
 def setContext(context):
     global COHESITY_API
     if isinstance(context, dict) and 'HEADER' in context and 'APIROOT' in context and 'APIROOTv2' in context:
         COHESITY_API = context.copy()
+        COHESITY_API['HEADER'] = context['HEADER'].copy()
     else:
         print('Invalid context')
 
 
+### api client object (one per cluster, safe to use from separate threads)
+class CohesityClient(object):
+    """Cohesity API client with its own authentication, headers, session and helios cluster selection"""
+
+    def __init__(self, vip=None, username='helios', domain='local', **kwargs):
+        self.context = {
+            'User-Agent': 'pyhesity/%s' % api_version,
+            'APIROOT': '',
+            'APIROOTv2': '',
+            'HEADER': {},
+            'AUTHENTICATED': False,
+            'LAST_ERROR': 'OK',
+            'SESSION': None,
+            'POOLSIZE': 10
+        }
+        if vip is not None:
+            self.apiauth(vip=vip, username=username, domain=domain, **kwargs)
+
+    def apiauth(self, vip='helios.cohesity.com', username='helios', domain='local', **kwargs):
+        kwargs['context'] = self.context
+        return apiauth(vip=vip, username=username, domain=domain, **kwargs)
+
+    def api(self, method, uri, data=None, **kwargs):
+        kwargs['context'] = self.context
+        return api(method, uri, data=data, **kwargs)
+
+    def fileDownload(self, uri, fileName, v=1, **kwargs):
+        kwargs['context'] = self.context
+        return fileDownload(uri, fileName, v=v, **kwargs)
+
+    def connected(self):
+        return apiconnected(context=self.context)
+
+    def drop(self):
+        apidrop(context=self.context)
+
+    def lastError(self):
+        return LAST_API_ERROR(context=self.context)
+
+    def impersonate(self, tenantId):
+        impersonate(tenantId, context=self.context)
+
+    def switchback(self):
+        switchback(context=self.context)
+
+    def heliosCluster(self, clusterName=None, verbose=False):
+        heliosCluster(clusterName, verbose=verbose, context=self.context)
+
+    def heliosClusters(self):
+        return heliosClusters(context=self.context)
+
+    def forCluster(self, clusterName):
+        """new client scoped to a helios connected cluster, sharing this client's authentication and session"""
+        client = CohesityClient()
+        client.context = self.context.copy()
+        client.context['HEADER'] = self.context['HEADER'].copy()
+        client.context['LAST_ERROR'] = 'OK'
+        if 'accessClusterId' in client.context['HEADER']:
+            del client.context['HEADER']['accessClusterId']
+        client.heliosCluster(clusterName)
+        return client
+
+
+### run a function against each helios connected cluster
+def helios_map(fn, clusters=None, workers=8, stream=False, context=None):
+    """call fn(client, cluster) for each helios connected cluster (all by default) several clusters at a time,
+    each with its own CohesityClient scoped to the cluster. Returns a list of {cluster, result, error} in cluster
+    order, or with stream=True, a generator that yields each one as its cluster finishes"""
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = COHESITY_API
+    connected = dict([(c['name'].lower(), c) for c in THISCONTEXT.get('CONNECTEDHELIOSCLUSTERS', [])])
+    if clusters is None:
+        clusters = heliosClusters(context=THISCONTEXT)
+    parent = CohesityClient()
+    parent.context = THISCONTEXT
+    todo = list(enumerate(clusters))
+    total = len(todo)
+    lock = threading.Lock()
+    finished = queue.Queue()
+
+    def worker():
+        while True:
+            with lock:
+                if len(todo) == 0:
+                    return
+                (i, cluster) = todo.pop(0)
+            name = cluster['name'] if isinstance(cluster, dict) else cluster
+            result = {'cluster': name, 'result': None, 'error': None}
+            try:
+                if name.lower() not in connected:
+                    result['error'] = 'cluster %s not connected to helios' % name
+                else:
+                    result['result'] = fn(parent.forCluster(name), connected[name.lower()])
+            except Exception as e:
+                result['error'] = '%s' % e
+            if result['error'] is not None:
+                __writelog('helios_map: %s: %s' % (name, result['error']))
+            finished.put((i, result))
+
+    threads = [threading.Thread(target=worker) for t in range(max(1, min(workers, total)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    def results():
+        for n in range(total):
+            yield finished.get()
+
+    if stream is True:
+        return (result for (i, result) in results())
+    ordered = [None] * total
+    for (i, result) in results():
+        ordered[i] = result
+    return ordered
+
+
+### indexed protection source tree
+class SourceIndex(object):
+    """flattened protection source tree with constant time lookup by id, name and type"""
+
+    def __init__(self, sources=None):
+        self.nodes = {}
+        self.parents = {}
+        self.names = {}
+        self.types = {}
+        self.refreshTimeUsecs = None
+        if sources is not None:
+            self.add(sources)
+
+    def add(self, sources, parentId=None):
+        """add a protectionSources response (list of nodes or a single node) to the index"""
+        if isinstance(sources, dict):
+            sources = [sources]
+        stack = [(node, parentId) for node in reversed(sources)]
+        while stack:
+            (node, parentId) = stack.pop()
+            source = node.get('protectionSource', node)
+            if 'id' not in source:
+                continue
+            self.__index(source, parentId)
+            if self.refreshTimeUsecs is None and 'registrationInfo' in node:
+                self.refreshTimeUsecs = node['registrationInfo'].get('refreshTimeUsecs', None)
+            for children in ['applicationNodes', 'nodes']:
+                if children in node and node[children] is not None:
+                    stack.extend([(child, source['id']) for child in reversed(node[children])])
+
+    def __index(self, source, parentId):
+        sourceId = source['id']
+        self.nodes[sourceId] = source
+        if parentId is not None:
+            self.parents[sourceId] = parentId
+        if 'name' in source:
+            self.names.setdefault(source['name'].lower(), []).append(sourceId)
+        sourceType = self.typeOf(source)
+        if sourceType is not None:
+            self.types.setdefault(sourceType, []).append(sourceId)
+
+    @staticmethod
+    def typeOf(source):
+        """environment specific type of a source (e.g. kVirtualMachine, kTag, kHost)"""
+        for key in source:
+            if key.endswith('ProtectionSource') and isinstance(source[key], dict) and 'type' in source[key]:
+                return source[key]['type']
+        return None
+
+    def get(self, sourceId):
+        return self.nodes.get(sourceId, None)
+
+    def byName(self, name, sourceType=None):
+        """list of sources with this name (case insensitive), optionally of one type"""
+        ids = self.names.get(name.lower(), [])
+        if sourceType is not None:
+            ids = [i for i in ids if self.typeOf(self.nodes[i]) == sourceType]
+        return [self.nodes[i] for i in ids]
+
+    def idOf(self, name, sourceType=None):
+        """id of the first source with this name, or None"""
+        sources = self.byName(name, sourceType)
+        if len(sources) > 0:
+            return sources[0]['id']
+        return None
+
+    def byType(self, sourceType):
+        return [self.nodes[i] for i in self.types.get(sourceType, [])]
+
+    def parent(self, sourceId):
+        parentId = self.parents.get(sourceId, None)
+        if parentId is None:
+            return None
+        return self.nodes.get(parentId, None)
+
+    def path(self, sourceId, sep='/'):
+        """path of names from the root source to this source"""
+        names = []
+        while sourceId is not None and sourceId in self.nodes:
+            names.append(self.nodes[sourceId].get('name', '%s' % sourceId))
+            sourceId = self.parents.get(sourceId, None)
+        return sep.join(reversed(names))
+
+    def save(self, fileName):
+        """write the index to disk (atomic rename)"""
+        tmpfile = '%s.%s.tmp' % (fileName, os.getpid())
+        with open(tmpfile, 'w') as f:
+            json.dump({'refreshTimeUsecs': self.refreshTimeUsecs,
+                       'nodes': list(self.nodes.values()),
+                       'parents': [[k, v] for k, v in self.parents.items()]}, f)
+        try:
+            os.rename(tmpfile, fileName)
+        except OSError:
+            os.remove(fileName)  # windows won't rename over an existing file
+            os.rename(tmpfile, fileName)
+
+    @classmethod
+    def load(cls, fileName):
+        with open(fileName, 'r') as f:
+            saved = json.load(f)
+        index = cls()
+        index.refreshTimeUsecs = saved['refreshTimeUsecs']
+        parents = dict([(k, v) for k, v in saved['parents']])
+        for source in saved['nodes']:
+            index.__index(source, parents.get(source['id'], None))
+        return index
+
+    @classmethod
+    def fromCluster(cls, rootId, params=None, context=None, cachedir=None):
+        """index of a registered source, reused from disk until the source is refreshed"""
+        if context is None:
+            context = COHESITY_API
+        registration = api('get', 'protectionSources/registrationInfo?ids=%s' % rootId, context=context)
+        refreshTimeUsecs = None
+        if isinstance(registration, dict) and registration.get('rootNodes', None):
+            refreshTimeUsecs = registration['rootNodes'][0].get('registrationInfo', {}).get('refreshTimeUsecs', None)
+        if cachedir is None:
+            cachedir = os.path.join(CONFIGDIR, 'sources')
+        key = '%s|%s|%s|%s' % (context['APIROOT'], context['HEADER'].get('accessClusterId', ''), rootId, params)
+        fileName = os.path.join(cachedir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+        if refreshTimeUsecs is not None and os.path.exists(fileName):
+            try:
+                index = cls.load(fileName)
+                if index.refreshTimeUsecs == refreshTimeUsecs:
+                    return index
+            except Exception:
+                pass
+        uri = 'protectionSources?id=%s' % rootId
+        if params is not None:
+            uri += '&%s' % params
+        sources = api('get', uri, context=context)
+        if sources is None or (isinstance(sources, dict) and 'error' in sources):
+            return None
+        index = cls(sources)
+        index.refreshTimeUsecs = refreshTimeUsecs
+        if refreshTimeUsecs is not None:
+            try:
+                if os.path.isdir(cachedir) is False:
+                    os.makedirs(cachedir)
+                index.save(fileName)
+            except Exception:
+                pass
+        return index
+
+
 ### create CONFIGDIR if it doesn't exist
 if os.path.isdir(CONFIGDIR) is False:
     try:
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""Cohesity Python REST API Wrapper Module - compact record types - 2026.10.18"""
+
+##########################################################################################
+# Change Log
+# ==========
+#
+# 2026.10.18 - initial release (Run, ObjectSnapshot, CopyTarget)
+#
+##########################################################################################
+# Install Notes
+# =============
+#
+# Place in the same folder as pyhesity.py
+#
+##########################################################################################
+
+import sys
+
+__all__ = ['Run',
+           'ObjectSnapshot',
+           'CopyTarget',
+           'toRuns']
+
+# repeated strings (status, environment, object names) are shared between records
+INTERN = getattr(sys, 'intern', None)
+if INTERN is None:
+    INTERN = intern  # noqa: F821 (python 2 builtin)
+
+
+class Record(object):
+    """base for slotted record types"""
+
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name, None))
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(['%s=%r' % (name, getattr(self, name)) for name in self.__slots__ if getattr(self, name) is not None]))
+
+    def toDict(self):
+        """fields as a dict (nested records included)"""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, tuple):
+                value = [v.toDict() if isinstance(v, Record) else v for v in value]
+            result[name] = value
+        return result
+
+    def project(self, fields):
+        """clear all but these fields"""
+        if fields is not None:
+            for name in self.__slots__:
+                if name not in fields:
+                    setattr(self, name, None)
+        return self
+
+    @staticmethod
+    def pick(obj, *keys):
+        """nested value (None if any key is missing)"""
+        for key in keys:
+            if isinstance(obj, dict):
+                obj = obj.get(key, None)
+            elif isinstance(obj, list) and isinstance(key, int) and len(obj) > key:
+                obj = obj[key]
+            else:
+                return None
+        return obj
+
+    @staticmethod
+    def text(value):
+        if isinstance(value, str):
+            return INTERN(value)
+        return value
+
+
+class CopyTarget(Record):
+    """local snapshot, replica or archive of a protection run"""
+
+    __slots__ = ('type', 'targetName', 'status', 'startTimeUsecs', 'endTimeUsecs', 'expiryTimeUsecs',
+                 'logicalBytesTransferred', 'physicalBytesTransferred')
+
+    @classmethod
+    def fromV1(cls, copyRun, fields=None):
+        """from an element of a v1 run's copyRun list"""
+        target = copyRun.get('target', {})
+        targetName = cls.pick(target, 'replicationTarget', 'clusterName') or cls.pick(target, 'archivalTarget', 'vaultName')
+        return cls(type=cls.text(target.get('type', None)),
+                   targetName=cls.text(targetName),
+                   status=cls.text(copyRun.get('status', None)),
+                   startTimeUsecs=copyRun.get('runStartTimeUsecs', None),
+                   endTimeUsecs=cls.pick(copyRun, 'stats', 'endTimeUsecs'),
+                   expiryTimeUsecs=copyRun.get('expiryTimeUsecs', None),
+                   logicalBytesTransferred=cls.pick(copyRun, 'stats', 'logicalBytesTransferred'),
+                   physicalBytesTransferred=cls.pick(copyRun, 'stats', 'physicalBytesTransferred')).project(fields)
+
+    @classmethod
+    def fromV2(cls, result, targetType, fields=None):
+        """from a v2 run's localBackupInfo, or an element of replicationTargetResults or archivalTargetResults"""
+        return cls(type=cls.text(targetType),
+                   targetName=cls.text(result.get('clusterName', None) or result.get('targetName', None)),
+                   status=cls.text(result.get('status', None)),
+                   startTimeUsecs=result.get('startTimeUsecs', None),
+                   endTimeUsecs=result.get('endTimeUsecs', None),
+                   expiryTimeUsecs=result.get('expiryTimeUsecs', None),
+                   logicalBytesTransferred=cls.pick(result, 'stats', 'logicalBytesTransferred'),
+                   physicalBytesTransferred=cls.pick(result, 'stats', 'physicalBytesTransferred')).project(fields)
+
+
+class ObjectSnapshot(Record):
+    """backup of one object in a protection run"""
+
+    __slots__ = ('id', 'name', 'environment', 'objectType', 'sourceId', 'status', 'startTimeUsecs', 'endTimeUsecs',
+                 'logicalSizeBytes', 'bytesRead', 'bytesWritten', 'message')
+
+    @classmethod
+    def fromV1(cls, sourceBackupStatus, fields=None):
+        """from an element of a v1 run's sourceBackupStatus list"""
+        source = sourceBackupStatus.get('source', {})
+        stats = sourceBackupStatus.get('stats', {})
+        return cls(id=source.get('id', None),
+                   name=cls.text(source.get('name', None)),
+                   environment=cls.text(source.get('environment', None)),
+                   sourceId=source.get('parentId', None),
+                   status=cls.text(sourceBackupStatus.get('status', None)),
+                   startTimeUsecs=stats.get('startTimeUsecs', None),
+                   endTimeUsecs=stats.get('endTimeUsecs', None),
+                   logicalSizeBytes=stats.get('totalLogicalBackupSizeBytes', None),
+                   bytesRead=stats.get('totalBytesReadFromSource', None),
+                   bytesWritten=stats.get('totalPhysicalBackupSizeBytes', None),
+                   message=sourceBackupStatus.get('error', None) or (sourceBackupStatus.get('warnings', None) or [None])[0]).project(fields)
+
+    @classmethod
+    def fromV2(cls, runObject, fields=None):
+        """from an element of a v2 run's objects list"""
+        obj = runObject.get('object', {})
+        info = runObject.get('localSnapshotInfo', None) or runObject.get('originalBackupInfo', None) or {}
+        snapshot = info.get('snapshotInfo', {})
+        stats = snapshot.get('stats', {})
+        return cls(id=obj.get('id', None),
+                   name=cls.text(obj.get('name', None)),
+                   environment=cls.text(obj.get('environment', None)),
+                   objectType=cls.text(obj.get('objectType', None)),
+                   sourceId=obj.get('sourceId', None),
+                   status=cls.text(snapshot.get('status', None)),
+                   startTimeUsecs=snapshot.get('startTimeUsecs', None),
+                   endTimeUsecs=snapshot.get('endTimeUsecs', None),
+                   logicalSizeBytes=stats.get('logicalSizeBytes', None),
+                   bytesRead=stats.get('bytesRead', None),
+                   bytesWritten=stats.get('bytesWritten', None),
+                   message=info.get('failedAttempts', [{}])[-1].get('message', None) if info.get('failedAttempts', None) else None).project(fields)
+
+
+class Run(Record):
+    """protection run (from a v1 protectionRuns or v2 protection group runs response)"""
+
+    __slots__ = ('id', 'jobId', 'jobName', 'runType', 'status', 'startTimeUsecs', 'endTimeUsecs', 'isLocalSnapshotsDeleted',
+                 'bytesRead', 'bytesWritten', 'progressTaskId', 'objects', 'copyTargets')
+
+    @classmethod
+    def fromApi(cls, run, fields=None, objectFields=None, copyTargetFields=None):
+        """convert a v1 or v2 run, keeping only fields (objects and copyTargets are only built if included)"""
+        if 'backupRun' in run or 'copyRun' in run:
+            return cls.fromV1(run, fields, objectFields, copyTargetFields)
+        return cls.fromV2(run, fields, objectFields, copyTargetFields)
+
+    @classmethod
+    def fromV1(cls, run, fields=None, objectFields=None, copyTargetFields=None):
+        backupRun = run.get('backupRun', {})
+        stats = backupRun.get('stats', {})
+        startTimeUsecs = stats.get('startTimeUsecs', None) or cls.pick(run, 'copyRun', 0, 'runStartTimeUsecs')
+        record = cls(id='%s:%s' % (backupRun.get('jobRunId', None), startTimeUsecs),
+                     jobId=run.get('jobId', None),
+                     jobName=cls.text(run.get('jobName', None)),
+                     runType=cls.text(backupRun.get('runType', None)),
+                     status=cls.text(backupRun.get('status', None)),
+                     startTimeUsecs=startTimeUsecs,
+                     endTimeUsecs=stats.get('endTimeUsecs', None),
+                     isLocalSnapshotsDeleted=backupRun.get('snapshotsDeleted', False),
+                     bytesRead=stats.get('totalBytesReadFromSource', None),
+                     bytesWritten=stats.get('totalPhysicalBackupSizeBytes', None),
+                     progressTaskId=cls.pick(backupRun, 'activeAttempt', 'progressMonitorTaskPath'))
+        if fields is None or 'objects' in fields:
+            record.objects = tuple([ObjectSnapshot.fromV1(s, objectFields) for s in backupRun.get('sourceBackupStatus', None) or []])
+        if fields is None or 'copyTargets' in fields:
+            record.copyTargets = tuple([CopyTarget.fromV1(c, copyTargetFields) for c in run.get('copyRun', None) or []])
+        return record.project(fields)
+
+    @classmethod
+    def fromV2(cls, run, fields=None, objectFields=None, copyTargetFields=None):
+        info = run.get('localBackupInfo', None) or run.get('originalBackupInfo', None) or \
+            cls.pick(run, 'archivalInfo', 'archivalTargetResults', 0) or cls.pick(run, 'replicationInfo', 'replicationTargetResults', 0) or {}
+        snapshotStats = info.get('localSnapshotStats', None) or info.get('stats', None) or {}
+        record = cls(id=run.get('id', None),
+                     jobId=run.get('protectionGroupId', None),
+                     jobName=cls.text(run.get('protectionGroupName', None)),
+                     runType=cls.text(info.get('runType', None)),
+                     status=cls.text(info.get('status', None)),
+                     startTimeUsecs=info.get('startTimeUsecs', None),
+                     endTimeUsecs=info.get('endTimeUsecs', None),
+                     isLocalSnapshotsDeleted=run.get('isLocalSnapshotsDeleted', False),
+                     bytesRead=snapshotStats.get('bytesRead', None),
+                     bytesWritten=snapshotStats.get('bytesWritten', None) or snapshotStats.get('physicalBytesTransferred', None),
+                     progressTaskId=info.get('progressTaskId', None))
+        if fields is None or 'objects' in fields:
+            record.objects = tuple([ObjectSnapshot.fromV2(o, objectFields) for o in run.get('objects', None) or []])
+        if fields is None or 'copyTargets' in fields:
+            copyTargets = []
+            if 'localBackupInfo' in run:
+                copyTargets.append(CopyTarget.fromV2(run['localBackupInfo'], 'kLocal', copyTargetFields))
+            for result in cls.pick(run, 'replicationInfo', 'replicationTargetResults') or []:
+                copyTargets.append(CopyTarget.fromV2(result, 'kRemote', copyTargetFields))
+            for result in cls.pick(run, 'archivalInfo', 'archivalTargetResults') or []:
+                copyTargets.append(CopyTarget.fromV2(result, 'kArchival', copyTargetFields))
+            record.copyTargets = tuple(copyTargets)
+        return record.project(fields)
+
+
+def toRuns(runs, fields=None, objectFields=None, copyTargetFields=None):
+    """convert runs as they arrive (e.g. from iterRuns or api(..., stream_items=...)), so each decoded run can be freed"""
+    for run in runs:
+        yield Run.fromApi(run, fields, objectFields, copyTargetFields)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""Cohesity Python REST API Wrapper Module - asyncio extensions - 2026.10.18"""
+
+##########################################################################################
+# Change Log
+# ==========
+#
+# 2026.10.18 - initial release (aapi, gather_api, run_gather_api)
+# 2026.10.18 - aiohttp calls use pyhesity's retry policy, circuit breaker, re-authentication and call statistics
+#
+##########################################################################################
+# Install Notes
+# =============
+#
+# Requires python 3.5 or later and pyhesity.py (in the same folder)
+#
+# Optional module: aiohttp (native async http client)
+# sudo pip3 install aiohttp
+#
+# Without aiohttp, calls run in a thread pool over pyhesity's pooled session
+#
+##########################################################################################
+
+import asyncio
+import json
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+import pyhesity
+from pyhesity import api, APIMETHODS, APICACHE, APIMEMO, CASSETTE, RETRYPOLICY
+from pyhesity import __apiurl, __apiresponse, __writelog, __apistat, __reauth, __circuitcheck, __circuitresult, __backoff, __retryafter
+from pyhesity import __cacheinvalidate, __memoinvalidate, __memoable
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+__all__ = ['aapi',
+           'gather_api',
+           'run_gather_api',
+           'setConcurrency',
+           'aclose']
+
+CONCURRENCY = 10  # max in-flight requests per cluster (matches default pool size)
+
+__semaphores = {}
+__sessions = {}
+__reauthlocks = {}
+__executor = None
+
+
+class __AsyncResponse(object):
+    """minimal response object for pyhesity response processing"""
+
+    def __init__(self, status_code, reason, body, headers=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+
+def setConcurrency(limit):
+    """set max in-flight requests per cluster"""
+    global CONCURRENCY
+    CONCURRENCY = limit
+
+
+def __semaphore(loop, url, limit=None):
+    """per event loop, per cluster concurrency limit"""
+    key = (id(loop), urlparse(url).netloc)
+    if key not in __semaphores:
+        __semaphores[key] = asyncio.Semaphore(limit or CONCURRENCY)
+    return __semaphores[key]
+
+
+def __aiosession(loop):
+    """aiohttp session (per event loop)"""
+    session = __sessions.get(id(loop), None)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=CONCURRENCY, ssl=False)
+        session = aiohttp.ClientSession(connector=connector)
+        __sessions[id(loop)] = session
+    return session
+
+
+def __threadpool():
+    global __executor
+    if __executor is None:
+        __executor = ThreadPoolExecutor(max_workers=64)
+    return __executor
+
+
+def __loop():
+    """the running event loop"""
+    if hasattr(asyncio, 'get_running_loop'):
+        return asyncio.get_running_loop()
+    return asyncio.get_event_loop()
+
+
+def __usethreads(method, url, nocache):
+    """calls that need pyhesity features only available through api() (record/replay, response cache, memo)"""
+    if aiohttp is None or CASSETTE['RECORD'] is not None or CASSETTE['REPLAY'] is not None:
+        return True
+    if method == 'get' and nocache is not True:
+        return APICACHE['ENABLED'] is True or (APIMEMO['ENABLED'] is True and __memoable(url) is True)
+    return False
+
+
+async def __aiorequest(context, method, url, data, retry):
+    """send request with aiohttp, retrying like pyhesity (GETs, or writes flagged retry=True) and recording call statistics"""
+    host = urlparse(url).netloc.lower()
+    retryable = (method == 'get' and retry is not False) or retry is True
+    attempt = 0
+    start = time.time()
+    while True:
+        try:
+            __circuitcheck(host)
+            async with __aiosession(__loop()).request(method.upper(), url, headers=context['HEADER'], json=data, timeout=aiohttp.ClientTimeout(total=300)) as r:
+                body = await r.read()
+                response = __AsyncResponse(r.status, r.reason, body, dict(r.headers))
+                response.sentheader = dict(context['HEADER'])
+        except requests.exceptions.ConnectionError:
+            __apistat(method, url, 'error', time.time() - start, retries=attempt)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            __circuitresult(host, False)
+            if retryable is False or attempt >= RETRYPOLICY['RETRIES']:
+                __apistat(method, url, 'error', time.time() - start, retries=attempt)
+                raise
+            delay = __backoff(attempt)
+            __writelog('retrying in %0.1f seconds: %s' % (delay, e), endpoint='%s %s' % (method, url))
+        else:
+            if response.status_code not in RETRYPOLICY['STATUSCODES']:
+                __circuitresult(host, True)
+                __apistat(method, url, response.status_code, time.time() - start, len(body), attempt)
+                return response
+            if response.status_code != 429:
+                __circuitresult(host, False)
+            if retryable is False or attempt >= RETRYPOLICY['RETRIES']:
+                __apistat(method, url, response.status_code, time.time() - start, len(body), attempt)
+                return response
+            delay = __retryafter(response)
+            if delay is None:
+                delay = __backoff(attempt)
+            __writelog('retrying in %0.1f seconds: status %s' % (delay, response.status_code), endpoint='%s %s' % (method, url))
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def __areauth(loop, context, sentheader):
+    """re-authenticate once for all calls that were rejected with the same (expired) credentials"""
+    key = (id(loop), id(context))
+    if key not in __reauthlocks:
+        __reauthlocks[key] = asyncio.Lock()
+    async with __reauthlocks[key]:
+        if context['HEADER'] != sentheader:
+            return context['AUTHENTICATED']  # another call has already re-authenticated
+        return await loop.run_in_executor(__threadpool(), __reauth, context)
+
+
+### async api call function
+async def aapi(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, limit=None, nocache=None, retry=None):
+    """async api call function (same parameters and return values as api)"""
+    if context is not None:
+        THISCONTEXT = context
+    else:
+        THISCONTEXT = pyhesity.COHESITY_API
+    if THISCONTEXT['AUTHENTICATED'] is False:
+        print('Not Connected')
+        return None
+    if method not in APIMETHODS:
+        if quiet is None:
+            print("invalid api method")
+        return None
+    (url, fulluri) = __apiurl(THISCONTEXT, uri, mcm=mcm, mcmv2=mcmv2, v=v, reportingv2=reportingv2)
+    loop = __loop()
+    async with __semaphore(loop, url, limit):
+        if __usethreads(method, url, nocache) is True:
+            call = functools.partial(api, method, uri, data=data, quiet=quiet, mcm=mcm, mcmv2=mcmv2, v=v, reportingv2=reportingv2, context=THISCONTEXT, nocache=nocache, retry=retry)
+            return await loop.run_in_executor(__threadpool(), call)
+        response = ''
+        if method == 'get':
+            data = None
+        start = time.time()
+        try:
+            response = await __aiorequest(THISCONTEXT, method, url, data, retry)
+            if response.status_code == 401 and await __areauth(loop, THISCONTEXT, response.sentheader) is True:
+                response = await __aiorequest(THISCONTEXT, method, url, data, retry)
+            THISCONTEXT['LAST_ERROR'] = 'OK'
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.ConnectionError) as e:
+            __writelog(e, endpoint='%s %s' % (method, url), latency=time.time() - start)
+            THISCONTEXT['LAST_ERROR'] = '%s' % e
+            if quiet is None:
+                print(e)
+        result = __apiresponse(THISCONTEXT, response, fulluri, quiet)
+        if response != '' and response.status_code < 300 and method != 'get':
+            if APICACHE['ENABLED'] is True:
+                __cacheinvalidate(THISCONTEXT, url)
+            __memoinvalidate(THISCONTEXT, url)
+        return result
+
+
+### run many api calls concurrently
+async def gather_api(uris, method='get', limit=None, **kwargs):
+    """call api for each uri concurrently, return results in the same order as uris"""
+    return await asyncio.gather(*[aapi(method, uri, limit=limit, **kwargs) for uri in uris])
+
+
+async def aclose():
+    """close the aiohttp session for the running event loop"""
+    loop = __loop()
+    session = __sessions.pop(id(loop), None)
+    if session is not None:
+        await session.close()
+    for key in [k for k in __semaphores if k[0] == id(loop)]:
+        del __semaphores[key]
+    for key in [k for k in __reauthlocks if k[0] == id(loop)]:
+        del __reauthlocks[key]
+
+
+async def __gatherandclose(uris, method, limit, kwargs):
+    try:
+        return await gather_api(uris, method=method, limit=limit, **kwargs)
+    finally:
+        await aclose()
+
+
+def run_gather_api(uris, method='get', limit=None, **kwargs):
+    """gather_api for non-async scripts: returns the list of results in the same order as uris"""
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(__gatherandclose(uris, method, limit, kwargs))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
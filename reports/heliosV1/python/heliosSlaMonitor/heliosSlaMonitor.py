@@ -48,14 +48,18 @@ missesRecorded = False
 message = '<html><body style="font-family: Helvetica, Arial, sans-serif; font-size: 12px; background-color: #f1f3f6; color: #444444;">'
 message += '<div style="background-color: #fff; width:fit-content; padding: 2px 6px 8px 6px; font-weight: 300; box-shadow: 1px 2px 4px #cccccc; border-radius: 4px;">'
 message += '<p style="font-weight: bold;">Helios SLA Miss Report (%s)</p>' % now.date()
-for hcluster in heliosClusters():
-    heliosCluster(hcluster['name'])
 
-    cluster = api('get', 'cluster')
+
+def checkCluster(client, hcluster):
+    """returns (console lines, html, misses recorded) for one cluster"""
+    lines = []
+    html = ''
+    misses = False
+    cluster = client.api('get', 'cluster')
     if cluster:
         printedClusterName = False
         # for each active job
-        jobs = api('get', 'protectionJobs')
+        jobs = client.api('get', 'protectionJobs')
         if jobs:
             for job in jobs:
                 if 'isDeleted' not in job and ('isActive' not in job or job['isActive'] is not False) and ('isPaused' not in job or job['isPaused'] is not True):
@@ -63,7 +67,7 @@ for hcluster in heliosClusters():
                     jobName = job['name']
                     sla = job['incrementalProtectionSlaTimeMins']
                     slaUsecs = sla * 60000000
-                    runs = api('get', 'protectionRuns?jobId=%s&numRuns=2' % jobId)
+                    runs = client.api('get', 'protectionRuns?jobId=%s&numRuns=2' % jobId)
                     for run in runs:
                         # get backup run time
                         startTimeUsecs = run['backupRun']['stats']['startTimeUsecs']
@@ -94,8 +98,8 @@ for hcluster in heliosClusters():
 
                         if runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs or replHours > maxreplicationhrs:
                             if printedClusterName is False:
-                                print(cluster['name'])
-                                message += '<hr style="border: 1px solid #eee;"/><span style="font-weight: bold;">%s</span><br/>' % cluster['name'].upper()
+                                lines.append(cluster['name'])
+                                html += '<hr style="border: 1px solid #eee;"/><span style="font-weight: bold;">%s</span><br/>' % cluster['name'].upper()
                                 printedClusterName = True
                             # replort sla miss
                             if status in finishedStates:
@@ -104,9 +108,9 @@ for hcluster in heliosClusters():
                                 verb = 'has been running'
                             if (watch == 'all' or watch == 'backup') and (runTimeUsecs > slaUsecs or runTimeHours > maxbackuphrs):
                                 messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Backup %s for %s minutes (SLA: %s minutes)</span><br/>' % (jobName.upper(), verb, runTimeMinutes, sla)
-                                message += messageline
-                                print('    %s : (Missed Backup SLA) %s for %s minutes (SLA: %s minutes)' % (jobName.upper(), verb, runTimeMinutes, sla))
-                                missesRecorded = True
+                                html += messageline
+                                lines.append('    %s : (Missed Backup SLA) %s for %s minutes (SLA: %s minutes)' % (jobName.upper(), verb, runTimeMinutes, sla))
+                                misses = True
                                 # identify long running objects
                                 if 'sourceBackupStatus' in run['backupRun']:
                                     for source in run['backupRun']['sourceBackupStatus']:
@@ -118,18 +122,32 @@ for hcluster in heliosClusters():
                                             timeTakenUsecs = 0
                                         if timeTakenUsecs > slaUsecs:
                                             timeTakenMin = int(round(timeTakenUsecs / 60000000))
-                                            print('            %s %s for %s minutes' % (source['source']['name'].upper(), verb, timeTakenMin))
+                                            lines.append('            %s %s for %s minutes' % (source['source']['name'].upper(), verb, timeTakenMin))
                                             messageline = '<span style="margin-left: 60px;"><span style="color: #000; font-weight: normal;">%s</span> <span style="font-weight: 300;">%s for %s minutes</span></span><br/>' % (source['source']['name'].upper(), verb, timeTakenMin)
-                                            message += messageline
+                                            html += messageline
                             # report long running replication
                             if (watch == 'all' or watch == 'replication') and replHours >= maxreplicationhrs:
-                                print('    %s : (Missed Replication SLA) replication time: %s hours' % (jobName, replHours))
+                                lines.append('    %s : (Missed Replication SLA) replication time: %s hours' % (jobName, replHours))
                                 messageline = '<span style="margin-left: 20px; font-weight: normal; color: #000;">%s:</span> <span style="font-weight: 300;">Replication time: %s hours</span><br/>' % (jobName, replHours)
-                                message += messageline
-                                missesRecorded = True
+                                html += messageline
+                                misses = True
                             break
     else:
-        print('%-15s: (trouble accessing cluster)' % hcluster['name'])
+        lines.append('%-15s: (trouble accessing cluster)' % hcluster['name'])
+    return (lines, html, misses)
+
+
+# check several clusters at a time, report in cluster order
+for result in helios_map(checkCluster):
+    if result['error'] is not None:
+        print('%-15s: (trouble accessing cluster)' % result['cluster'])
+        continue
+    (lines, html, misses) = result['result']
+    for line in lines:
+        print(line)
+    message += html
+    if misses is True:
+        missesRecorded = True
 
 if missesRecorded is False:
     print('No SLA misses recorded')
@@ -14,6 +14,7 @@ parser.add_argument('-u', '--username', type=str, required=True)    # username
 parser.add_argument('-d', '--domain', type=str, default='local')    # (optional) domain - defaults to local
 parser.add_argument('-pwd', '--password', type=str, default=None)   # optional password
 parser.add_argument('-n', '--unit', type=str, choices=['GiB', 'TiB', 'gib', 'tib'], default='TiB')
+parser.add_argument('-w', '--workers', type=int, default=8)        # clusters to query at the same time
 args = parser.parse_args()
 
 vip = args.vip
@@ -21,6 +22,7 @@ username = args.username
 domain = args.domain
 password = args.password
 unit = args.unit
+workers = args.workers
 
 if unit.lower() == 'tib':
     multiplier = 1024 * 1024 * 1024 * 1024
@@ -59,22 +61,30 @@ def parseStats(clusterName, dataPoint, statName):
 endMsecs = dateToUsecs(now.strftime("%Y-%m-%d %H:%M:%S")) / 1000
 startMsecs = (timeAgo(2, 'days')) / 1000
 
+
+def getStats(client, cluster):
+    capacityStats = client.api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kCapacityBytes&metricUnitType=0&range=day&rollupFunction=average&rollupIntervalSecs=86400&schemaName=kBridgeClusterStats&startTimeMsecs=%s' % (endMsecs, cluster['clusterId'], startMsecs))
+    consumedStats = client.api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=kBridgeClusterTierPhysicalStats&metricName=kMorphedUsageBytes&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s:Local&endTimeMsecs=%s' % (startMsecs, cluster['clusterId'], endMsecs))
+    dataInStats = client.api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=ApolloV2ClusterStats&metricName=BrickBytesLogical&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s (ID %s)&endTimeMsecs=%s' % (startMsecs, cluster['name'], cluster['clusterId'], endMsecs))
+    dataWrittenStats = client.api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=ApolloV2ClusterStats&metricName=ChunkBytesMorphed&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s (ID %s)&endTimeMsecs=%s' % (startMsecs, cluster['name'], cluster['clusterId'], endMsecs))
+    logicalSizeStats = client.api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=kBridgeClusterLogicalStats&metricName=kUnmorphedUsageBytes&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s&endTimeMsecs=%s' % (startMsecs, cluster['clusterId'], endMsecs))
+    return (capacityStats, consumedStats, dataInStats, dataWrittenStats, logicalSizeStats)
+
+
 print('\nGathering cluster stats:\n')
 
-for cluster in heliosClusters():
-    heliosCluster(cluster)
-    print('    %s' % cluster['name'])
-    capacityStats = api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kCapacityBytes&metricUnitType=0&range=day&rollupFunction=average&rollupIntervalSecs=86400&schemaName=kBridgeClusterStats&startTimeMsecs=%s' % (endMsecs, cluster['clusterId'], startMsecs))
-    consumedStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=kBridgeClusterTierPhysicalStats&metricName=kMorphedUsageBytes&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s:Local&endTimeMsecs=%s' % (startMsecs, cluster['clusterId'], endMsecs))
-    dataInStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=ApolloV2ClusterStats&metricName=BrickBytesLogical&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s (ID %s)&endTimeMsecs=%s' % (startMsecs, cluster['name'], cluster['clusterId'], endMsecs))
-    dataWrittenStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=ApolloV2ClusterStats&metricName=ChunkBytesMorphed&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s (ID %s)&endTimeMsecs=%s' % (startMsecs, cluster['name'], cluster['clusterId'], endMsecs))
-    logicalSizeStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=kBridgeClusterLogicalStats&metricName=kUnmorphedUsageBytes&rollupIntervalSecs=86400&rollupFunction=latest&entityIdList=%s&endTimeMsecs=%s' % (startMsecs, cluster['clusterId'], endMsecs))
-
-    parseStats(cluster['name'], capacityStats['dataPointVec'][0], 'capacity')
-    parseStats(cluster['name'], consumedStats['dataPointVec'][0], 'consumed')
-    parseStats(cluster['name'], dataInStats['dataPointVec'][0], 'dataIn')
-    parseStats(cluster['name'], dataWrittenStats['dataPointVec'][0], 'dataWritten')
-    parseStats(cluster['name'], logicalSizeStats['dataPointVec'][0], 'logicalSize')
+# gather stats from several clusters at a time
+for result in helios_map(getStats, workers=workers, stream=True):
+    print('    %s' % result['cluster'])
+    if result['error'] is not None:
+        print('        error: %s' % result['error'])
+        continue
+    (capacityStats, consumedStats, dataInStats, dataWrittenStats, logicalSizeStats) = result['result']
+    parseStats(result['cluster'], capacityStats['dataPointVec'][0], 'capacity')
+    parseStats(result['cluster'], consumedStats['dataPointVec'][0], 'consumed')
+    parseStats(result['cluster'], dataInStats['dataPointVec'][0], 'dataIn')
+    parseStats(result['cluster'], dataWrittenStats['dataPointVec'][0], 'dataWritten')
+    parseStats(result['cluster'], logicalSizeStats['dataPointVec'][0], 'logicalSize')
 
 for clusterName in sorted(stats.keys()):
     capacity = stats[clusterName]['capacity']
@@ -1,21 +1,31 @@
 import pandas as pd
+import sys
 from pyhesity import *
 
 apiKey = 'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx'
 
 apiauth(vip='helios.cohesity.com', username='helios', domain='local', useApiKey=True, password=apiKey, quiet=True)
 
-data = []
 
-for hcluster in heliosClusters():
-    heliosCluster(hcluster['name'])
-    policies = api('get', 'protectionPolicies')
+def policyDataLock(client, hcluster):
+    rows = []
+    policies = client.api('get', 'protectionPolicies')
     if policies is not None:
         for policy in policies:
             dataLock = False
             if 'wormRetentionType' in policy and policy['wormRetentionType'] == 'kCompliance':
                 dataLock = True
-            data.append([hcluster['name'], policy['name'], dataLock])
+            rows.append([hcluster['name'], policy['name'], dataLock])
+    return rows
+
+
+# query several clusters at a time
+data = []
+for result in helios_map(policyDataLock):
+    if result['error'] is not None:
+        sys.stderr.write('%s: %s\n' % (result['cluster'], result['error']))  # keep stdout for the data frame
+    elif result['result'] is not None:
+        data += result['result']
 
 df = pd.DataFrame(data, columns=['ClusterName', 'PolicyName', 'DataLock'])
 print(df)
@@ -3,6 +3,7 @@
 
 # import pyhesity wrapper module
 from pyhesity import *
+from pyhesity_models import toRuns
 from datetime import datetime
 import codecs
 
@@ -118,31 +119,29 @@ for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower())
         print('%s' % job['name'])
         endUsecs = nowUsecs
         while 1:
-            runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&excludeNonRestorableRuns=true' % (job['id'], numruns, endUsecs), v=2)
-            if len(runs['runs']) > 0:
-                endUsecs = int(runs['runs'][-1]['id'].split(':')[1]) - 1
-            else:
+            runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&excludeNonRestorableRuns=true' % (job['id'], numruns, endUsecs), v=2, stream_items='runs')
+            lastRunId = None
+            # decode one run at a time, keeping only the fields used below
+            for run in toRuns(runs, fields=['id', 'copyTargets'], copyTargetFields=['type', 'targetName', 'status', 'expiryTimeUsecs', 'logicalBytesTransferred', 'physicalBytesTransferred']):
+                lastRunId = run.id
+                runStartTime = usecsToDate(run.id.split(':')[1])
+                for archive in [c for c in run.copyTargets if c.type == 'kArchival']:
+                    archiveTarget = archive.targetName
+                    archiveStatus = archive.status
+                    if archive.expiryTimeUsecs is not None:
+                        archiveExpireUsecs = archive.expiryTimeUsecs
+                        if archiveExpireUsecs > nowUsecs:
+                            archiveExpires = usecsToDate(archiveExpireUsecs)
+                        else:
+                            archiveExpires = 'Expired'
+                    logicalBytesTransferred = round((archive.logicalBytesTransferred or 0) / multiplier, 1)
+                    physicalBytesTransferred = round((archive.physicalBytesTransferred or 0) / multiplier, 1)
+                    if targetname is None or targetname.lower() == archiveTarget.lower():
+                        print("    %s" % runStartTime)
+                        f.write('"%s","%s","%s","%s","%s","%s","%s"\n' % (job['name'], runStartTime, archiveTarget, archiveStatus, archiveExpires, logicalBytesTransferred, physicalBytesTransferred))
+            if lastRunId is None:
                 break
-            for run in runs['runs']:
-                runStartTime = usecsToDate(run['id'].split(':')[1])
-                if 'archivalInfo' in run and 'archivalTargetResults' in run['archivalInfo'] and len(run['archivalInfo']['archivalTargetResults']) > 0:
-                    for archive in run['archivalInfo']['archivalTargetResults']:
-                        archiveTarget = archive['targetName']
-                        archiveStatus = archive['status']
-                        if 'expiryTimeUsecs' in archive:
-                            archiveExpireUsecs = archive['expiryTimeUsecs']
-                            if archiveExpireUsecs > nowUsecs:
-                                archiveExpires = usecsToDate(archiveExpireUsecs)
-                            else:
-                                archiveExpires = 'Expired'
-                        logicalBytesTransferred = 0
-                        physicalBytesTransferred = 0
-                        if 'stats' in archive:
-                            logicalBytesTransferred = round(archive['stats'].get('logicalBytesTransferred', 0) / multiplier, 1)
-                            physicalBytesTransferred = round(archive['stats'].get('physicalBytesTransferred', 0) / multiplier, 1)
-                        if targetname is None or targetname.lower() == archiveTarget.lower():
-                            print("    %s" % runStartTime)
-                            f.write('"%s","%s","%s","%s","%s","%s","%s"\n' % (job['name'], runStartTime, archiveTarget, archiveStatus, archiveExpires, logicalBytesTransferred, physicalBytesTransferred))
+            endUsecs = int(lastRunId.split(':')[1]) - 1
 
 f.close()
 print('\nOutput saved to %s\n' % outfile)
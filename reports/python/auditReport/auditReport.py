@@ -275,20 +275,11 @@ for clustername in clusternames:
     if mcm or vip.lower() == 'helios.cohesity.com':
         heliosCluster(clustername)
         print(clustername)
-    endTimeUsecs = uEnd
-    breakOut = False
-    while breakOut is False:
-        startTimeUsecs = endTimeUsecs - 604800000000
-        logs = api('get', 'audit-logs?startTimeUsecs=%s&endTimeUsecs=%s&count=1000' % (startTimeUsecs, endTimeUsecs), v=2)
-        if logs is not None and 'auditLogs' in logs and len(logs['auditLogs']) > 0:
-            for log in sorted(logs['auditLogs'], key=lambda lg: lg['timestampUsecs'], reverse=True):
-                if log['timestampUsecs'] < uStart:
-                    breakOut = True
-                    break
-                if 'ip' not in log:
-                    log['ip'] = ''
-                # display(log)
-                html += '''<tr><td>%s</td>
+    for log in paginate('audit-logs?startTimeUsecs=%s&endTimeUsecs=%s' % (uStart, uEnd), style='count', key='auditLogs', page=1000):
+        if 'ip' not in log:
+            log['ip'] = ''
+        # display(log)
+        html += '''<tr><td>%s</td>
                 <td>%s</td>
                 <td>%s</td>
                 <td>%s</td>
@@ -297,10 +288,7 @@ for clustername in clusternames:
                 <td>%s</td>
                 <td class="wrap">%s</td>
                 </tr>''' % (clustername, usecsToDate(log['timestampUsecs']), log['username'], log['domain'], log['entityName'], log['action'], log['ip'], log['details'])
-                csv.write('"%s","%s","%s","%s","%s","%s","%s","%s"\n' % (clustername, usecsToDate(log['timestampUsecs']), log['username'], log['domain'], log['entityName'], log['action'], log['ip'], log['details']))
-                endTimeUsecs = log['timestampUsecs'] - 1
-        else:
-            breakOut = True
+        csv.write('"%s","%s","%s","%s","%s","%s","%s","%s"\n' % (clustername, usecsToDate(log['timestampUsecs']), log['username'], log['domain'], log['entityName'], log['action'], log['ip'], log['details']))
 
 html += '''</table>
 </div>
@@ -59,57 +59,46 @@ if environment is not None:
 for job in jobs:
 
     ### find recoverable objects
-    startfrom = 0
-    ro = api('get', '/searchvms?jobIds=%s&size=%s&from=%s' % (job['id'], pagesize, startfrom))
-
-    if len(ro) > 0:
-        while True:
-            ro['vms'].sort(key=lambda obj: obj['vmDocument']['jobName'])
-            for vm in ro['vms']:
-                doc = vm['vmDocument']
-                jobId = doc['objectId']['jobId']
-                jobName = doc['jobName']
-                objName = doc['objectName']
-                objType = environments[doc['registeredSource']['type']]
-                objSource = doc['registeredSource']['displayName']
+    for vm in paginate('/searchvms?jobIds=%s' % job['id'], style='offset', key='vms', page=pagesize, v=1):
+        doc = vm['vmDocument']
+        jobId = doc['objectId']['jobId']
+        jobName = doc['jobName']
+        objName = doc['objectName']
+        objType = environments[doc['registeredSource']['type']]
+        objSource = doc['registeredSource']['displayName']
+        objAlias = ''
+        if 'objectAliases' in doc:
+            objAlias = doc['objectAliases'][0]
+            if objAlias == objName + '.vmx':
+                objAlias = ''
+            if objType == 'VMware':
                 objAlias = ''
-                if 'objectAliases' in doc:
-                    objAlias = doc['objectAliases'][0]
-                    if objAlias == objName + '.vmx':
-                        objAlias = ''
-                    if objType == 'VMware':
-                        objAlias = ''
-                if objType == 'View':
-                    objSource = ''
+        if objType == 'View':
+            objSource = ''
 
-                if objAlias != '':
-                    objName = objName + " on " + objAlias
-                print("%s (%s) %s" % (jobName, objType, objName))
-                for version in doc['versions']:
-                    runId = version['instanceId']['jobInstanceId']
-                    startTime = usecsToDate(version['instanceId']['jobStartTimeUsecs'])
-                    print("\t%s" % startTime)
-                    for replica in version['replicaInfo']['replicaVec']:
+        if objAlias != '':
+            objName = objName + " on " + objAlias
+        print("%s (%s) %s" % (jobName, objType, objName))
+        for version in doc['versions']:
+            runId = version['instanceId']['jobInstanceId']
+            startTime = usecsToDate(version['instanceId']['jobStartTimeUsecs'])
+            print("\t%s" % startTime)
+            for replica in version['replicaInfo']['replicaVec']:
+                localExpiry = '-'
+                archiveTarget = '-'
+                archive = 0
+                local = 0
+                if replica['target']['type'] == 1:
+                    if 'expiryTimeUsecs' in replica and replica['expiryTimeUsecs'] > 0:
+                        local = replica['expiryTimeUsecs']
+                        localExpiry = usecsToDate(local)
+                        archiveExpiry = '-'
+                if replica['target']['type'] == 3:
+                    if 'expiryTimeUsecs' in replica and replica['expiryTimeUsecs'] > archive:
+                        archive = replica['expiryTimeUsecs']
+                        archiveTarget = replica['target']['archivalTarget']['name']
                         localExpiry = '-'
-                        archiveTarget = '-'
-                        archive = 0
-                        local = 0
-                        if replica['target']['type'] == 1:
-                            if 'expiryTimeUsecs' in replica and replica['expiryTimeUsecs'] > 0:
-                                local = replica['expiryTimeUsecs']
-                                localExpiry = usecsToDate(local)
-                                archiveExpiry = '-'
-                        if replica['target']['type'] == 3:
-                            if 'expiryTimeUsecs' in replica and replica['expiryTimeUsecs'] > archive:
-                                archive = replica['expiryTimeUsecs']
-                                archiveTarget = replica['target']['archivalTarget']['name']
-                                localExpiry = '-'
-                                archiveExpiry = usecsToDate(archive)
-                        f.write("%s,%s,%s,%s,%s,%s,%s\n" % (jobName, objType, objName, startTime, localExpiry, archiveTarget, archiveExpiry))
-            if ro['count'] > (pagesize + startfrom):
-                startfrom += pagesize
-                ro = api('get', '/searchvms?jobIds=%s&size=%s&from=%s' % (job['id'], pagesize, startfrom))
-            else:
-                break
+                        archiveExpiry = usecsToDate(archive)
+                f.write("%s,%s,%s,%s,%s,%s,%s\n" % (jobName, objType, objName, startTime, localExpiry, archiveTarget, archiveExpiry))
 f.close()
 print('\nOutput saved to %s\n' % outfileName)
@@ -23,6 +23,7 @@ parser.add_argument('-n', '--numruns', type=int, default=1000)
 parser.add_argument('-y', '--growthdays', type=int, default=7)
 parser.add_argument('-x', '--units', type=str, choices=['MiB', 'GiB', 'mib', 'gib'], default='GiB')
 parser.add_argument('-s', '--skipdeleted', action='store_true')
+parser.add_argument('-nc', '--nocache', action='store_true')
 
 args = parser.parse_args()
 
@@ -40,6 +41,13 @@ numruns = args.numruns
 growthdays = args.growthdays
 units = args.units
 skipdeleted = args.skipdeleted
+nocache = args.nocache
+
+if nocache:
+    disableApiCache()
+
+# reuse repeated protection source lookups within this run
+enableApiMemo(['protectionSources'])
 
 multiplier = 1024 * 1024 * 1024
 if units.lower() == 'mib':
@@ -152,56 +160,47 @@ for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower())
         endUsecs = nowUsecs
 
         # get protection runs in retention
-        while 1:
-            runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&includeObjectDetails=true&excludeNonRestorableRuns=true' % (job['id'], numruns, endUsecs), v=2)
-            if len(runs['runs']) > 0:
-                if 'localBackupInfo' in runs['runs'][-1]:
-                    endUsecs = runs['runs'][-1]['localBackupInfo']['startTimeUsecs'] - 1
-                else:
-                    endUsecs = runs['runs'][-1]['originalBackupInfo']['startTimeUsecs'] - 1
-            else:
-                break
-            for run in runs['runs']:
-                if 'isLocalSnapshotsDeleted' not in run:
-                    # per object stats
-                    if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
-                        for object in [o for o in run['objects'] if o['object']['environment'] != job['environment']]:
-                            sourceNames[object['object']['id']] = object['object']['name']
-                        for object in [o for o in run['objects']]:
-                            objId = object['object']['id']
-                            if 'localSnapshotInfo' in object:
-                                snap = object['localSnapshotInfo']
-                            else:
-                                snap = object['originalBackupInfo']
-                            try:
-                                if objId not in objects and not (job['environment'] == 'kAD' and object['object']['environment'] == 'kAD') and not (job['environment'] in ['kSQL', 'kOracle'] and object['object']['objectType'] == 'kHost'):
+        for run in iterRuns(job, page=numruns, v=2, endUsecs=endUsecs, params='includeTenants=true&includeObjectDetails=true&excludeNonRestorableRuns=true'):
+            if 'isLocalSnapshotsDeleted' not in run:
+                # per object stats
+                if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
+                    for object in [o for o in run['objects'] if o['object']['environment'] != job['environment']]:
+                        sourceNames[object['object']['id']] = object['object']['name']
+                    for object in [o for o in run['objects']]:
+                        objId = object['object']['id']
+                        if 'localSnapshotInfo' in object:
+                            snap = object['localSnapshotInfo']
+                        else:
+                            snap = object['originalBackupInfo']
+                        try:
+                            if objId not in objects and not (job['environment'] == 'kAD' and object['object']['environment'] == 'kAD') and not (job['environment'] in ['kSQL', 'kOracle'] and object['object']['objectType'] == 'kHost'):
 
-                                    objects[objId] = {}
-                                    objects[objId]['name'] = object['object']['name']
-                                    objects[objId]['logical'] = 0
-                                    objects[objId]['bytesRead'] = 0
-                                    objects[objId]['growth'] = 0
-                                    if 'sourceId' in object['object']:
-                                        objects[objId]['sourceId'] = object['object']['sourceId']
-                                    if 'logicalSizeBytes' not in snap['snapshotInfo']['stats']:
-                                        csource = api('get', 'protectionSources?id=%s' % objId, quiet=True)
-                                        try:
-                                            if type(csource) == list:
-                                                objects[objId]['logical'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
-                                            else:
-                                                objects[objId]['logical'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
-                                        except Exception:
-                                            pass
-                                    else:
-                                        objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-                                if objId in objects and 'logicalSizeBytes' in snap['snapshotInfo']['stats'] and snap['snapshotInfo']['stats']['logicalSizeBytes'] > objects[objId]['logical']:
+                                objects[objId] = {}
+                                objects[objId]['name'] = object['object']['name']
+                                objects[objId]['logical'] = 0
+                                objects[objId]['bytesRead'] = 0
+                                objects[objId]['growth'] = 0
+                                if 'sourceId' in object['object']:
+                                    objects[objId]['sourceId'] = object['object']['sourceId']
+                                if 'logicalSizeBytes' not in snap['snapshotInfo']['stats']:
+                                    csource = api('get', 'protectionSources?id=%s' % objId, quiet=True)
+                                    try:
+                                        if type(csource) == list:
+                                            objects[objId]['logical'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
+                                        else:
+                                            objects[objId]['logical'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
+                                    except Exception:
+                                        pass
+                                else:
                                     objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-                                objects[objId]['bytesRead'] += snap['snapshotInfo']['stats']['bytesRead']
-                                if snap['snapshotInfo']['startTimeUsecs'] > growthdaysusecs:
-                                    objects[objId]['growth'] += snap['snapshotInfo']['stats']['bytesRead']
-                                    jobObjGrowth += snap['snapshotInfo']['stats']['bytesRead']
-                            except Exception as e:
-                                pass
+                            if objId in objects and 'logicalSizeBytes' in snap['snapshotInfo']['stats'] and snap['snapshotInfo']['stats']['logicalSizeBytes'] > objects[objId]['logical']:
+                                objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
+                            objects[objId]['bytesRead'] += snap['snapshotInfo']['stats']['bytesRead']
+                            if snap['snapshotInfo']['startTimeUsecs'] > growthdaysusecs:
+                                objects[objId]['growth'] += snap['snapshotInfo']['stats']['bytesRead']
+                                jobObjGrowth += snap['snapshotInfo']['stats']['bytesRead']
+                        except Exception as e:
+                            pass
 
         # process output
         jobFESize = 0
@@ -255,12 +254,12 @@ for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower())
                 csv.write('"%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s"\n' % (job['name'], job['environment'], sourceName, thisObject['name'], objFESize, objWritten, objWrittenWithResiliency, jobReduction, objGrowth, totalArchived, vaultStats))
 
 # views
-views = api('get', 'file-services/views?maxCount=2000&includeTenants=true&includeStats=true&includeProtectionGroups=true', v=2)
-if 'views' in views and views['views'] is not None and len(views['views']) > 0:
+views = list(paginate('file-services/views?includeTenants=true&includeStats=true&includeProtectionGroups=true', style='cookie', key='views', page=1000))
+if len(views) > 0:
     stats = api('get', 'stats/consumers?msecsBeforeCurrentTimeToCompare=%s&consumerType=kViews' % (growthdays * 86400000))
     # build total job FE sizes
     viewJobStats = {}
-    for view in views['views']:
+    for view in views:
         try:
             jobName = view['viewProtection']['protectionGroups'][-1]['groupName']
         except Exception:
@@ -269,7 +268,7 @@ if 'views' in views and views['views'] is not None and len(views['views']) > 0:
             viewJobStats[jobName] = 0
         viewJobStats[jobName] += view['stats']['dataUsageStats']['totalLogicalUsageBytes']
 
-    for view in views['views']:
+    for view in views:
         try:
             jobName = view['viewProtection']['protectionGroups'][-1]['groupName']
         except Exception:
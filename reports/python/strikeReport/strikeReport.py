@@ -167,7 +167,10 @@ for vip in vips:
     totalObjects = 0
 
     print('getting runs...')
-    allruns = api('get', 'protectionRuns?excludeTasks=true&startTimeUsecs=%s&numRuns=999999' % timeAgo(31, 'days'))
+    runStarts = {}  # jobId: [run start times] (streamed to keep memory flat)
+    for run in api('get', 'protectionRuns?excludeTasks=true&startTimeUsecs=%s&numRuns=999999' % timeAgo(31, 'days'), stream_items=True):
+        if 'backupRun' in run:
+            runStarts.setdefault(run['jobId'], []).append(run['backupRun']['stats']['startTimeUsecs'])
     print('getting jobs...')
     jobs = api('get', 'protectionJobs?allUnderHierarchy=true&isActive=true&includeLastRunAndStats=true')
 
@@ -175,19 +178,23 @@ for vip in vips:
         print("  %s" % job['name'])
         if 'lastRun' in job:
             startTimeUsecs = job['lastRun']['backupRun']['stats']['startTimeUsecs']
+            latestSnapshots = None  # objectName: newest snapshot (one search per job, only if something failed)
             for source in job['lastRun']['backupRun']['sourceBackupStatus']:
                 totalObjects += 1
                 sourcename = source['source']['name']
                 if source['status'] not in ['kSuccess', 'kWarning']:
-                    sourceType = source['source']['environment']
-                    if sourceType == 'kPuppeteer':
-                        sourceType == 'kView'
-                    search = api('get', '/searchvms?vmName=%s&entityTypes=%s&allUnderHierarchy=true&jobIds=%s' % (sourcename, sourceType, job['id']))
-                    if 'vms' in search:
-                        latestSnapshotUsecs = search['vms'][0]['vmDocument']['versions'][0]['instanceId']['jobStartTimeUsecs']
-                        errorRuns = [run for run in allruns if run['jobId'] == job['id'] and run['backupRun']['stats']['startTimeUsecs'] > latestSnapshotUsecs]
+                    if latestSnapshots is None:
+                        latestSnapshots = {}
+                        for vm in paginate('/searchvms?jobIds=%s&allUnderHierarchy=true' % job['id'], style='offset', key='vms', page=1000, v=1):
+                            versions = vm['vmDocument'].get('versions', [])
+                            if len(versions) > 0:
+                                objectName = vm['vmDocument']['objectName']
+                                latestSnapshots[objectName] = max(latestSnapshots.get(objectName, 0), versions[0]['instanceId']['jobStartTimeUsecs'])
+                    if sourcename in latestSnapshots:
+                        latestSnapshotUsecs = latestSnapshots[sourcename]
+                        errorRuns = [startUsecs for startUsecs in runStarts.get(job['id'], []) if startUsecs > latestSnapshotUsecs]
                     else:
-                        errorRuns = [run for run in allruns if run['jobId'] == job['id'] and run['backupRun']['stats']['startTimeUsecs'] > (timeAgo(31, 'days'))]
+                        errorRuns = [startUsecs for startUsecs in runStarts.get(job['id'], []) if startUsecs > (timeAgo(31, 'days'))]
                         latestSnapshotUsecs = 0
                     if errorRuns:
                         numErrors = len(errorRuns)